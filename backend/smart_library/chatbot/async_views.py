@@ -0,0 +1,80 @@
+"""Vues Django natives async (ASGI) pour la récupération de contexte du chatbot."""
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from library.async_views import parse_limit
+from library.services.search import asearch_chunks
+from users.authentication import aget_request_user
+
+from .history import build_context, update_summary
+from .models import Conversation, Message
+
+MODE_TO_SOURCE = {
+    "general": "general",
+    "personal": "personal",
+    "mixed": None,
+}
+
+
+def _ndjson(payload) -> str:
+    return json.dumps(payload, ensure_ascii=False, default=str) + "\n"
+
+
+@csrf_exempt
+@require_POST
+async def retrieve(request, pk):
+    """POST /api/conversations/<uuid>/retrieve/ {"question": "...", "limit": 5}
+
+    Enregistre la question dans la conversation puis diffuse en NDJSON, un objet par
+    ligne, le contexte de la conversation (résumé + derniers messages) et les passages
+    retrouvés au fur et à mesure.
+    """
+    user = await aget_request_user(request, allow_session=False)
+    if user is None:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+    try:
+        body = json.loads(request.body or b"{}")
+    except json.JSONDecodeError:
+        return JsonResponse({"detail": "Corps JSON invalide."}, status=400)
+    question = str(body.get("question") or "").strip()
+    if not question:
+        return JsonResponse({"question": "Ce champ est requis."}, status=400)
+
+    conversation = await Conversation.objects.filter(pk=pk, user=user).afirst()
+    if conversation is None:
+        return JsonResponse({"detail": "Conversation introuvable."}, status=404)
+
+    message = await Message.objects.acreate(
+        conversation=conversation,
+        sender="user",
+        content=question,
+    )
+    await conversation.asave(update_fields=["last_activity"])
+    limit = parse_limit(body.get("limit"), default=5)
+
+    async def stream():
+        yield _ndjson(
+            {
+                "type": "message",
+                "id": str(message.id),
+                "created_at": message.created_at.isoformat(),
+            }
+        )
+        yield _ndjson({"type": "context", **await sync_to_async(build_context)(conversation)})
+        passages = await asearch_chunks(
+            question,
+            user,
+            limit=limit,
+            source=MODE_TO_SOURCE.get(conversation.mode),
+        )
+        for passage in passages:
+            yield _ndjson({"type": "passage", **passage})
+        yield _ndjson({"type": "done", "count": len(passages)})
+        # Hors du chemin critique : la réponse est déjà envoyée.
+        await sync_to_async(update_summary)(conversation)
+
+    return StreamingHttpResponse(stream(), content_type="application/x-ndjson")
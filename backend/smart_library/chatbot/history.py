@@ -0,0 +1,107 @@
+"""Historique des conversations : fenêtre des derniers messages et résumé glissant.
+
+Le contexte d'un tour se compose du résumé stocké sur la conversation et des
+``HISTORY_WINDOW`` derniers messages (lus via l'index ``(conversation, created_at)``) :
+son coût ne dépend pas de la longueur de la conversation. Les messages qui sortent de
+la fenêtre sont repliés dans le résumé au fil des ajouts.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Conversation, Message
+
+SUMMARY_LINE_CHARS = 200
+
+
+def _setting(name: str, default):
+    return getattr(settings, "CHATBOT", {}).get(name, default)
+
+
+def recent_messages(
+    conversation: Conversation,
+    limit: int,
+    before: Optional[Message] = None,
+) -> Tuple[List[Message], bool]:
+    """Retourne les ``limit`` messages précédant ``before`` (ordre chronologique) et s'il en reste.
+
+    La pagination se fait par clé ``(created_at, id)`` : chaque page est une lecture
+    d'index, même loin dans l'historique.
+    """
+    queryset = Message.objects.filter(conversation=conversation)
+    if before is not None:
+        queryset = queryset.filter(
+            Q(created_at__lt=before.created_at) | Q(created_at=before.created_at, id__lt=before.id)
+        )
+    page = list(queryset.order_by("-created_at", "-id")[: limit + 1])
+    has_more = len(page) > limit
+    return list(reversed(page[:limit])), has_more
+
+
+def summarize_messages(summary: str, messages: List[Message]) -> str:
+    """Ajoute les messages au résumé (une ligne tronquée par message) en bornant sa taille.
+
+    Résumé extractif : c'est le point d'extension pour brancher un modèle génératif.
+    """
+    lines = [line for line in summary.splitlines() if line]
+    for message in messages:
+        text = " ".join(message.content.split())
+        if len(text) > SUMMARY_LINE_CHARS:
+            text = text[: SUMMARY_LINE_CHARS - 1].rstrip() + "…"
+        lines.append(f"{message.sender}: {text}")
+    max_chars = _setting("SUMMARY_MAX_CHARS", 4000)
+    while lines and sum(len(line) + 1 for line in lines) > max_chars:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+def _after(created_at, message_id) -> Q:
+    """Messages postérieurs à la clé ``(created_at, id)``."""
+    if message_id is None:
+        return Q(created_at__gt=created_at)
+    return Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=message_id)
+
+
+def update_summary(conversation: Conversation) -> Conversation:
+    """Replie dans le résumé les messages sortis de la fenêtre depuis la dernière mise à jour.
+
+    Les messages sont ordonnés et découpés selon ``(created_at, id)``, comme dans
+    :func:`recent_messages` : des messages de même horodatage ne sont ni perdus ni repliés
+    deux fois.
+    """
+    window = _setting("HISTORY_WINDOW", 20)
+    with transaction.atomic():
+        conversation = Conversation.objects.select_for_update().get(pk=conversation.pk)
+        outside = list(
+            Message.objects.filter(conversation=conversation)
+            .order_by("-created_at", "-id")
+            .values_list("created_at", "id")[window:window + 1]
+        )
+        if not outside:
+            return conversation
+        boundary_at, boundary_id = outside[0]
+        pending = Message.objects.filter(conversation=conversation).exclude(_after(boundary_at, boundary_id))
+        if conversation.summary_until is not None:
+            pending = pending.filter(_after(conversation.summary_until, conversation.summary_until_message))
+        folded = list(pending.order_by("created_at", "id"))
+        if not folded:
+            return conversation
+        conversation.summary = summarize_messages(conversation.summary, folded)
+        conversation.summary_until = folded[-1].created_at
+        conversation.summary_until_message = folded[-1].id
+        conversation.summarized_count += len(folded)
+        conversation.save(
+            update_fields=["summary", "summary_until", "summary_until_message", "summarized_count"]
+        )
+    return conversation
+
+
+def build_context(conversation: Conversation) -> Dict:
+    """Contexte d'un tour de réponse : résumé + derniers messages, en deux lectures indexées."""
+    messages, _ = recent_messages(conversation, _setting("HISTORY_WINDOW", 20))
+    return {
+        "summary": conversation.summary,
+        "messages": [{"sender": message.sender, "content": message.content} for message in messages],
+    }
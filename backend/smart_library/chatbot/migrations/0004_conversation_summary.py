@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0003_conversation_conversations_activity_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='summarized_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Messages résumés'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='summary',
+            field=models.TextField(blank=True, verbose_name='Résumé'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='summary_until',
+            field=models.DateTimeField(blank=True, null=True, verbose_name="Résumé jusqu'au"),
+        ),
+    ]
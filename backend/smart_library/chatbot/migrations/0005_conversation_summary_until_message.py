@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0004_conversation_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='summary_until_message',
+            field=models.UUIDField(blank=True, null=True, verbose_name='Dernier message résumé'),
+        ),
+    ]
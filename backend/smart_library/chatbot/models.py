@@ -31,12 +31,22 @@ class Conversation(models.Model):
         verbose_name="Mode"
     )
     is_active = models.BooleanField(default=True, verbose_name="Active")
+    # Résumé glissant des messages sortis de la fenêtre d'historique (voir chatbot.history)
+    summary = models.TextField(blank=True, verbose_name="Résumé")
+    summary_until = models.DateTimeField(null=True, blank=True, verbose_name="Résumé jusqu'au")
+    # Avec summary_until, clé (created_at, id) du dernier message résumé
+    summary_until_message = models.UUIDField(null=True, blank=True, verbose_name="Dernier message résumé")
+    summarized_count = models.PositiveIntegerField(default=0, verbose_name="Messages résumés")
     
     class Meta:
         db_table = 'conversations'
         verbose_name = "Conversation"
         verbose_name_plural = "Conversations"
         ordering = ['-last_activity']
+        indexes = [
+            models.Index(fields=['-last_activity'], name='conversations_activity_idx'),
+            models.Index(fields=['user', '-last_activity'], name='conversations_user_act_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.user.name}"
@@ -70,6 +80,10 @@ class Message(models.Model):
         verbose_name = "Message"
         verbose_name_plural = "Messages"
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='messages_created_idx'),
+            models.Index(fields=['conversation', 'created_at'], name='messages_conv_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.sender} - {self.content[:50]}"
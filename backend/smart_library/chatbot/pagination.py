@@ -0,0 +1,9 @@
+from library.pagination import KeysetPagination
+
+
+class ConversationPagination(KeysetPagination):
+    ordering = "-last_activity"
+
+
+class MessagePagination(KeysetPagination):
+    ordering = "created_at"
@@ -1,9 +1,11 @@
 from rest_framework import serializers
 
+from library.serializers import SparseFieldsMixin
+
 from .models import Conversation, Message, MessageReference
 
 
-class ConversationSerializer(serializers.ModelSerializer):
+class ConversationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """CRUD serializer pour les conversations."""
 
     class Meta:
@@ -16,11 +18,12 @@ class ConversationSerializer(serializers.ModelSerializer):
             "last_activity",
             "mode",
             "is_active",
+            "summary",
         ]
-        read_only_fields = ["id", "started_at", "last_activity"]
+        read_only_fields = ["id", "started_at", "last_activity", "summary"]
 
 
-class MessageSerializer(serializers.ModelSerializer):
+class MessageSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """CRUD serializer pour les messages."""
 
     class Meta:
@@ -1,3 +1,72 @@
-from django.test import TestCase
+import json
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from chatbot.history import update_summary
+from chatbot.models import Conversation, Message
+
+
+class MessagePaginationTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email="chat@example.com", password="x", name="Chat")
+        self.conversation = Conversation.objects.create(user=self.user, title="Questions")
+        for index in range(5):
+            Message.objects.create(conversation=self.conversation, sender="user", content=f"message {index}")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_following_next_reads_every_message_once_in_order(self):
+        url = f"/api/messages/?conversation={self.conversation.pk}&page_size=2"
+        contents = []
+        while url:
+            page = self.client.get(url).data
+            self.assertLessEqual(len(page["results"]), 2)
+            contents += [message["content"] for message in page["results"]]
+            url = page["next"]
+        self.assertEqual(contents, [f"message {index}" for index in range(5)])
+
+
+@override_settings(CHATBOT={"HISTORY_WINDOW": 2, "SUMMARY_MAX_CHARS": 4000})
+class ConversationHistoryTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email="history@example.com", password="x", name="History")
+        self.conversation = Conversation.objects.create(user=self.user, title="Questions", mode="general")
+
+    def add(self, count):
+        for _ in range(count):
+            Message.objects.create(conversation=self.conversation, sender="user", content="question")
+
+    def test_messages_sharing_a_timestamp_are_folded_once(self):
+        self.add(5)
+        # Même horodatage partout : seul l'id départage les messages.
+        Message.objects.filter(conversation=self.conversation).update(created_at=self.conversation.started_at)
+        self.assertEqual(update_summary(self.conversation).summarized_count, 3)
+        self.assertEqual(update_summary(self.conversation).summarized_count, 3)
+        self.add(1)
+        self.assertEqual(update_summary(self.conversation).summarized_count, 4)
+
+    async def test_retrieve_streams_the_conversation_context(self):
+        for sender, content in (("user", "Qu'est-ce qu'un perceptron ?"), ("assistant", "Un neurone formel.")):
+            await Message.objects.acreate(conversation=self.conversation, sender=sender, content=content)
+        self.conversation.summary = "user: introduction"
+        await self.conversation.asave(update_fields=["summary"])
+        token = await Token.objects.acreate(user=self.user)
+        with mock.patch("chatbot.async_views.asearch_chunks", new=mock.AsyncMock(return_value=[])):
+            response = await self.async_client.post(
+                f"/api/conversations/{self.conversation.pk}/retrieve/",
+                {"question": "Et un réseau ?"},
+                content_type="application/json",
+                headers={"authorization": f"Token {token.key}"},
+            )
+            body = b"".join([block async for block in response.streaming_content])
+        lines = [json.loads(line) for line in body.decode("utf-8").splitlines()]
+        self.assertEqual([line["type"] for line in lines], ["message", "context", "done"])
+        self.assertEqual(lines[1]["summary"], "user: introduction")
+        self.assertEqual(
+            [message["content"] for message in lines[1]["messages"]],
+            ["Un neurone formel.", "Et un réseau ?"],
+        )
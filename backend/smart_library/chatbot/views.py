@@ -1,6 +1,14 @@
-from rest_framework import permissions, viewsets
+import uuid
 
+from django.shortcuts import get_object_or_404
+from rest_framework import permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .history import recent_messages, update_summary
 from .models import Conversation, Message, MessageReference
+from .pagination import ConversationPagination, MessagePagination
 from .serializers import (
     ConversationSerializer,
     MessageReferenceSerializer,
@@ -8,12 +16,49 @@ from .serializers import (
 )
 
 
+HISTORY_PAGE_SIZE = 20
+HISTORY_MAX_PAGE_SIZE = 200
+
+
 class ConversationViewSet(viewsets.ModelViewSet):
     """CRUD complet pour les conversations."""
 
     serializer_class = ConversationSerializer
     permission_classes = [permissions.IsAuthenticated]
-    queryset = Conversation.objects.select_related("user").all().order_by("-last_activity")
+    pagination_class = ConversationPagination
+    queryset = Conversation.objects.all().order_by("-last_activity")
+
+    @action(detail=True, methods=["get"], url_path="history")
+    def history(self, request, pk=None):
+        """Derniers messages (``limit``, 20 par défaut) et résumé des plus anciens.
+
+        ``before=<message id>`` remonte l'historique page par page ; ``next_before`` vaut
+        l'identifiant à passer pour la page suivante, ou ``null``.
+        """
+        conversation = get_object_or_404(Conversation, pk=pk, user=request.user)
+        limit = request.query_params.get("limit") or HISTORY_PAGE_SIZE
+        try:
+            limit = min(max(int(limit), 1), HISTORY_MAX_PAGE_SIZE)
+        except (TypeError, ValueError):
+            raise ValidationError({"limit": "Un entier est attendu."})
+        before = None
+        if request.query_params.get("before"):
+            try:
+                before = Message.objects.get(
+                    pk=uuid.UUID(request.query_params["before"]), conversation=conversation
+                )
+            except (ValueError, Message.DoesNotExist):
+                raise ValidationError({"before": "Message introuvable dans cette conversation."})
+        messages, has_more = recent_messages(conversation, limit, before)
+        return Response(
+            {
+                "summary": conversation.summary,
+                "summarized_count": conversation.summarized_count,
+                "messages": MessageSerializer(messages, many=True).data,
+                "next_before": str(messages[0].id) if has_more and messages else None,
+            },
+            status=status.HTTP_200_OK,
+        )
 
 
 class MessageViewSet(viewsets.ModelViewSet):
@@ -21,7 +66,23 @@ class MessageViewSet(viewsets.ModelViewSet):
 
     serializer_class = MessageSerializer
     permission_classes = [permissions.IsAuthenticated]
-    queryset = Message.objects.select_related("conversation").all().order_by("created_at")
+    pagination_class = MessagePagination
+    queryset = Message.objects.all().order_by("created_at")
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        conversation_id = self.request.query_params.get("conversation")
+        if conversation_id:
+            try:
+                conversation_id = uuid.UUID(conversation_id)
+            except ValueError:
+                raise ValidationError({"conversation": "Identifiant de conversation invalide."})
+            queryset = queryset.filter(conversation_id=conversation_id)
+        return queryset
+
+    def perform_create(self, serializer):
+        message = serializer.save()
+        update_summary(message.conversation)
 
 
 class MessageReferenceViewSet(viewsets.ModelViewSet):
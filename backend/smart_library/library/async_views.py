@@ -0,0 +1,52 @@
+"""Vues Django natives async (ASGI) pour la recherche sémantique.
+
+Elles ne passent pas par DRF : l'embedding tourne dans un pool de threads dédié et les
+appels Qdrant utilisent ``AsyncQdrantClient``, ce qui libère la boucle d'événements
+pendant les I/O.
+"""
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from users.authentication import aget_request_user
+
+from .services.search import asearch_chunks
+
+MAX_SEARCH_LIMIT = 50
+
+
+def parse_limit(value, default: int = 10) -> int:
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, MAX_SEARCH_LIMIT))
+
+
+def parse_flag(value):
+    """``None`` si absent (réglage par défaut), sinon booléen (``0``/``false``/``no`` = faux)."""
+    if value is None:
+        return None
+    return value.strip().lower() not in {"0", "false", "no", "off"}
+
+
+@require_GET
+async def search(request):
+    """GET /api/search/?q=...&limit=10&source=general|personal&document=<uuid>&diversify=0|1"""
+    user = await aget_request_user(request)
+    if user is None:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+    query = (request.GET.get("q") or "").strip()
+    if not query:
+        return JsonResponse({"q": "Ce paramètre est requis."}, status=400)
+    source = request.GET.get("source")
+    if source not in {None, "general", "personal"}:
+        return JsonResponse({"source": "Valeur attendue : general ou personal."}, status=400)
+    results = await asearch_chunks(
+        query,
+        user,
+        limit=parse_limit(request.GET.get("limit")),
+        source=source,
+        document_id=request.GET.get("document"),
+        diversify=parse_flag(request.GET.get("diversify")),
+    )
+    return JsonResponse({"query": query, "results": results})
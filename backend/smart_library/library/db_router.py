@@ -0,0 +1,56 @@
+"""Connexions des threads d'ingestion : alias ``ingestion`` avec son propre pool.
+
+Les threads de l'ordonnanceur et des jobs d'import s'exécutent sous
+:func:`use_ingestion_db` ; le routeur envoie alors leurs requêtes sur l'alias
+``ingestion`` (même base, pool distinct), si bien qu'un import massif ne peut pas
+épuiser les connexions des requêtes web. Les transactions ouvertes par ces threads
+passent ``using=current_db_alias()``.
+"""
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+INGESTION_DB_ALIAS = "ingestion"
+
+_state = threading.local()
+
+
+def current_db_alias() -> str:
+    """Alias utilisé par le thread courant (``default`` hors ingestion)."""
+    return getattr(_state, "alias", DEFAULT_DB_ALIAS)
+
+
+@contextmanager
+def use_ingestion_db():
+    """Route les requêtes du thread courant vers l'alias ``ingestion`` s'il est déclaré."""
+    previous = current_db_alias()
+    if INGESTION_DB_ALIAS in settings.DATABASES:
+        _state.alias = INGESTION_DB_ALIAS
+    try:
+        yield
+    finally:
+        _state.alias = previous
+
+
+class IngestionRouter:
+    """Routeur des threads d'ingestion ; les autres threads gardent ``default``."""
+
+    def db_for_read(self, model, **hints):
+        alias = current_db_alias()
+        return alias if alias != DEFAULT_DB_ALIAS else None
+
+    db_for_write = db_for_read
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Les deux alias pointent sur la même base.
+        databases = {DEFAULT_DB_ALIAS, INGESTION_DB_ALIAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == INGESTION_DB_ALIAS:
+            return False
+        return None
@@ -0,0 +1,91 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.utils import ConnectionHandler
+
+
+class Command(BaseCommand):
+    help = (
+        "Charge Postgres avec N clients concurrents (connexion + requête + libération, comme une "
+        "requête HTTP) et compare la latence sans pool (CONN_MAX_AGE=0) et avec le pool psycopg."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=200)
+        parser.add_argument("--requests", type=int, default=20, help="Requêtes par client.")
+        parser.add_argument("--query", default="SELECT count(*) FROM tags")
+
+    def _pool_options(self):
+        options = settings.DATABASES["default"].get("OPTIONS", {}).get("pool")
+        if isinstance(options, dict):
+            return options
+        return {"min_size": 2, "max_size": settings.DB_POOL_WEB_SIZE}
+
+    def _client(self, handler, alias, query, count):
+        latencies, errors = [], 0
+        for _ in range(count):
+            start = time.perf_counter()
+            db = handler[alias]
+            try:
+                with db.cursor() as cursor:
+                    cursor.execute(query)
+                    cursor.fetchall()
+            except Exception:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+            finally:
+                # Fin de requête HTTP : la connexion est fermée ou rendue au pool.
+                db.close()
+        return latencies, errors
+
+    def _run(self, alias, database, options):
+        handler = ConnectionHandler({alias: database})
+        clients = options["clients"]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as executor:
+            results = list(
+                executor.map(
+                    lambda _: self._client(handler, alias, options["query"], options["requests"]),
+                    range(clients),
+                )
+            )
+        elapsed = time.perf_counter() - start
+        if database["OPTIONS"].get("pool"):
+            handler[alias].close_pool()
+        latencies = sorted(latency for client, _ in results for latency in client)
+        errors = sum(errors for _, errors in results)
+        if not latencies:
+            self.stdout.write(self.style.ERROR(f"{alias}: all {errors} requests failed"))
+            return
+        quantiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f"{alias:>8}: {len(latencies) / elapsed:7.0f} req/s, "
+            f"p50 {quantiles[49] * 1000:6.1f} ms, p95 {quantiles[94] * 1000:6.1f} ms, "
+            f"p99 {quantiles[98] * 1000:6.1f} ms, errors {errors}"
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("This benchmark needs the PostgreSQL backend.")
+        base = dict(settings.DATABASES["default"])
+        plain_options = {key: value for key, value in base.get("OPTIONS", {}).items() if key != "pool"}
+        self.stdout.write(
+            f"{options['clients']} clients x {options['requests']} requests: {options['query']}"
+        )
+        # Alias dédiés : Django garde un pool par alias, celui du site n'est pas touché.
+        self._run(
+            "direct",
+            dict(base, CONN_MAX_AGE=0, CONN_HEALTH_CHECKS=False, OPTIONS=plain_options),
+            options,
+        )
+        self._run(
+            "pooled",
+            # CONN_HEALTH_CHECKS : Django vérifie chaque connexion empruntée au pool.
+            dict(base, CONN_MAX_AGE=0, CONN_HEALTH_CHECKS=True, OPTIONS=dict(plain_options, pool=self._pool_options())),
+            options,
+        )
@@ -0,0 +1,85 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from library.models import DocumentEmbedding
+from library.services.chunk_storage import iter_chunk_rows
+from library.services.embeddings import BACKEND_ONNX, BACKEND_TORCH, load_embedding_model
+from library.services.vector_spaces import active_space, configured_models
+
+SAMPLE_SENTENCES = [
+    "La bibliothèque numérique indexe les documents pour la recherche sémantique.",
+    "Machine learning models map sentences to dense vector representations.",
+    "Le traitement OCR extrait le texte des images numérisées page par page.",
+    "Qdrant stores vectors together with a JSON payload for filtering.",
+    "Chaque document est découpé en segments avec recouvrement avant vectorisation.",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare les backends d'embedding torch et onnx : parité (similarité cosinus) "
+        "et débit en chunks/seconde pour plusieurs nombres de threads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--samples", type=int, default=512, help="Nombre de chunks encodés par mesure.")
+        parser.add_argument("--batch-size", type=int, default=32)
+        parser.add_argument("--space", help="Espace de vecteurs à mesurer (défaut : l'espace actif).")
+        parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4])
+        parser.add_argument(
+            "--min-cosine",
+            type=float,
+            default=0.99,
+            help="Similarité cosinus minimale exigée entre torch et onnx.",
+        )
+
+    def _load_texts(self, samples):
+        texts = [
+            text for _, _, text in iter_chunk_rows(DocumentEmbedding.objects.order_by("id")[:samples])
+        ]
+        if not texts:
+            texts = SAMPLE_SENTENCES
+        while len(texts) < samples:
+            texts.extend(texts[: samples - len(texts)])
+        return texts
+
+    def _throughput(self, model, texts, batch_size):
+        model.encode(texts[:batch_size], batch_size=batch_size)  # warm-up
+        start = time.perf_counter()
+        model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+        return len(texts) / (time.perf_counter() - start)
+
+    def handle(self, *args, **options):
+        space = options["space"] or active_space()
+        if space not in configured_models():
+            raise CommandError(f"Unknown vector space '{space}'.")
+        model_name = configured_models()[space]
+        texts = self._load_texts(options["samples"])
+        batch_size = options["batch_size"]
+
+        torch_model = load_embedding_model(model_name, BACKEND_TORCH)
+        onnx_model = load_embedding_model(model_name, BACKEND_ONNX)
+
+        reference = torch_model.encode(texts, batch_size=batch_size, normalize_embeddings=True)
+        candidate = onnx_model.encode(texts, batch_size=batch_size, normalize_embeddings=True)
+        cosines = np.sum(reference * candidate, axis=1)
+        self.stdout.write(
+            f"Parity torch/onnx on {len(texts)} chunks: "
+            f"min={cosines.min():.4f} mean={cosines.mean():.4f}"
+        )
+
+        self.stdout.write(f"{'backend':<8} {'threads':>7} {'chunks/s':>10}")
+        for num_threads in options["threads"]:
+            for backend in (BACKEND_TORCH, BACKEND_ONNX):
+                model = load_embedding_model(model_name, backend, num_threads=num_threads)
+                rate = self._throughput(model, texts, batch_size)
+                self.stdout.write(f"{backend:<8} {num_threads:>7} {rate:>10.1f}")
+
+        if cosines.min() < options["min_cosine"]:
+            raise CommandError(
+                f"ONNX backend diverges from torch (min cosine {cosines.min():.4f} "
+                f"< {options['min_cosine']})."
+            )
+        self.stdout.write(self.style.SUCCESS("ONNX backend matches torch embeddings."))
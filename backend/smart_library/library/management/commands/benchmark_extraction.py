@@ -0,0 +1,81 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from library.models import Document
+from library.services.document_processing import (
+    clean_text,
+    detect_file_type,
+    extract_layout_from_pdf,
+    extract_text_from_pdf,
+    generate_chunks,
+    open_document_source,
+)
+from library.services.layout import layout_chunks
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare les extractions PDF « text » et « layout » (extraction, nettoyage et découpage, "
+        "sans cache ni embedding) en pages/seconde sur des fichiers ou des documents de la base."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="*", help="Fichiers PDF (défaut : documents PDF de la base).")
+        parser.add_argument("--documents", type=int, default=20, help="Documents lus en base sans chemin donné.")
+        parser.add_argument("--repeat", type=int, default=3, help="Mesures par mode ; la meilleure est retenue.")
+
+    def _sources(self, options):
+        if options["paths"]:
+            for path in options["paths"]:
+                with open(path, "rb") as handle:
+                    yield path, handle.read()
+            return
+        for document in Document.objects.exclude(file="").order_by("-date_added")[: options["documents"] * 5]:
+            try:
+                with open_document_source(document) as (file_name, content):
+                    if detect_file_type(file_name) == "pdf":
+                        yield file_name, bytes(content)
+            except (OSError, ValueError):
+                continue
+
+    def _run_text(self, content, chunk_size, overlap):
+        pages = extract_text_from_pdf(content)
+        chunks = 0
+        for _, text in pages:
+            chunks += sum(1 for _ in generate_chunks(clean_text(text), chunk_size, overlap))
+        return len(pages), chunks
+
+    def _run_layout(self, content, chunk_size, overlap):
+        pages = extract_layout_from_pdf(content)
+        chunks = sum(1 for _, blocks in pages for _ in layout_chunks(blocks, chunk_size, overlap))
+        return len(pages), chunks
+
+    def handle(self, *args, **options):
+        sources = list(self._sources(options))[: max(options["documents"], len(options["paths"]))]
+        if not sources:
+            raise CommandError("No PDF to benchmark.")
+        cfg = settings.DOCUMENT_PROCESSING
+        chunk_size, overlap = cfg.get("CHUNK_SIZE", 200), cfg.get("CHUNK_OVERLAP", 40)
+
+        results = {}
+        for mode, run in (("text", self._run_text), ("layout", self._run_layout)):
+            best = None
+            for _ in range(options["repeat"]):
+                start = time.perf_counter()
+                pages = chunks = 0
+                for _, content in sources:
+                    page_count, chunk_count = run(content, chunk_size, overlap)
+                    pages += page_count
+                    chunks += chunk_count
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            results[mode] = best
+            self.stdout.write(
+                f"{mode:<7} {len(sources)} files, {pages} pages, {chunks} chunks: "
+                f"{best * 1000:.1f} ms ({pages / best:.0f} pages/s)"
+            )
+        ratio = results["text"] / results["layout"]
+        style = self.style.SUCCESS if ratio >= 1 else self.style.WARNING
+        self.stdout.write(style(f"layout / text speed: x{ratio:.2f}"))
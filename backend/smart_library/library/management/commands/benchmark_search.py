@@ -0,0 +1,85 @@
+import asyncio
+import statistics
+import time
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_QUERIES = [
+    "intelligence artificielle",
+    "réseaux de neurones",
+    "traitement du langage naturel",
+    "database indexing",
+    "optical character recognition",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Test de charge HTTP de /api/search/ : envoie des requêtes concurrentes et mesure "
+        "le débit et les latences. À lancer une fois contre le déploiement WSGI "
+        "(runserver/gunicorn) et une fois contre uvicorn (smart_library.asgi), avec "
+        "QDRANT['URL'] pointant vers une instance Qdrant locale."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--token", required=True, help="Token DRF d'un utilisateur existant.")
+        parser.add_argument("--concurrency", type=int, default=200)
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--limit", type=int, default=10)
+        parser.add_argument("--timeout", type=float, default=60.0)
+
+    async def _run(self, options):
+        queue: asyncio.Queue = asyncio.Queue()
+        for i in range(options["requests"]):
+            queue.put_nowait(DEFAULT_QUERIES[i % len(DEFAULT_QUERIES)])
+        latencies = []
+        errors = 0
+
+        limits = httpx.Limits(max_connections=options["concurrency"])
+        async with httpx.AsyncClient(
+            base_url=options["base_url"],
+            headers={"Authorization": f"Token {options['token']}"},
+            timeout=options["timeout"],
+            limits=limits,
+        ) as client:
+
+            async def worker():
+                nonlocal errors
+                while True:
+                    try:
+                        query = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    start = time.perf_counter()
+                    try:
+                        response = await client.get(
+                            "/api/search/",
+                            params={"q": query, "limit": options["limit"]},
+                        )
+                        response.raise_for_status()
+                    except httpx.HTTPError:
+                        errors += 1
+                        continue
+                    latencies.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(options["concurrency"])))
+            elapsed = time.perf_counter() - start
+        return latencies, errors, elapsed
+
+    def handle(self, *args, **options):
+        latencies, errors, elapsed = asyncio.run(self._run(options))
+        if not latencies:
+            raise CommandError(f"Aucune requête réussie ({errors} erreurs).")
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        self.stdout.write(
+            f"{len(latencies)} ok / {errors} errors in {elapsed:.2f}s "
+            f"({len(latencies) / elapsed:.1f} req/s) with concurrency {options['concurrency']}"
+        )
+        self.stdout.write(
+            f"latency p50={statistics.median(latencies) * 1000:.1f}ms "
+            f"p95={p95 * 1000:.1f}ms max={latencies[-1] * 1000:.1f}ms"
+        )
@@ -0,0 +1,76 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models.functions import Coalesce
+
+from library.models import Document, DocumentEmbedding
+from library.services.centroids import (
+    ensure_centroid_collection,
+    fetch_point_vectors,
+    mean_vector,
+    upsert_centroids,
+)
+from library.services.document_processing import get_qdrant_client
+from library.services.vector_spaces import active_space, configured_models
+
+
+class Command(BaseCommand):
+    help = (
+        "Calcule le centroïde des documents déjà indexés à partir des vecteurs de leurs chunks "
+        "dans Qdrant (aucun ré-embedding) et l'écrit dans QDRANT['CENTROID_COLLECTION']."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=64, help="Documents par lot.")
+        parser.add_argument(
+            "--recreate",
+            action="store_true",
+            help="Recrée la collection des centroïdes (après l'ajout d'un espace d'embedding).",
+        )
+
+    def handle(self, *args, **options):
+        client = get_qdrant_client()
+        ensure_centroid_collection(client, recreate=options["recreate"])
+        vectors = client.get_collection(settings.QDRANT["COLLECTION"]).config.params.vectors
+        named = isinstance(vectors, dict)
+        # Seuls les espaces déclarés ont un vecteur dans la collection des centroïdes.
+        spaces = [space for space in vectors if space in configured_models()] if named else [active_space()]
+
+        document_ids = list(
+            Document.objects.filter(status='indexed').order_by("date_added").values_list("pk", flat=True)
+        )
+        written = 0
+        for start in range(0, len(document_ids), options["batch_size"]):
+            documents = list(Document.objects.filter(pk__in=document_ids[start:start + options["batch_size"]]))
+            # Un doublon n'a pas de point : il compte avec celui de son chunk canonique.
+            rows = DocumentEmbedding.objects.filter(document__in=documents).values_list(
+                "document_id", Coalesce("canonical__point_id", "point_id")
+            )
+            points_by_document = defaultdict(list)
+            for document_id, point_id in rows:
+                points_by_document[document_id].append(str(point_id))
+            stored = fetch_point_vectors(
+                client,
+                {point_id for point_ids in points_by_document.values() for point_id in point_ids},
+                spaces,
+                named,
+            )
+            centroids = []
+            for document in documents:
+                centroid = {}
+                for space in spaces:
+                    mean = mean_vector(
+                        [
+                            stored[point_id][space]
+                            for point_id in points_by_document[document.pk]
+                            if stored.get(point_id, {}).get(space) is not None
+                        ]
+                    )
+                    if mean is not None:
+                        centroid[space] = mean
+                centroids.append(centroid)
+            upsert_centroids(client, documents, centroids)
+            written += sum(1 for centroid in centroids if centroid)
+            self.stdout.write(f"{start + len(documents)}/{len(document_ids)} documents")
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} document centroids."))
@@ -0,0 +1,134 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Sum
+from django.db.models.functions import Coalesce, Length
+from qdrant_client.http import models as qmodels
+
+from library.models import DocumentEmbedding
+from library.services.chunk_storage import (
+    DENORMALIZED_PAYLOAD_KEYS,
+    STORAGE_BOTH,
+    STORAGE_DATABASE,
+    build_payload,
+    embedding_text_fields,
+    fetch_payload_texts,
+    payload_sizes,
+    storage_mode,
+)
+from library.services.document_processing import get_qdrant_client
+
+
+class Command(BaseCommand):
+    help = (
+        "Aligne le stockage du texte des chunks existants sur DOCUMENT_PROCESSING['CHUNK_TEXT_STORAGE'] "
+        "(base compressée, payload Qdrant ou les deux) et mesure l'espace gagné."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--dry-run", action="store_true", help="Mesure seulement, sans rien modifier.")
+        parser.add_argument("--sample", type=int, default=1000, help="Points Qdrant échantillonnés pour la mesure.")
+
+    def _database_bytes(self):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_total_relation_size(%s)", [DocumentEmbedding._meta.db_table])
+                return cursor.fetchone()[0]
+        totals = DocumentEmbedding.objects.aggregate(
+            text=Coalesce(Sum(Length("text")), 0),
+            compressed=Coalesce(Sum(Length("compressed_text")), 0),
+        )
+        return totals["text"] + totals["compressed"]
+
+    def _measure(self, client, sample):
+        points, payload_bytes = payload_sizes(client, sample)
+        return self._database_bytes(), payload_bytes / max(points, 1)
+
+    def handle(self, *args, **options):
+        client = get_qdrant_client()
+        mode = storage_mode()
+        db_before, payload_before = self._measure(client, options["sample"])
+        self.stdout.write(
+            f"Before: chunk table {db_before} bytes, Qdrant payload {payload_before:.0f} bytes/point"
+        )
+        if options["dry_run"]:
+            return
+
+        queryset = DocumentEmbedding.objects.select_related("document", "document__tag").order_by("pk")
+        batch = []
+        converted = 0
+        for entry in queryset.iterator(chunk_size=options["batch_size"]):
+            batch.append(entry)
+            if len(batch) >= options["batch_size"]:
+                converted += self._convert(client, batch, mode)
+                batch = []
+        if batch:
+            converted += self._convert(client, batch, mode)
+
+        db_after, payload_after = self._measure(client, options["sample"])
+        self.stdout.write(
+            f"After:  chunk table {db_after} bytes, Qdrant payload {payload_after:.0f} bytes/point"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Converted {converted} chunks to '{mode}' storage "
+                f"({db_before - db_after} bytes saved in the database, "
+                f"{payload_before - payload_after:.0f} bytes less per search hit)."
+            )
+        )
+        if connection.vendor == "postgresql":
+            self.stdout.write(f"Run VACUUM FULL {DocumentEmbedding._meta.db_table} to return the space to the OS.")
+
+    def _convert(self, client, batch, mode):
+        collection = settings.QDRANT["COLLECTION"]
+        # Un seul appel : texte du payload et liste des points réellement présents dans Qdrant.
+        remote = fetch_payload_texts(client, [str(entry.point_id) for entry in batch])
+        texts = {entry.pk: entry.chunk_text or remote.get(str(entry.point_id), "") for entry in batch}
+        indexed = [entry for entry in batch if str(entry.point_id) in remote]
+        point_ids = [str(entry.point_id) for entry in indexed]
+
+        def update_rows():
+            for entry in batch:
+                # Un chunk sans point Qdrant garde son texte en base, même en mode "payload".
+                entry_mode = STORAGE_DATABASE if str(entry.point_id) not in remote else mode
+                for field, value in embedding_text_fields(texts[entry.pk], entry_mode).items():
+                    setattr(entry, field, value)
+            DocumentEmbedding.objects.bulk_update(batch, ["text", "compressed_text"])
+
+        if mode == STORAGE_DATABASE:
+            # La base d'abord : le texte n'est retiré de Qdrant qu'une fois sauvegardé.
+            update_rows()
+            if point_ids:
+                client.delete_payload(
+                    collection_name=collection,
+                    keys=["text", *DENORMALIZED_PAYLOAD_KEYS],
+                    points=point_ids,
+                )
+            return len(batch)
+
+        if point_ids:
+            client.batch_update_points(
+                collection_name=collection,
+                update_operations=[
+                    qmodels.SetPayloadOperation(
+                        set_payload=qmodels.SetPayload(
+                            payload=build_payload(
+                                entry.document,
+                                entry.chunk_index,
+                                entry.page_number,
+                                texts[entry.pk],
+                                entry.document.tag.name if entry.document.tag else None,
+                                mode,
+                                boxes=entry.boxes,
+                            ),
+                            points=[str(entry.point_id)],
+                        )
+                    )
+                    for entry in indexed
+                ],
+            )
+            if mode != STORAGE_BOTH:
+                client.delete_payload(collection_name=collection, keys=DENORMALIZED_PAYLOAD_KEYS, points=point_ids)
+        update_rows()
+        return len(batch)
@@ -0,0 +1,126 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from qdrant_client.http import models as qmodels
+
+from library.models import ChunkBand, DocumentEmbedding
+from library.services.chunk_storage import fetch_payload_texts
+from library.services.dedup import (
+    band_rows,
+    decode_signature,
+    duplicate_text_fields,
+    encode_signature,
+    find_duplicates,
+    refresh_shared_points,
+    signature,
+)
+from library.services.document_processing import get_qdrant_client
+from library.services.vector_spaces import vector_size, write_spaces
+
+
+class Command(BaseCommand):
+    help = (
+        "Détecte les chunks quasi identiques des documents généraux déjà indexés (MinHash/LSH), "
+        "ne garde qu'un point Qdrant par groupe et mesure la réduction de l'index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Calcule et mesure sans rien modifier (base annulée, Qdrant intact).",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Recalcule toutes les signatures (après un changement de NUM_PERM, BANDS ou SHINGLE_SIZE).",
+        )
+
+    def handle(self, *args, **options):
+        client = get_qdrant_client()
+        collection = settings.QDRANT["COLLECTION"]
+        points_before = client.count(collection_name=collection, exact=True).count
+        dry_run = options["dry_run"]
+
+        with transaction.atomic():
+            if options["rebuild"]:
+                ChunkBand.objects.all().delete()
+                DocumentEmbedding.objects.filter(canonical__isnull=True).update(minhash=None)
+            # Plus ancien d'abord : la première édition d'un texte reste le chunk canonique.
+            pending = list(
+                DocumentEmbedding.objects.filter(
+                    document__source="general",
+                    canonical__isnull=True,
+                    bands__isnull=True,
+                )
+                .order_by("document__date_added", "document_id", "chunk_index")
+                .values_list("pk", flat=True)
+            )
+            processed = removed = 0
+            for start in range(0, len(pending), options["batch_size"]):
+                batch = list(
+                    DocumentEmbedding.objects.filter(pk__in=pending[start:start + options["batch_size"]])
+                    .order_by("document__date_added", "document_id", "chunk_index")
+                )
+                removed += self._deduplicate(client, batch, dry_run)
+                processed += len(batch)
+                self.stdout.write(f"{processed}/{len(pending)} chunks scanned, {removed} duplicates")
+            if dry_run:
+                transaction.set_rollback(True)
+
+        points_after = points_before - removed
+        bytes_per_point = sum(vector_size(space) for space in write_spaces()) * 4
+        ratio = removed / points_before * 100 if points_before else 0.0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{'Would remove' if dry_run else 'Removed'} {removed} of {points_before} points "
+                f"({ratio:.1f}%): {points_before} -> {points_after} points, "
+                f"~{removed * bytes_per_point / 1024 / 1024:.1f} MiB of vectors."
+            )
+        )
+
+    def _deduplicate(self, client, batch, dry_run):
+        missing = [str(entry.point_id) for entry in batch if not entry.chunk_text]
+        remote = fetch_payload_texts(client, missing) if missing else {}
+        texts = [entry.chunk_text or remote.get(str(entry.point_id), "") for entry in batch]
+        signatures = [
+            decode_signature(entry.minhash) if entry.minhash is not None else signature(text)
+            for entry, text in zip(batch, texts)
+        ]
+        matches = find_duplicates(signatures)
+
+        removed_points, shared = [], set()
+        bands = []
+        for entry, text, sig, match in zip(batch, texts, signatures, matches):
+            entry.minhash = encode_signature(sig) if sig is not None else None
+            if match is None:
+                if sig is not None:
+                    bands.extend(band_rows(entry.pk, sig))
+                continue
+            canonical = batch[match.position] if match.position is not None else None
+            entry.canonical_id = canonical.pk if canonical else match.embedding_id
+            # Le texte ne peut plus être lu dans le payload d'un point supprimé.
+            for field, value in duplicate_text_fields(text).items():
+                setattr(entry, field, value)
+            removed_points.append(str(entry.point_id))
+            shared.add(str(canonical.point_id) if canonical else match.point_id)
+        DocumentEmbedding.objects.bulk_update(batch, ["minhash", "canonical", "text", "compressed_text"])
+        converted = {entry.pk: entry.canonical_id for entry in batch if entry.canonical_id is not None}
+        # Doublons rattachés à un chunk devenu lui-même doublon (passage précédent, --rebuild).
+        for holder in set(
+            DocumentEmbedding.objects.filter(canonical_id__in=converted).values_list("canonical_id", flat=True)
+        ):
+            DocumentEmbedding.objects.filter(canonical_id=holder).update(canonical_id=converted[holder])
+        ChunkBand.objects.bulk_create(bands, batch_size=2000)
+        if removed_points and not dry_run:
+            # Qdrant n'est pas transactionnel : on n'y touche qu'une fois la base validée.
+            transaction.on_commit(lambda: self._apply(client, removed_points, shared))
+        return len(removed_points)
+
+    def _apply(self, client, removed_points, shared):
+        client.delete(
+            collection_name=settings.QDRANT["COLLECTION"],
+            points_selector=qmodels.PointIdsList(points=removed_points),
+        )
+        refresh_shared_points(client, shared)
@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from qdrant_client.http import models as qmodels
+
+from library.services.document_processing import get_qdrant_client
+from library.services.vector_spaces import (
+    ACTIVE_SETTING_KEY,
+    CANDIDATE_SETTING_KEY,
+    active_space,
+    candidate_space,
+    collection_vector_names,
+    configured_models,
+)
+from users.models import Setting
+
+
+class Command(BaseCommand):
+    help = (
+        "Pilote la migration entre modèles d'embedding : déclare un espace candidat "
+        "(double écriture + requêtes fantômes), puis bascule la recherche vers lui."
+    )
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument("--candidate", metavar="SPACE", help="Espace alimenté en parallèle de l'actif.")
+        group.add_argument("--clear-candidate", action="store_true", help="Arrête la double écriture.")
+        group.add_argument("--activate", metavar="SPACE", help="Fait servir la recherche par cet espace.")
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Active l'espace même si des points n'ont pas encore son vecteur.",
+        )
+
+    def _check(self, space, complete=False, force=False):
+        """L'espace doit exister dans la collection et, pour servir la recherche, sur chaque point."""
+        if space not in configured_models():
+            raise CommandError(
+                f"Unknown vector space '{space}' (declared: {', '.join(configured_models())})."
+            )
+        client = get_qdrant_client()
+        names = collection_vector_names(client)
+        if names is None:
+            raise CommandError("The collection has no named vectors yet: run reindex_library first.")
+        if space not in names:
+            raise CommandError(f"The collection has no '{space}' vector: run reindex_library first.")
+        if not complete:
+            return
+        # Un point sans ce vecteur disparaîtrait des résultats une fois l'espace actif.
+        missing = client.count(
+            collection_name=settings.QDRANT["COLLECTION"],
+            count_filter=qmodels.Filter(must_not=[qmodels.HasVectorCondition(has_vector=space)]),
+            exact=True,
+        ).count
+        if not missing:
+            return
+        message = f"{missing} points have no '{space}' vector and would drop out of search"
+        if not force:
+            raise CommandError(f"{message}: run reindex_library first (or pass --force).")
+        self.stderr.write(self.style.WARNING(f"{message}."))
+
+    def handle(self, *args, **options):
+        if options["candidate"]:
+            self._check(options["candidate"])
+            Setting.set_value(CANDIDATE_SETTING_KEY, options["candidate"])
+        elif options["clear_candidate"]:
+            Setting.objects.filter(key=CANDIDATE_SETTING_KEY).delete()
+        elif options["activate"]:
+            self._check(options["activate"], complete=True, force=options["force"])
+            previous = active_space()
+            Setting.set_value(ACTIVE_SETTING_KEY, options["activate"])
+            if Setting.get_value(CANDIDATE_SETTING_KEY) == options["activate"]:
+                # L'ancien actif devient candidat : la double écriture continue pour un retour arrière.
+                Setting.set_value(CANDIDATE_SETTING_KEY, previous)
+
+        self.stdout.write(f"Active vector space:    {active_space()}")
+        self.stdout.write(f"Candidate vector space: {candidate_space() or '-'}")
+        for space, model_name in configured_models().items():
+            self.stdout.write(f"  {space}: {model_name}")
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from library.models import PageExtraction
+from library.services.extraction_cache import EXTRACTOR_VERSION
+
+
+class Command(BaseCommand):
+    help = "Supprime les entrées du cache d'extraction des documents supprimés."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--stale-versions",
+            action="store_true",
+            help=f"Supprime aussi les entrées produites par une autre version que {EXTRACTOR_VERSION}.",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        queryset = PageExtraction.objects.filter(document__isnull=True)
+        if options["stale_versions"]:
+            queryset = queryset | PageExtraction.objects.exclude(extractor_version=EXTRACTOR_VERSION)
+        if options["dry_run"]:
+            self.stdout.write(f"{queryset.count()} cached pages would be deleted.")
+            return
+        deleted, _ = queryset.delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} cached pages."))
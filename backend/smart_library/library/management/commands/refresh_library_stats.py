@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q
+
+from library.models import Document
+from library.services.stats import library_stats, rebuild_library_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule les statistiques agrégées de la bibliothèque (à lancer après une "
+        "modification hors application) ; --recount recalcule aussi les colonnes des documents."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--recount",
+            action="store_true",
+            help="Recompte chunks et pages depuis document_embeddings (requête lourde).",
+        )
+
+    def handle(self, *args, **options):
+        if options["recount"]:
+            # Les chunks d'une réindexation en attente ne comptent pas encore.
+            live = Q(embeddings__reindex_run__isnull=True)
+            counts = Document.objects.annotate(
+                chunks=Count("embeddings", filter=live),
+                pages=Count("embeddings__page_number", filter=live, distinct=True),
+            ).values_list("pk", "chunks", "pages")
+            for pk, chunks, pages in counts.iterator(chunk_size=500):
+                Document.objects.filter(pk=pk).update(chunk_count=chunks, page_count=pages)
+        rebuild_library_stats()
+        summary = library_stats()
+        self.stdout.write(self.style.SUCCESS(f"Library stats rebuilt: {summary['documents']}"))
@@ -0,0 +1,196 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from library.models import Document, DocumentEmbedding, ReindexRun
+from library.services.document_processing import (
+    adopt_collection_alias,
+    create_vector_collection,
+    discard_staged_embeddings,
+    get_qdrant_client,
+    is_physical_collection,
+    promote_staged_embeddings,
+    switch_collection_alias,
+    versioned_collection_name,
+)
+from library.services.scheduler import IngestionScheduler, Priority
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Réindexe toute la bibliothèque dans une nouvelle collection Qdrant (chunking et modèle "
+        "courants), avec reprise sur point de contrôle, puis bascule l'alias QDRANT['COLLECTION']."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2, help="Threads d'extraction en parallèle.")
+        parser.add_argument("--batch-size", type=int, default=16, help="Documents par lot d'embedding.")
+        parser.add_argument("--pause", type=float, default=0.0, help="Pause (s) entre deux lots.")
+        parser.add_argument(
+            "--max-docs-per-minute",
+            type=int,
+            default=0,
+            help="Plafond de débit pour préserver la latence de la recherche (0 = illimité).",
+        )
+        parser.add_argument(
+            "--embedding-threads",
+            type=int,
+            default=0,
+            help="Nombre de threads PyTorch pour l'embedding (0 = défaut).",
+        )
+        parser.add_argument("--restart", action="store_true", help="Abandonne la réindexation en cours.")
+        parser.add_argument(
+            "--drop-old",
+            action="store_true",
+            help="Supprime l'ancienne collection après la bascule de l'alias.",
+        )
+        parser.add_argument(
+            "--adopt-alias",
+            action="store_true",
+            help=(
+                "Étape préalable unique : recopie la collection QDRANT['COLLECTION'] puis la remplace "
+                "par un alias vers la copie (courte coupure de la recherche)."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        client = get_qdrant_client()
+        alias = settings.QDRANT["COLLECTION"]
+        if options["adopt_alias"]:
+            copy = adopt_collection_alias(client, alias)
+            self.stdout.write(self.style.SUCCESS(f"Alias {alias} -> {copy}"))
+            return
+        if is_physical_collection(client, alias):
+            # Vérifié avant de réindexer : la bascule finale exige un alias.
+            raise CommandError(
+                f"'{alias}' is a collection, not an alias: run `reindex_library --adopt-alias` first."
+            )
+        run = ReindexRun.objects.filter(status='running').first()
+        if run and options["restart"]:
+            self.stdout.write(f"Abandoning run {run.pk} ({run.target_collection})")
+            if client.collection_exists(run.target_collection):
+                client.delete_collection(run.target_collection)
+            discard_staged_embeddings(run)
+            run.status = 'abandoned'
+            run.finished_at = timezone.now()
+            run.save(update_fields=['status', 'finished_at'])
+            run = None
+
+        if run is None:
+            target = versioned_collection_name(alias)
+            create_vector_collection(client, target)
+            run = ReindexRun.objects.create(target_collection=target)
+            self.stdout.write(f"Reindexing into {target}")
+        else:
+            if not client.collection_exists(run.target_collection):
+                create_vector_collection(client, run.target_collection)
+            self.stdout.write(
+                f"Resuming run {run.pk} into {run.target_collection} after {run.last_document_id}"
+            )
+
+        if options["embedding_threads"]:
+            import torch
+
+            torch.set_num_threads(options["embedding_threads"])
+
+        queryset = Document.objects.select_related("tag").filter(status='indexed').order_by("pk")
+        if run.last_document_id:
+            queryset = queryset.filter(pk__gt=run.last_document_id)
+
+        scheduler = IngestionScheduler(extraction_workers=options["workers"])
+        batch = []
+        for document in queryset.iterator(chunk_size=options["batch_size"] * 4):
+            batch.append(document)
+            if len(batch) >= options["batch_size"]:
+                self._process_batch(run, batch, scheduler, options)
+                batch = []
+        if batch:
+            self._process_batch(run, batch, scheduler, options)
+
+        # Les documents (ré)indexés pendant la réindexation sont écrits aussi dans la cible
+        # (voir index_document_group) ; on repasse ceux qui y manquent encore.
+        missed = self._missed_documents(client, run)
+        if missed:
+            self.stdout.write(f"Catching up {len(missed)} documents indexed during the run")
+            self._process_batch(run, missed, scheduler, options, checkpoint=False)
+
+        previous = switch_collection_alias(client, alias, run.target_collection)
+        self.stdout.write(f"Alias {alias} -> {run.target_collection}")
+        # Les chunks restent lisibles par point_id pendant l'échange (voir hydrate_hits).
+        promoted = promote_staged_embeddings(run)
+        self.stdout.write(f"Swapped chunks of {promoted} documents")
+        if previous and previous != run.target_collection and options["drop_old"]:
+            client.delete_collection(previous)
+            self.stdout.write(f"Dropped {previous}")
+
+        run.status = 'completed'
+        run.finished_at = timezone.now()
+        run.save(update_fields=['status', 'finished_at'])
+        self.stdout.write(
+            self.style.SUCCESS(f"Reindexed {run.processed_count} documents ({run.failed_count} failed).")
+        )
+
+    def _missed_documents(self, client, run):
+        """Documents dont les chunks actifs datent de la réindexation mais absents de sa cible.
+
+        La double écriture ne couvre pas un lot commencé juste avant la création de ``run``.
+        """
+        candidates = list(
+            Document.objects.filter(
+                status='indexed',
+                embeddings__reindex_run__isnull=True,
+                embeddings__created_at__gte=run.started_at,
+            )
+            .exclude(pk__in=DocumentEmbedding.all_objects.filter(reindex_run=run).values("document_id"))
+            .values_list("pk", flat=True)
+            .distinct()
+        )
+        if not candidates:
+            return []
+        sample = {}
+        for document_id, point_id in DocumentEmbedding.objects.filter(
+            document_id__in=candidates, canonical__isnull=True
+        ).values_list("document_id", "point_id"):
+            sample.setdefault(document_id, str(point_id))
+        found = client.retrieve(
+            collection_name=run.target_collection,
+            ids=list(sample.values()),
+            with_payload=False,
+            with_vectors=False,
+        )
+        present = {str(point.id) for point in found}
+        missing = [pk for pk in candidates if sample.get(pk) not in present]
+        return list(Document.objects.select_related("tag").filter(pk__in=missing).order_by("pk"))
+
+    def _process_batch(self, run, batch, scheduler, options, checkpoint=True):
+        started = time.monotonic()
+        outcome = scheduler.run(
+            batch,
+            Priority.REINDEX,
+            target_collection=run.target_collection,
+            update_status=False,
+        )
+        failed = sum(1 for error in outcome.values() if error is not None)
+        for document_id, error in outcome.items():
+            if error is not None:
+                logger.warning("Reindex skipped %s: %s", document_id, error)
+
+        run.processed_count += len(outcome) - failed
+        run.failed_count += failed
+        update_fields = ['processed_count', 'failed_count']
+        if checkpoint:
+            run.last_document_id = batch[-1].pk
+            update_fields.append('last_document_id')
+        run.save(update_fields=update_fields)
+        self.stdout.write(f"  {run.processed_count} done, {run.failed_count} failed")
+
+        min_duration = 0.0
+        if options["max_docs_per_minute"]:
+            min_duration = len(batch) * 60.0 / options["max_docs_per_minute"]
+        remaining = min_duration - (time.monotonic() - started)
+        time.sleep(max(remaining, 0.0) + options["pause"])
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:42
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0006_ingestionjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255, verbose_name='Nom du fichier')),
+                ('total_size', models.PositiveBigIntegerField(verbose_name='Taille totale')),
+                ('received_bytes', models.PositiveBigIntegerField(default=0, verbose_name='Octets reçus')),
+                ('checksum', models.CharField(max_length=64, verbose_name='SHA-256 attendu')),
+                ('storage_name', models.CharField(max_length=255, verbose_name='Fichier partiel')),
+                ('metadata', models.JSONField(blank=True, default=dict, verbose_name='Métadonnées du document')),
+                ('status', models.CharField(choices=[('open', 'Open'), ('completed', 'Completed'), ('aborted', 'Aborted')], default='open', max_length=20, verbose_name='Statut')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('document', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload_sessions', to='library.document', verbose_name='Document')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL, verbose_name='Propriétaire')),
+            ],
+            options={
+                'verbose_name': 'Session de téléversement',
+                'verbose_name_plural': 'Sessions de téléversement',
+                'db_table': 'upload_sessions',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0007_uploadsession'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PageExtraction',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('file_hash', models.CharField(max_length=64, verbose_name='SHA-256 du fichier')),
+                ('extractor_version', models.CharField(max_length=20, verbose_name="Version de l'extracteur")),
+                ('ocr_languages', models.CharField(blank=True, max_length=100, verbose_name='Langues OCR')),
+                ('page_number', models.PositiveIntegerField()),
+                ('compressed_text', models.BinaryField(verbose_name='Texte compressé')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('document', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='page_extractions', to='library.document', verbose_name='Document')),
+            ],
+            options={
+                'verbose_name': 'Extraction de page',
+                'verbose_name_plural': 'Extractions de pages',
+                'db_table': 'page_extractions',
+                'ordering': ['file_hash', 'page_number'],
+                'unique_together': {('file_hash', 'extractor_version', 'ocr_languages', 'page_number')},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0008_pageextraction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReindexRun',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('target_collection', models.CharField(max_length=255, verbose_name='Collection cible')),
+                ('status', models.CharField(choices=[('running', 'Running'), ('completed', 'Completed'), ('abandoned', 'Abandoned')], default='running', max_length=20, verbose_name='Statut')),
+                ('last_document_id', models.UUIDField(blank=True, null=True, verbose_name='Dernier document traité')),
+                ('processed_count', models.PositiveIntegerField(default=0)),
+                ('failed_count', models.PositiveIntegerField(default=0)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Réindexation',
+                'verbose_name_plural': 'Réindexations',
+                'db_table': 'reindex_runs',
+                'ordering': ['-started_at'],
+            },
+        ),
+    ]
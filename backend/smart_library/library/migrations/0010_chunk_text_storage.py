@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0009_reindexrun'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentembedding',
+            name='compressed_text',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='documentembedding',
+            name='text',
+            field=models.TextField(blank=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0010_chunk_text_storage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['source', 'status'], name='documents_source_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(condition=models.Q(('source', 'general'), ('status', 'uploaded')), fields=['-date_added'], name='documents_awaiting_idx'),
+        ),
+    ]
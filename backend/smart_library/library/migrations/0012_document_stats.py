@@ -0,0 +1,85 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:07
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_document_stats(apps, schema_editor):
+    Document = apps.get_model('library', 'Document')
+    LibraryStats = apps.get_model('library', 'LibraryStats')
+    counts = Document.objects.annotate(
+        chunks=Count('embeddings'),
+        pages=Count('embeddings__page_number', distinct=True),
+    ).values_list('pk', 'chunks', 'pages')
+    for pk, chunks, pages in counts.iterator(chunk_size=500):
+        if chunks:
+            Document.objects.filter(pk=pk).update(chunk_count=chunks, page_count=pages)
+    totals = Document.objects.values('source', 'status').annotate(
+        document_count=Count('pk'),
+        chunks=Sum('chunk_count'),
+        pages=Sum('page_count'),
+    ).order_by()
+    LibraryStats.objects.bulk_create(
+        [
+            LibraryStats(
+                source=row['source'],
+                status=row['status'],
+                document_count=row['document_count'],
+                chunk_count=row['chunks'] or 0,
+                page_count=row['pages'] or 0,
+            )
+            for row in totals
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0011_approval_queue_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='char_count',
+            field=models.PositiveBigIntegerField(default=0, verbose_name='Nombre de caractères'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='chunk_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Nombre de chunks'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='page_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Nombre de pages avec texte'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='processing_ms',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Durée de traitement (ms)'),
+        ),
+        migrations.CreateModel(
+            name='LibraryStats',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('source', models.CharField(choices=[('general', 'General'), ('personal', 'Personal')], max_length=20)),
+                ('status', models.CharField(choices=[('pending_meta', 'Pending Metadata'), ('uploaded', 'Uploaded'), ('processed', 'Processed'), ('indexed', 'Indexed')], max_length=20)),
+                ('document_count', models.BigIntegerField(default=0)),
+                ('chunk_count', models.BigIntegerField(default=0)),
+                ('page_count', models.BigIntegerField(default=0)),
+                ('char_count', models.BigIntegerField(default=0)),
+                ('processing_ms', models.BigIntegerField(default=0)),
+                ('processed_documents', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Statistiques de la bibliothèque',
+                'verbose_name_plural': 'Statistiques de la bibliothèque',
+                'db_table': 'library_stats',
+                'ordering': ['source', 'status'],
+                'unique_together': {('source', 'status')},
+            },
+        ),
+        migrations.RunPython(backfill_document_stats, migrations.RunPython.noop),
+    ]
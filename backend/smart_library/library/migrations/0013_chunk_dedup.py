@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0012_document_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentembedding',
+            name='canonical',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='library.documentembedding'),
+        ),
+        migrations.AddField(
+            model_name='documentembedding',
+            name='minhash',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ChunkBand',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('band', models.PositiveSmallIntegerField()),
+                ('value', models.BigIntegerField()),
+                ('embedding', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bands', to='library.documentembedding')),
+            ],
+            options={
+                'verbose_name': 'Bande LSH',
+                'verbose_name_plural': 'Bandes LSH',
+                'db_table': 'chunk_lsh_bands',
+                'ordering': ['embedding', 'band'],
+                'indexes': [models.Index(fields=['value', 'band'], name='chunk_bands_value_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0013_chunk_dedup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentembedding',
+            name='boxes',
+            field=models.JSONField(blank=True, null=True, verbose_name='Zones sur la page'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:02
+
+import django.db.models.deletion
+import django.db.models.manager
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0014_documentembedding_boxes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='documentembedding',
+            options={'base_manager_name': 'all_objects', 'ordering': ['chunk_index'], 'verbose_name': 'Chunk de document', 'verbose_name_plural': 'Chunks de documents'},
+        ),
+        migrations.AlterModelManagers(
+            name='documentembedding',
+            managers=[
+                ('objects', django.db.models.manager.Manager()),
+                ('all_objects', django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='documentembedding',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='documentembedding',
+            name='reindex_run',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='staged_embeddings', to='library.reindexrun', verbose_name='Réindexation en cours'),
+        ),
+        migrations.AddConstraint(
+            model_name='documentembedding',
+            constraint=models.UniqueConstraint(condition=models.Q(('reindex_run__isnull', True)), fields=('document', 'chunk_index'), name='document_embeddings_live_chunk'),
+        ),
+        migrations.AddConstraint(
+            model_name='documentembedding',
+            constraint=models.UniqueConstraint(condition=models.Q(('reindex_run__isnull', False)), fields=('document', 'reindex_run', 'chunk_index'), name='document_embeddings_staged_chunk'),
+        ),
+    ]
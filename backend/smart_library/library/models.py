@@ -1,5 +1,6 @@
 import os
 import uuid
+import zlib
 
 from django.conf import settings
 from django.db import models
@@ -69,12 +70,28 @@ class Document(models.Model):
     )
     date_added = models.DateTimeField(auto_now_add=True, verbose_name="Date d'ajout")
     path = models.TextField(blank=True, verbose_name="Chemin du fichier")
+    # Agrégats maintenus à l'indexation (évitent les COUNT sur document_embeddings)
+    chunk_count = models.PositiveIntegerField(default=0, verbose_name="Nombre de chunks")
+    page_count = models.PositiveIntegerField(default=0, verbose_name="Nombre de pages avec texte")
+    char_count = models.PositiveBigIntegerField(default=0, verbose_name="Nombre de caractères")
+    processing_ms = models.PositiveIntegerField(null=True, blank=True, verbose_name="Durée de traitement (ms)")
     
     class Meta:
         db_table = 'documents'
         verbose_name = "Document"
         verbose_name_plural = "Documents"
         ordering = ['-date_added']
+        indexes = [
+            models.Index(fields=['-date_added'], name='documents_date_added_idx'),
+            models.Index(fields=['owner', '-date_added'], name='documents_owner_date_idx'),
+            models.Index(fields=['source', 'status'], name='documents_source_status_idx'),
+            # File de validation : seules les lignes en attente sont indexées.
+            models.Index(
+                fields=['-date_added'],
+                condition=models.Q(source='general', status='uploaded'),
+                name='documents_awaiting_idx',
+            ),
+        ]
     
     def __str__(self):
         return self.title
@@ -128,11 +145,22 @@ class Favorite(models.Model):
         verbose_name_plural = "Favoris"
         ordering = ['-created_at']
         unique_together = ['user', 'document']
+        indexes = [
+            models.Index(fields=['-created_at'], name='favorites_created_idx'),
+            models.Index(fields=['user', '-created_at'], name='favorites_user_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.name} - {self.document.title}"
 
 
+class LiveEmbeddingManager(models.Manager):
+    """Chunks servis par la collection active : sans ceux préparés par une réindexation."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(reindex_run__isnull=True)
+
+
 class DocumentEmbedding(models.Model):
     """Stocke les métadonnées des chunks indexés dans Qdrant."""
 
@@ -145,15 +173,265 @@ class DocumentEmbedding(models.Model):
     )
     chunk_index = models.PositiveIntegerField()
     page_number = models.PositiveIntegerField(null=True, blank=True)
-    text = models.TextField()
+    # Selon DOCUMENT_PROCESSING["CHUNK_TEXT_STORAGE"], le texte est ici en clair, ici
+    # compressé (zlib) ou uniquement dans le payload Qdrant.
+    text = models.TextField(blank=True)
+    compressed_text = models.BinaryField(null=True, blank=True)
+    # Déduplication (voir services.dedup) : signature MinHash du chunk et, pour un
+    # quasi-doublon, le chunk canonique dont il partage le point Qdrant.
+    minhash = models.BinaryField(null=True, blank=True)
+    canonical = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='duplicates',
+    )
+    # Extraction PDF ``layout`` : zones [x0, y0, x1, y1] (points PDF) couvertes sur la page.
+    boxes = models.JSONField(null=True, blank=True, verbose_name="Zones sur la page")
+    # Chunk écrit par une réindexation dans sa collection cible : il remplace les chunks
+    # actifs du document à la bascule de l'alias (voir ``promote_staged_embeddings``).
+    reindex_run = models.ForeignKey(
+        'ReindexRun',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='staged_embeddings',
+        verbose_name="Réindexation en cours",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = LiveEmbeddingManager()
+    all_objects = models.Manager()
+
     class Meta:
         db_table = 'document_embeddings'
         verbose_name = "Chunk de document"
         verbose_name_plural = "Chunks de documents"
         ordering = ['chunk_index']
-        unique_together = ('document', 'chunk_index')
+        base_manager_name = 'all_objects'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['document', 'chunk_index'],
+                condition=models.Q(reindex_run__isnull=True),
+                name='document_embeddings_live_chunk',
+            ),
+            models.UniqueConstraint(
+                fields=['document', 'reindex_run', 'chunk_index'],
+                condition=models.Q(reindex_run__isnull=False),
+                name='document_embeddings_staged_chunk',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.document.title} [chunk {self.chunk_index}]"
+
+    @property
+    def chunk_text(self) -> str:
+        """Texte du chunk stocké en base (vide s'il n'est conservé que dans Qdrant)."""
+        if self.text:
+            return self.text
+        if self.compressed_text is not None:
+            return zlib.decompress(bytes(self.compressed_text)).decode("utf-8")
+        return ""
+
+
+class ChunkBand(models.Model):
+    """Bande LSH d'une signature MinHash : retrouve les chunks canoniques candidats par index."""
+
+    id = models.BigAutoField(primary_key=True)
+    embedding = models.ForeignKey(
+        DocumentEmbedding,
+        on_delete=models.CASCADE,
+        related_name='bands',
+    )
+    band = models.PositiveSmallIntegerField()
+    value = models.BigIntegerField()
+
+    class Meta:
+        db_table = 'chunk_lsh_bands'
+        verbose_name = "Bande LSH"
+        verbose_name_plural = "Bandes LSH"
+        ordering = ['embedding', 'band']
+        indexes = [
+            models.Index(fields=['value', 'band'], name='chunk_bands_value_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.embedding_id} [{self.band}]"
+
+
+class IngestionJob(models.Model):
+    """Suivi d'un import en masse de documents traité par lots."""
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='ingestion_jobs',
+        verbose_name="Propriétaire"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending',
+        verbose_name="Statut"
+    )
+    total_files = models.PositiveIntegerField(default=0)
+    processed_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    results = models.JSONField(default=list, blank=True, verbose_name="Résultats par fichier")
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'ingestion_jobs'
+        verbose_name = "Import de documents"
+        verbose_name_plural = "Imports de documents"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.id} ({self.status})"
+
+
+class UploadSession(models.Model):
+    """Téléversement reprenable : les parties sont ajoutées au fichier jusqu'à la finalisation."""
+
+    STATUS_CHOICES = [
+        ('open', 'Open'),
+        ('completed', 'Completed'),
+        ('aborted', 'Aborted'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions',
+        verbose_name="Propriétaire"
+    )
+    filename = models.CharField(max_length=255, verbose_name="Nom du fichier")
+    total_size = models.PositiveBigIntegerField(verbose_name="Taille totale")
+    received_bytes = models.PositiveBigIntegerField(default=0, verbose_name="Octets reçus")
+    checksum = models.CharField(max_length=64, verbose_name="SHA-256 attendu")
+    storage_name = models.CharField(max_length=255, verbose_name="Fichier partiel")
+    metadata = models.JSONField(default=dict, blank=True, verbose_name="Métadonnées du document")
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='open',
+        verbose_name="Statut"
+    )
+    document = models.ForeignKey(
+        Document,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='upload_sessions',
+        verbose_name="Document"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'upload_sessions'
+        verbose_name = "Session de téléversement"
+        verbose_name_plural = "Sessions de téléversement"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.filename} ({self.received_bytes}/{self.total_size})"
+
+
+class PageExtraction(models.Model):
+    """Cache du texte brut extrait d'une page (PDF ou OCR), compressé avec zlib."""
+
+    id = models.BigAutoField(primary_key=True)
+    document = models.ForeignKey(
+        Document,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='page_extractions',
+        verbose_name="Document"
+    )
+    file_hash = models.CharField(max_length=64, verbose_name="SHA-256 du fichier")
+    extractor_version = models.CharField(max_length=20, verbose_name="Version de l'extracteur")
+    ocr_languages = models.CharField(max_length=100, blank=True, verbose_name="Langues OCR")
+    page_number = models.PositiveIntegerField()
+    compressed_text = models.BinaryField(verbose_name="Texte compressé")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'page_extractions'
+        verbose_name = "Extraction de page"
+        verbose_name_plural = "Extractions de pages"
+        ordering = ['file_hash', 'page_number']
+        unique_together = ('file_hash', 'extractor_version', 'ocr_languages', 'page_number')
+
+    def __str__(self):
+        return f"{self.file_hash[:12]} p.{self.page_number} ({self.extractor_version})"
+
+
+class LibraryStats(models.Model):
+    """Compteurs agrégés par (source, statut), tenus à jour à chaque écriture de document."""
+
+    id = models.AutoField(primary_key=True)
+    source = models.CharField(max_length=20, choices=Document.SOURCE_CHOICES)
+    status = models.CharField(max_length=20, choices=Document.STATUS_CHOICES)
+    document_count = models.BigIntegerField(default=0)
+    chunk_count = models.BigIntegerField(default=0)
+    page_count = models.BigIntegerField(default=0)
+    char_count = models.BigIntegerField(default=0)
+    processing_ms = models.BigIntegerField(default=0)
+    processed_documents = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'library_stats'
+        verbose_name = "Statistiques de la bibliothèque"
+        verbose_name_plural = "Statistiques de la bibliothèque"
+        ordering = ['source', 'status']
+        unique_together = ('source', 'status')
+
+    def __str__(self):
+        return f"{self.source}/{self.status}: {self.document_count}"
+
+
+class ReindexRun(models.Model):
+    """Point de reprise d'une réindexation complète de la bibliothèque."""
+
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('abandoned', 'Abandoned'),
+    ]
+
+    id = models.AutoField(primary_key=True)
+    target_collection = models.CharField(max_length=255, verbose_name="Collection cible")
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='running',
+        verbose_name="Statut"
+    )
+    last_document_id = models.UUIDField(null=True, blank=True, verbose_name="Dernier document traité")
+    processed_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'reindex_runs'
+        verbose_name = "Réindexation"
+        verbose_name_plural = "Réindexations"
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"{self.target_collection} ({self.status})"
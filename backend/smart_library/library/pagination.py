@@ -0,0 +1,29 @@
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """Pagination par curseur (keyset), active par défaut.
+
+    La réponse prend la forme ``{next, previous, results}`` avec ``page_size`` éléments
+    (50 par défaut, 500 au plus) et chaque page est lue via un filtre sur la colonne
+    d'ordre (indexée) plutôt qu'un OFFSET. ``?paginate=false`` renvoie encore la liste
+    complète, pour les anciens clients uniquement : à éviter sur les grosses tables.
+    """
+
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    legacy_query_param = "paginate"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(self.legacy_query_param, "").lower() in {"0", "false", "no"}:
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
+class DocumentPagination(KeysetPagination):
+    ordering = "-date_added"
+
+
+class FavoritePagination(KeysetPagination):
+    ordering = "-created_at"
@@ -1,6 +1,26 @@
+import re
+
 from rest_framework import serializers
 
-from .models import Document, DocumentEmbedding, Favorite, Tag
+from .models import Document, DocumentEmbedding, Favorite, IngestionJob, Tag, UploadSession
+from .services.document_processing import detect_file_type
+from .services.uploads import start_upload_session
+
+
+class SparseFieldsMixin:
+    """Permet au client de restreindre les champs renvoyés via ``?fields=id,title``."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if request is None or request.method != "GET":
+            return
+        raw = request.query_params.get("fields")
+        if not raw:
+            return
+        wanted = {name.strip() for name in raw.split(",") if name.strip()}
+        for name in set(self.fields) - wanted:
+            self.fields.pop(name)
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -12,7 +32,7 @@ class TagSerializer(serializers.ModelSerializer):
         read_only_fields = ["id"]
 
 
-class DocumentSerializer(serializers.ModelSerializer):
+class DocumentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """CRUD serializer pour les documents."""
 
     class Meta:
@@ -29,25 +49,51 @@ class DocumentSerializer(serializers.ModelSerializer):
             "status",
             "date_added",
             "path",
+            "chunk_count",
+            "page_count",
+            "char_count",
+            "processing_ms",
+        ]
+        read_only_fields = [
+            "id",
+            "date_added",
+            "filename",
+            "path",
+            "status",
+            "owner",
+            "chunk_count",
+            "page_count",
+            "char_count",
+            "processing_ms",
         ]
-        read_only_fields = ["id", "date_added", "filename", "path", "status", "owner"]
         extra_kwargs = {
             "file": {"write_only": False, "required": False},
         }
 
 
-class FavoriteSerializer(serializers.ModelSerializer):
-    """CRUD serializer pour les favoris."""
+class LibraryDocumentSerializer(DocumentSerializer):
+    """Document de ``/api/me/library/`` avec le drapeau ``is_favorite`` annoté."""
+
+    is_favorite = serializers.BooleanField(read_only=True)
+
+    class Meta(DocumentSerializer.Meta):
+        fields = DocumentSerializer.Meta.fields + ["is_favorite"]
+
+
+class FavoriteSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """CRUD serializer pour les favoris de l'utilisateur courant."""
 
     class Meta:
         model = Favorite
         fields = ["id", "user", "document", "created_at"]
-        read_only_fields = ["id", "created_at"]
+        read_only_fields = ["id", "user", "created_at"]
 
 
 class DocumentEmbeddingSerializer(serializers.ModelSerializer):
     """Serializer pour exposer les chunks indexés d'un document."""
 
+    text = serializers.CharField(source="chunk_text", read_only=True)
+
     class Meta:
         model = DocumentEmbedding
         fields = [
@@ -56,3 +102,81 @@ class DocumentEmbeddingSerializer(serializers.ModelSerializer):
             "text",
         ]
         read_only_fields = fields
+
+
+class IngestionJobSerializer(serializers.ModelSerializer):
+    """Serializer en lecture seule pour suivre un import en masse."""
+
+    class Meta:
+        model = IngestionJob
+        fields = [
+            "id",
+            "owner",
+            "status",
+            "total_files",
+            "processed_count",
+            "failed_count",
+            "results",
+            "created_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Création et suivi d'un téléversement reprenable."""
+
+    title = serializers.CharField(write_only=True, required=False, max_length=255)
+    source = serializers.ChoiceField(choices=Document.SOURCE_CHOICES, write_only=True, required=False)
+    language = serializers.CharField(write_only=True, required=False, allow_blank=True, max_length=10)
+    tag = serializers.PrimaryKeyRelatedField(
+        queryset=Tag.objects.all(),
+        write_only=True,
+        required=False,
+        allow_null=True,
+    )
+
+    class Meta:
+        model = UploadSession
+        fields = [
+            "id",
+            "filename",
+            "total_size",
+            "received_bytes",
+            "checksum",
+            "status",
+            "document",
+            "metadata",
+            "created_at",
+            "title",
+            "source",
+            "language",
+            "tag",
+        ]
+        read_only_fields = ["id", "received_bytes", "status", "document", "metadata", "created_at"]
+
+    def validate_filename(self, value):
+        if detect_file_type(value) == "unknown":
+            raise serializers.ValidationError("Type de fichier non supporté.")
+        return value
+
+    def validate_checksum(self, value):
+        if not re.fullmatch(r"[0-9a-fA-F]{64}", value):
+            raise serializers.ValidationError("Empreinte SHA-256 hexadécimale attendue.")
+        return value
+
+    def create(self, validated_data):
+        tag = validated_data.pop("tag", None)
+        metadata = {
+            "title": validated_data.pop("title", ""),
+            "source": validated_data.pop("source", "personal"),
+            "language": validated_data.pop("language", ""),
+            "tag": tag.pk if tag else None,
+        }
+        return start_upload_session(
+            owner=validated_data["owner"],
+            filename=validated_data["filename"],
+            total_size=validated_data["total_size"],
+            checksum=validated_data["checksum"],
+            metadata=metadata,
+        )
@@ -0,0 +1,229 @@
+"""Vecteurs de document (centroïdes) pour la recherche de documents similaires.
+
+Chaque document indexé a un point dans ``QDRANT["CENTROID_COLLECTION"]`` : la moyenne
+normalisée des vecteurs de ses chunks, par espace d'embedding. Un quasi-doublon (voir
+``dedup``) compte avec le vecteur de son chunk canonique. Avec un seul point par
+document, une recherche de voisins reste une requête HNSW sur une petite collection,
+filtrée comme la recherche de passages (documents généraux et personnels du demandeur).
+"""
+import logging
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qmodels
+
+from library.models import Document, Favorite
+
+from .document_processing import get_qdrant_client
+from .search import build_search_filter
+from .vector_spaces import (
+    active_space,
+    collection_vector_names,
+    forget_collection_info,
+    vectors_config,
+)
+
+logger = logging.getLogger(__name__)
+
+PAYLOAD_INDEXES = ("source", "owner_id")
+
+_ready_collections: Set[str] = set()
+
+
+def centroid_collection() -> str:
+    return settings.QDRANT.get("CENTROID_COLLECTION") or f"{settings.QDRANT['COLLECTION']}_centroids"
+
+
+def ensure_centroid_collection(client: QdrantClient, recreate: bool = False) -> str:
+    """Crée la collection des centroïdes (un vecteur nommé par espace déclaré).
+
+    Elle n'est pas reconstruite quand un espace est ajouté : ``build_centroids --recreate``
+    s'en charge ; d'ici là, seuls les espaces qu'elle déclare sont écrits et interrogés.
+    """
+    name = centroid_collection()
+    if recreate and client.collection_exists(name):
+        client.delete_collection(name)
+        _ready_collections.discard(name)
+    if name in _ready_collections:
+        return name
+    if not client.collection_exists(name):
+        logger.info("Creating Qdrant collection '%s'", name)
+        client.create_collection(collection_name=name, vectors_config=vectors_config())
+        for field in PAYLOAD_INDEXES:
+            client.create_payload_index(name, field, field_schema=qmodels.PayloadSchemaType.KEYWORD)
+        forget_collection_info(name)
+    _ready_collections.add(name)
+    return name
+
+
+def centroid_spaces(client: QdrantClient) -> Set[str]:
+    """Espaces présents dans la collection des centroïdes."""
+    return collection_vector_names(client, ensure_centroid_collection(client)) or set()
+
+
+def mean_vector(vectors: Sequence[Sequence[float]]) -> Optional[List[float]]:
+    """Moyenne normalisée (norme 1) ou ``None`` sans vecteur exploitable."""
+    if not len(vectors):
+        return None
+    mean = np.asarray(vectors, dtype=np.float32).mean(axis=0)
+    norm = float(np.linalg.norm(mean))
+    return (mean / norm).tolist() if norm else None
+
+
+def fetch_point_vectors(
+    client: QdrantClient,
+    point_ids: Iterable[str],
+    spaces: List[str],
+    named: bool = True,
+    collection: Optional[str] = None,
+) -> Dict[str, Dict[str, List[float]]]:
+    """Vecteurs de points existants, par identifiant puis par espace."""
+    point_ids = list(point_ids)
+    if not point_ids:
+        return {}
+    points = client.retrieve(
+        collection_name=collection or settings.QDRANT["COLLECTION"],
+        ids=point_ids,
+        with_payload=False,
+        with_vectors=spaces if named else True,
+    )
+    return {
+        str(point.id): point.vector if isinstance(point.vector, dict) else {spaces[0]: point.vector}
+        for point in points
+    }
+
+
+def batch_centroids(
+    client: QdrantClient,
+    sizes: List[int],
+    matches: List,
+    vectors_by_space: Dict[str, List[List[float]]],
+    named: bool = True,
+) -> List[Dict[str, List[float]]]:
+    """Centroïde de chaque document d'un lot de ``index_document_group``.
+
+    ``sizes`` donne le nombre de chunks de chaque document dans l'ordre du lot et
+    ``matches`` le résultat de ``find_duplicates`` (``None`` : chunk vectorisé). Les
+    vecteurs des chunks canoniques hors lot sont relus dans Qdrant en une requête.
+    """
+    rows: Dict[int, int] = {}
+    for position, match in enumerate(matches):
+        if match is None:
+            rows[position] = len(rows)
+    spaces = list(vectors_by_space)
+    remote = fetch_point_vectors(
+        client,
+        {match.point_id for match in matches if match is not None and match.position is None},
+        spaces,
+        named,
+    )
+    centroids = []
+    start = 0
+    for size in sizes:
+        centroid = {}
+        for space, vectors in vectors_by_space.items():
+            chunk_vectors = []
+            for position in range(start, start + size):
+                match = matches[position]
+                if match is None:
+                    chunk_vectors.append(vectors[rows[position]])
+                elif match.position is not None:
+                    chunk_vectors.append(vectors[rows[match.position]])
+                elif remote.get(match.point_id, {}).get(space) is not None:
+                    chunk_vectors.append(remote[match.point_id][space])
+            mean = mean_vector(chunk_vectors)
+            if mean is not None:
+                centroid[space] = mean
+        centroids.append(centroid)
+        start += size
+    return centroids
+
+
+def upsert_centroids(
+    client: QdrantClient,
+    documents: List[Document],
+    centroids: List[Dict[str, List[float]]],
+) -> None:
+    name = ensure_centroid_collection(client)
+    spaces = centroid_spaces(client)
+    missing = {space for centroid in centroids for space in centroid} - spaces
+    if missing:
+        logger.warning(
+            "Centroid collection '%s' has no vector for %s: run build_centroids --recreate.",
+            name,
+            ", ".join(sorted(missing)),
+        )
+        centroids = [
+            {space: vector for space, vector in centroid.items() if space in spaces} for centroid in centroids
+        ]
+    points = [
+        qmodels.PointStruct(
+            id=str(document.pk),
+            vector=centroid,
+            payload={
+                "document_id": str(document.pk),
+                "source": document.source,
+                "owner_id": str(document.owner_id) if document.owner_id else None,
+            },
+        )
+        for document, centroid in zip(documents, centroids)
+        if centroid
+    ]
+    if points:
+        client.upsert(collection_name=name, points=points)
+
+
+def delete_centroids(client: QdrantClient, document_ids: Iterable) -> None:
+    client.delete(
+        collection_name=ensure_centroid_collection(client),
+        points_selector=qmodels.PointIdsList(points=[str(document_id) for document_id in document_ids]),
+    )
+
+
+def similar_documents(
+    document: Document,
+    user,
+    limit: int = 10,
+    source: Optional[str] = None,
+) -> List[Tuple[Document, float]]:
+    """Documents les plus proches de ``document`` visibles par ``user``, avec leur score.
+
+    Retourne une liste vide tant que le document n'a pas de centroïde (non indexé).
+    """
+    client = get_qdrant_client()
+    name = ensure_centroid_collection(client)
+    space = active_space()
+    if space not in centroid_spaces(client):
+        logger.warning(
+            "Centroid collection '%s' has no '%s' vector: run build_centroids --recreate.",
+            name,
+            space,
+        )
+        return []
+    found = client.retrieve(collection_name=name, ids=[str(document.pk)], with_vectors=[space])
+    vector = found[0].vector.get(space) if found and isinstance(found[0].vector, dict) else None
+    if vector is None:
+        return []
+    query_filter = build_search_filter(user, source)
+    query_filter.must_not = [qmodels.HasIdCondition(has_id=[str(document.pk)])]
+    response = client.query_points(
+        collection_name=name,
+        query=vector,
+        using=space,
+        query_filter=query_filter,
+        limit=limit,
+        with_payload=False,
+    )
+    scores = {str(point.id): point.score for point in response.points}
+    # Un point orphelin (document supprimé entre-temps) est simplement ignoré.
+    documents = {
+        str(pk): match
+        for pk, match in Document.objects.select_related("tag")
+        .annotate(is_favorite=Exists(Favorite.objects.filter(user=user, document=OuterRef("pk"))))
+        .in_bulk(list(scores))
+        .items()
+    }
+    return [(documents[pk], score) for pk, score in scores.items() if pk in documents]
@@ -0,0 +1,167 @@
+"""Emplacement du texte des chunks : Postgres (compressé), payload Qdrant ou les deux.
+
+``DOCUMENT_PROCESSING["CHUNK_TEXT_STORAGE"]`` :
+
+- ``"database"`` : texte compressé (zlib) dans ``DocumentEmbedding.compressed_text`` ;
+  le payload Qdrant ne garde que les champs de filtrage.
+- ``"payload"`` : texte uniquement dans le payload Qdrant.
+- ``"both"`` : comportement historique (texte en clair des deux côtés et métadonnées
+  du document recopiées dans le payload).
+
+Chaque ligne reste lisible quel que soit le réglage courant : un texte en clair, puis un
+texte compressé, puis le payload Qdrant sont essayés dans cet ordre.
+"""
+import json
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from qdrant_client import QdrantClient
+
+from library.models import Document, DocumentEmbedding
+
+STORAGE_DATABASE = "database"
+STORAGE_PAYLOAD = "payload"
+STORAGE_BOTH = "both"
+STORAGE_MODES = (STORAGE_DATABASE, STORAGE_PAYLOAD, STORAGE_BOTH)
+
+# Champs recopiés depuis le document, retirés du payload hors mode "both".
+DENORMALIZED_PAYLOAD_KEYS = ["document_title", "language", "tag"]
+
+
+def storage_mode() -> str:
+    mode = settings.DOCUMENT_PROCESSING.get("CHUNK_TEXT_STORAGE", STORAGE_BOTH)
+    if mode not in STORAGE_MODES:
+        raise ValueError(f"CHUNK_TEXT_STORAGE must be one of {', '.join(STORAGE_MODES)}.")
+    return mode
+
+
+def compress_text(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), 6)
+
+
+def embedding_text_fields(text: str, mode: Optional[str] = None) -> Dict:
+    """Valeurs des colonnes ``text``/``compressed_text`` d'un chunk selon le mode."""
+    mode = mode or storage_mode()
+    if mode == STORAGE_DATABASE:
+        return {"text": "", "compressed_text": compress_text(text)}
+    if mode == STORAGE_PAYLOAD:
+        return {"text": "", "compressed_text": None}
+    return {"text": text, "compressed_text": None}
+
+
+def build_payload(
+    document: Document,
+    chunk_index: int,
+    page_number: Optional[int],
+    text: str,
+    tag_name: Optional[str],
+    mode: Optional[str] = None,
+    boxes: Optional[List[List[float]]] = None,
+) -> Dict:
+    """Payload Qdrant d'un chunk : champs de filtrage et de localisation, plus le texte selon le mode."""
+    mode = mode or storage_mode()
+    payload = {
+        "document_id": str(document.id),
+        "chunk_index": chunk_index,
+        "page_number": page_number,
+        "source": document.source,
+        "owner_id": str(document.owner_id),
+    }
+    if boxes:
+        payload["boxes"] = boxes
+    if mode != STORAGE_DATABASE:
+        payload["text"] = text
+    if mode == STORAGE_BOTH:
+        payload.update(
+            {"document_title": document.title, "language": document.language, "tag": tag_name}
+        )
+    return payload
+
+
+def _decode_row(text: str, compressed) -> Optional[str]:
+    if text:
+        return text
+    if compressed is not None:
+        return zlib.decompress(bytes(compressed)).decode("utf-8")
+    return None
+
+
+def fetch_payload_texts(client: QdrantClient, point_ids: List[str]) -> Dict[str, str]:
+    """Lit le texte de plusieurs points Qdrant en un seul appel."""
+    if not point_ids:
+        return {}
+    records = client.retrieve(
+        collection_name=settings.QDRANT["COLLECTION"],
+        ids=point_ids,
+        with_payload=["text"],
+        with_vectors=False,
+    )
+    return {str(record.id): (record.payload or {}).get("text", "") for record in records}
+
+
+def iter_chunk_rows(queryset, batch_size: int = 2000) -> Iterator[Tuple[int, Optional[int], str]]:
+    """Parcourt ``(chunk_index, page_number, text)`` d'un queryset de chunks par lots.
+
+    Les textes absents de la base sont lus dans Qdrant, un appel par lot.
+    """
+    from .document_processing import get_qdrant_client
+
+    rows = queryset.values_list("chunk_index", "page_number", "text", "compressed_text", "point_id")
+    batch: List[Tuple] = []
+
+    def flush():
+        missing = [str(row[4]) for row in batch if _decode_row(row[2], row[3]) is None]
+        remote = fetch_payload_texts(get_qdrant_client(), missing) if missing else {}
+        for chunk_index, page_number, text, compressed, point_id in batch:
+            decoded = _decode_row(text, compressed)
+            yield chunk_index, page_number, decoded if decoded is not None else remote.get(str(point_id), "")
+
+    for row in rows.iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield from flush()
+            batch = []
+    if batch:
+        yield from flush()
+
+
+def hydrate_hits(hits: List[Dict]) -> List[Dict]:
+    """Complète texte et métadonnées des résultats de recherche en une requête SQL.
+
+    Les payloads compacts ne contiennent ni texte ni titre : on les relit depuis
+    ``DocumentEmbedding`` (jointure sur le document et son tag) par ``point_id``, chunks
+    d'une réindexation en attente compris (l'alias peut déjà pointer sur leur collection).
+    """
+    incomplete = [hit for hit in hits if hit.get("text") is None or hit.get("document_title") is None]
+    if not incomplete:
+        return hits
+    rows = DocumentEmbedding.all_objects.filter(
+        point_id__in=[hit["point_id"] for hit in incomplete]
+    ).values_list(
+        "point_id", "text", "compressed_text", "document__title", "document__language", "document__tag__name"
+    )
+    by_point = {str(row[0]): row for row in rows}
+    for hit in incomplete:
+        row = by_point.get(hit["point_id"])
+        if row is None:
+            continue
+        _, text, compressed, title, language, tag = row
+        if hit.get("text") is None:
+            hit["text"] = _decode_row(text, compressed) or ""
+        hit["document_title"] = title
+        hit["language"] = language
+        hit["tag"] = tag
+    return hits
+
+
+def payload_sizes(client: QdrantClient, limit: int = 1000) -> Tuple[int, int]:
+    """Nombre de points échantillonnés et taille JSON cumulée de leurs payloads."""
+    records, _ = client.scroll(
+        collection_name=settings.QDRANT["COLLECTION"],
+        limit=limit,
+        with_payload=True,
+        with_vectors=False,
+    )
+    total = sum(len(json.dumps(record.payload or {}, ensure_ascii=False).encode("utf-8")) for record in records)
+    return len(records), total
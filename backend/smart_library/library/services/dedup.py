@@ -0,0 +1,364 @@
+"""Déduplication des chunks quasi identiques entre documents généraux (MinHash + LSH).
+
+Plusieurs éditions d'un même manuel produisent des chunks presque identiques. Avec
+``DOCUMENT_PROCESSING["CHUNK_DEDUP"]["ENABLED"]``, chaque chunk d'un document général
+reçoit une signature MinHash (shingles de mots) découpée en bandes LSH indexées
+(``ChunkBand``). Un chunk dont la similarité estimée avec un chunk canonique dépasse
+``THRESHOLD`` n'est ni vectorisé ni écrit dans Qdrant : sa ligne ``DocumentEmbedding``
+pointe vers le chunk canonique, dont le payload liste tous les documents concernés
+(``document_ids``). Les résultats de recherche sont ensuite développés vers chaque
+document source (``sources``).
+
+Les documents personnels ne sont jamais fusionnés : leurs points portent le filtre de
+propriétaire.
+"""
+import hashlib
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qmodels
+
+from library.db_router import current_db_alias
+from library.models import ChunkBand, Document, DocumentEmbedding
+
+from .chunk_storage import STORAGE_DATABASE, STORAGE_PAYLOAD, build_payload, embedding_text_fields, storage_mode
+
+if TYPE_CHECKING:
+    from .document_processing import Chunk
+
+logger = logging.getLogger(__name__)
+
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+LOOKUP_BATCH = 5000
+
+
+def _config(name: str, default):
+    return settings.DOCUMENT_PROCESSING.get("CHUNK_DEDUP", {}).get(name, default)
+
+
+def dedup_enabled() -> bool:
+    return bool(_config("ENABLED", False))
+
+
+@lru_cache(maxsize=4)
+def _permutations(num_perm: int) -> Tuple[np.ndarray, np.ndarray]:
+    # Graine fixe : les signatures restent comparables d'un processus à l'autre.
+    generator = np.random.RandomState(1)
+    a = generator.randint(1, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+    b = generator.randint(0, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def _shingle_hashes(text: str, size: int) -> np.ndarray:
+    words = text.lower().split()
+    if len(words) < size:
+        shingles = {" ".join(words)} if words else set()
+    else:
+        shingles = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") for s in shingles],
+        dtype=np.uint64,
+    )
+
+
+def signature(text: str) -> Optional[np.ndarray]:
+    """Signature MinHash (``NUM_PERM`` entiers 32 bits) ou ``None`` pour un texte vide."""
+    hashes = _shingle_hashes(text, _config("SHINGLE_SIZE", 5))
+    if not hashes.size:
+        return None
+    a, b = _permutations(_config("NUM_PERM", 128))
+    # Débordement uint64 volontaire : famille de hachage universelle à la datasketch.
+    with np.errstate(over="ignore"):
+        permuted = ((np.outer(hashes, a) + b) % _PRIME) & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def encode_signature(sig: np.ndarray) -> bytes:
+    return sig.astype("<u4").tobytes()
+
+
+def decode_signature(raw) -> np.ndarray:
+    return np.frombuffer(bytes(raw), dtype="<u4")
+
+
+def band_hashes(sig: np.ndarray) -> List[int]:
+    """Une valeur signée 64 bits par bande de ``NUM_PERM / BANDS`` lignes."""
+    bands = _config("BANDS", 32)
+    rows = len(sig) // bands
+    return [
+        int.from_bytes(
+            hashlib.blake2b(sig[band * rows:(band + 1) * rows].tobytes(), digest_size=8).digest(),
+            "little",
+            signed=True,
+        )
+        for band in range(bands)
+    ]
+
+
+def similarity(left: np.ndarray, right: np.ndarray) -> float:
+    """Similarité de Jaccard estimée entre deux signatures."""
+    if left.shape != right.shape:
+        return 0.0
+    return float(np.mean(left == right))
+
+
+def band_rows(embedding_id: int, sig: np.ndarray) -> List[ChunkBand]:
+    return [
+        ChunkBand(embedding_id=embedding_id, band=band, value=value)
+        for band, value in enumerate(band_hashes(sig))
+    ]
+
+
+@dataclass
+class Match:
+    """Chunk canonique d'un quasi-doublon : ligne en base ou position plus tôt dans le lot."""
+
+    similarity: float
+    embedding_id: Optional[int] = None
+    point_id: Optional[str] = None
+    position: Optional[int] = None
+
+
+def find_duplicates(
+    signatures: Sequence[Optional[np.ndarray]],
+    exclude_document_ids: Iterable = (),
+) -> List[Optional[Match]]:
+    """Associe à chaque signature son chunk canonique le plus proche au-dessus du seuil.
+
+    Les candidats viennent des bandes LSH en base (une requête par ``LOOKUP_BATCH``
+    valeurs) et des signatures non dupliquées qui la précèdent dans ``signatures``.
+    """
+    threshold = _config("THRESHOLD", 0.85)
+    bands_by_position = [band_hashes(sig) if sig is not None else [] for sig in signatures]
+    values = sorted({value for bands in bands_by_position for value in bands})
+    stored: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+    candidates: Dict[int, Tuple[np.ndarray, str]] = {}
+    excluded = list(exclude_document_ids)
+    for start in range(0, len(values), LOOKUP_BATCH):
+        rows = (
+            ChunkBand.objects.filter(
+                value__in=values[start:start + LOOKUP_BATCH],
+                embedding__canonical__isnull=True,
+                embedding__minhash__isnull=False,
+            )
+            .exclude(embedding__document_id__in=excluded)
+            .values_list("band", "value", "embedding_id", "embedding__minhash", "embedding__point_id")
+        )
+        for band, value, embedding_id, minhash, point_id in rows:
+            stored[(band, value)].append(embedding_id)
+            if embedding_id not in candidates:
+                candidates[embedding_id] = (decode_signature(minhash), str(point_id))
+
+    in_batch: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+    matches: List[Optional[Match]] = []
+    for position, (sig, bands) in enumerate(zip(signatures, bands_by_position)):
+        best: Optional[Match] = None
+        seen_stored: Set[int] = set()
+        seen_batch: Set[int] = set()
+        for key in enumerate(bands):
+            for embedding_id in stored.get(key, ()):
+                if embedding_id in seen_stored:
+                    continue
+                seen_stored.add(embedding_id)
+                candidate, point_id = candidates[embedding_id]
+                score = similarity(sig, candidate)
+                if score >= threshold and (best is None or score > best.similarity):
+                    best = Match(similarity=score, embedding_id=embedding_id, point_id=point_id)
+            for other in in_batch.get(key, ()):
+                if other in seen_batch:
+                    continue
+                seen_batch.add(other)
+                score = similarity(sig, signatures[other])
+                if score >= threshold and (best is None or score > best.similarity):
+                    best = Match(similarity=score, position=other)
+        matches.append(best)
+        if best is None:
+            for key in enumerate(bands):
+                in_batch[key].append(position)
+    return matches
+
+
+def duplicate_text_fields(text: str) -> Dict:
+    """Un doublon n'a pas de point Qdrant : son texte reste toujours en base."""
+    mode = storage_mode()
+    return embedding_text_fields(text, STORAGE_DATABASE if mode == STORAGE_PAYLOAD else mode)
+
+
+def refresh_shared_points(client: QdrantClient, point_ids: Iterable, collection: Optional[str] = None) -> None:
+    """Réécrit le payload des points canoniques : document, position et ``document_ids``."""
+    point_ids = {str(point_id) for point_id in point_ids}
+    if not point_ids:
+        return
+    canonicals = {
+        str(entry.point_id): entry
+        for entry in DocumentEmbedding.objects.select_related("document", "document__tag").filter(
+            point_id__in=point_ids, canonical__isnull=True
+        )
+    }
+    members: Dict[str, Set[str]] = defaultdict(set)
+    for point_id, document_id in DocumentEmbedding.objects.filter(
+        canonical__point_id__in=canonicals
+    ).values_list("canonical__point_id", "document_id"):
+        members[str(point_id)].add(str(document_id))
+    operations = []
+    mode = storage_mode()
+    for point_id, entry in canonicals.items():
+        document = entry.document
+        payload = build_payload(
+            document,
+            entry.chunk_index,
+            entry.page_number,
+            entry.chunk_text,
+            document.tag.name if document.tag else None,
+            mode,
+            boxes=entry.boxes,
+        )
+        payload["document_ids"] = sorted(members[point_id] | {str(document.id)})
+        operations.append(
+            qmodels.SetPayloadOperation(set_payload=qmodels.SetPayload(payload=payload, points=[point_id]))
+        )
+    if operations:
+        client.batch_update_points(
+            collection_name=collection or settings.QDRANT["COLLECTION"],
+            update_operations=operations,
+        )
+
+
+def release_document_chunks(document: Document) -> Tuple[Set[str], Set[str]]:
+    """Prépare la suppression des chunks d'un document qui partagent un point.
+
+    Un chunk canonique encore référencé par un autre document cède son point Qdrant au
+    premier de ses doublons, qui devient canonique. Retourne les points à conserver et
+    ceux dont le payload doit être réécrit (:func:`refresh_shared_points`) une fois les
+    lignes supprimées.
+    """
+    affected = {
+        str(point_id)
+        for point_id in DocumentEmbedding.objects.filter(document=document, canonical__isnull=False)
+        .exclude(canonical__document=document)
+        .values_list("canonical__point_id", flat=True)
+    }
+    kept: Set[str] = set()
+    shared = DocumentEmbedding.objects.filter(
+        document=document, canonical__isnull=True, duplicates__isnull=False
+    ).distinct()
+    for canonical in shared:
+        heirs = list(canonical.duplicates.exclude(document=document).order_by("pk"))
+        if not heirs:
+            continue
+        heir, others = heirs[0], heirs[1:]
+        point_id = canonical.point_id
+        canonical.delete()
+        heir.point_id = point_id
+        heir.canonical = None
+        heir.save(update_fields=["point_id", "canonical"])
+        DocumentEmbedding.objects.filter(pk__in=[other.pk for other in others]).update(canonical=heir)
+        if heir.minhash is not None:
+            ChunkBand.objects.bulk_create(band_rows(heir.pk, decode_signature(heir.minhash)))
+        kept.add(str(point_id))
+        affected.add(str(point_id))
+    return kept, affected
+
+
+def expand_sources(hits: List[Dict]) -> List[Dict]:
+    """Ajoute à chaque résultat la liste ``sources`` de tous les documents qui le contiennent."""
+    if not hits:
+        return hits
+    rows = DocumentEmbedding.objects.filter(
+        canonical__point_id__in=[hit["point_id"] for hit in hits]
+    ).values_list("canonical__point_id", "document_id", "document__title", "chunk_index", "page_number")
+    duplicates: Dict[str, List[Dict]] = defaultdict(list)
+    for point_id, document_id, title, chunk_index, page_number in rows:
+        duplicates[str(point_id)].append(
+            {
+                "document_id": str(document_id),
+                "document_title": title,
+                "chunk_index": chunk_index,
+                "page_number": page_number,
+            }
+        )
+    for hit in hits:
+        hit["sources"] = [
+            {
+                "document_id": hit["document_id"],
+                "document_title": hit["document_title"],
+                "chunk_index": hit["chunk_index"],
+                "page_number": hit["page_number"],
+            },
+            *duplicates.get(hit["point_id"], []),
+        ]
+    return hits
+
+
+def link_duplicates(
+    client: QdrantClient,
+    flat: Sequence[Tuple[Document, "Chunk"]],
+    signatures: Sequence[Optional[np.ndarray]],
+    matches: Sequence[Optional[Match]],
+    point_by_position: Dict[int, str],
+) -> None:
+    """Enregistre les doublons d'un lot indexé et les bandes LSH de ses chunks canoniques.
+
+    ``flat`` liste les ``(document, chunk)`` du lot ; ``point_by_position`` donne le point
+    Qdrant de chaque chunk canonique écrit par :func:`build_qdrant_points`. Les payloads
+    des points partagés sont réécrits une fois la transaction courante validée.
+    """
+    new_canonicals = [i for i, sig in enumerate(signatures) if sig is not None and matches[i] is None]
+    targets = {point_by_position[match.position] for match in matches if match is not None and match.position is not None}
+    ids_by_point = {
+        str(point_id): pk
+        for point_id, pk in DocumentEmbedding.objects.filter(
+            point_id__in={point_by_position[i] for i in new_canonicals} | targets
+        ).values_list("point_id", "pk")
+    }
+    canonicals: Dict[int, Tuple[str, int]] = {}
+    for i, match in enumerate(matches):
+        if match is None:
+            continue
+        if match.position is not None:
+            point_id = point_by_position[match.position]
+            canonicals[i] = point_id, ids_by_point[point_id]
+        else:
+            canonicals[i] = match.point_id, match.embedding_id
+    # Le doublon reprend les zones du chunk canonique, dont le point le représente en recherche.
+    boxes_by_id = dict(
+        DocumentEmbedding.objects.filter(
+            pk__in={canonical_id for _, canonical_id in canonicals.values()}
+        ).values_list("pk", "boxes")
+    )
+    duplicates = []
+    shared: Set[str] = set()
+    for i, (point_id, canonical_id) in canonicals.items():
+        document, chunk = flat[i]
+        duplicates.append(
+            DocumentEmbedding(
+                document=document,
+                chunk_index=chunk.index,
+                page_number=chunk.page_number,
+                minhash=encode_signature(signatures[i]),
+                boxes=boxes_by_id.get(canonical_id),
+                canonical_id=canonical_id,
+                **duplicate_text_fields(chunk.text),
+            )
+        )
+        shared.add(point_id)
+    DocumentEmbedding.objects.bulk_create(duplicates)
+    ChunkBand.objects.bulk_create(
+        [
+            band
+            for i in new_canonicals
+            for band in band_rows(ids_by_point[point_by_position[i]], signatures[i])
+        ],
+        batch_size=2000,
+    )
+    transaction.on_commit(partial(refresh_shared_points, client, shared), using=current_db_alias())
+    if duplicates:
+        logger.info("Deduplicated %d of %d chunks", len(duplicates), len(flat))
@@ -0,0 +1,114 @@
+"""Diversification des résultats de recherche : MMR, plafond par document et fusion des voisins.
+
+Qdrant renvoie ``CANDIDATES`` fois plus de points que demandé, avec leurs vecteurs. La
+sélection MMR (Maximal Marginal Relevance) arbitre entre pertinence et redondance
+(``LAMBDA`` = 1 : pertinence seule) en une multiplication matricielle NumPy, sans
+nouvelle requête. Un document ne fournit pas plus de ``PER_DOCUMENT`` passages (sauf
+recherche limitée à un document). Enfin les chunks consécutifs d'une même page sont
+fusionnés en un passage, recouvrement de ``CHUNK_OVERLAP`` mots retiré.
+"""
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from django.conf import settings
+
+
+def diversity_setting(name: str, default):
+    return settings.QDRANT.get("DIVERSITY", {}).get(name, default)
+
+
+def point_vector(point, using: Optional[str]) -> Optional[List[float]]:
+    vector = point.vector
+    if isinstance(vector, dict):
+        return vector.get(using) if using else next(iter(vector.values()), None)
+    return vector
+
+
+def mmr_select(
+    query_vector: Sequence[float],
+    vectors: np.ndarray,
+    k: int,
+    lambda_: float,
+    groups: Optional[Sequence] = None,
+    per_group: Optional[int] = None,
+) -> List[int]:
+    """Indices des ``k`` vecteurs retenus par MMR, au plus ``per_group`` par groupe."""
+    count = len(vectors)
+    if not count:
+        return []
+    normed = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+    query = np.asarray(query_vector, dtype=normed.dtype)
+    query = query / max(float(np.linalg.norm(query)), 1e-12)
+    relevance = normed @ query
+    pairwise = normed @ normed.T
+    redundancy = np.zeros(count)
+    available = np.ones(count, dtype=bool)
+    group_ids = None
+    if groups is not None and per_group:
+        codes: Dict = {}
+        group_ids = np.asarray([codes.setdefault(group, len(codes)) for group in groups])
+    taken: Dict[int, int] = defaultdict(int)
+    selected: List[int] = []
+    while len(selected) < k and available.any():
+        scores = lambda_ * relevance - (1 - lambda_) * redundancy
+        scores[~available] = -np.inf
+        index = int(np.argmax(scores))
+        selected.append(index)
+        available[index] = False
+        redundancy = pairwise[index] if len(selected) == 1 else np.maximum(redundancy, pairwise[index])
+        if group_ids is not None:
+            group = group_ids[index]
+            taken[group] += 1
+            if taken[group] >= per_group:
+                available &= group_ids != group
+    return selected
+
+
+def _join_overlapping(left: str, right: str, max_overlap: int) -> str:
+    left_words, right_words = left.split(), right.split()
+    for size in range(min(len(left_words), len(right_words), max_overlap), 0, -1):
+        if left_words[-size:] == right_words[:size]:
+            return " ".join(left_words + right_words[size:])
+    return f"{left} {right}"
+
+
+def merge_adjacent(hits: List[Dict]) -> List[Dict]:
+    """Fusionne les chunks consécutifs d'une même page, au rang du mieux classé.
+
+    Chaque passage porte ``chunk_indexes`` et ``point_ids`` (un seul élément s'il n'y a
+    pas eu de fusion).
+    """
+    max_overlap = 2 * settings.DOCUMENT_PROCESSING.get("CHUNK_OVERLAP", 40)
+    groups: Dict[tuple, List[int]] = defaultdict(list)
+    for rank, hit in enumerate(hits):
+        groups[(hit["document_id"], hit["page_number"])].append(rank)
+    passages = []
+    for ranks in groups.values():
+        ranks.sort(key=lambda rank: hits[rank]["chunk_index"] or 0)
+        runs: List[List[int]] = [[ranks[0]]]
+        for rank in ranks[1:]:
+            previous = hits[runs[-1][-1]]["chunk_index"]
+            current = hits[rank]["chunk_index"]
+            if previous is not None and current == previous + 1:
+                runs[-1].append(rank)
+            else:
+                runs.append([rank])
+        for run in runs:
+            best = min(run)
+            passage = dict(hits[best])
+            text = hits[run[0]]["text"] or ""
+            for rank in run[1:]:
+                text = _join_overlapping(text, hits[rank]["text"] or "", max_overlap)
+            passage.update(
+                {
+                    "text": text,
+                    "chunk_index": hits[run[0]]["chunk_index"],
+                    "chunk_indexes": [hits[rank]["chunk_index"] for rank in run],
+                    "point_ids": [hits[rank]["point_id"] for rank in run],
+                    "boxes": [box for rank in run for box in hits[rank].get("boxes") or []] or None,
+                }
+            )
+            passages.append((best, passage))
+    passages.sort(key=lambda item: item[0])
+    return [passage for _, passage in passages]
@@ -1,20 +1,39 @@
 import logging
 import mimetypes
+import mmap
 import os
 import re
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass
-from functools import lru_cache
-from typing import Iterable, List, Tuple
+from functools import lru_cache, partial
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
+import cv2
 import easyocr
+from easyocr import config as easyocr_config
 import fitz  # PyMuPDF
+import numpy as np
 from django.conf import settings
 from django.db import transaction
+from django.utils import timezone
 from qdrant_client import QdrantClient
 from qdrant_client.http import models as qmodels
-from sentence_transformers import SentenceTransformer
 
-from library.models import Document, DocumentEmbedding
+from library.db_router import current_db_alias
+from library.models import Document, DocumentEmbedding, ReindexRun
+
+from . import extraction_cache
+from .chunk_storage import build_payload, embedding_text_fields, storage_mode
+from .language import detect_language, detection_enabled, sample_text
+from .layout import Block, dump_blocks, layout_chunks, load_blocks, page_blocks, page_text
+from .ocr import get_reader_pool
+from .vector_spaces import (
+    forget_collection_info,
+    get_space_model,
+    vectors_config,
+    write_spaces,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +45,8 @@ class Chunk:
     text: str
     page_number: int
     index: int
+    # Zones couvertes sur la page, une par bloc (extraction ``layout`` uniquement).
+    boxes: Optional[List[List[float]]] = None
 
 
 def _ensure_storage_dir():
@@ -52,64 +73,190 @@ def get_qdrant_client() -> QdrantClient:
 
 
 def _ensure_collection(client: QdrantClient) -> None:
-    """Garantit l'existence de la collection utilisée pour indexer les documents."""
-    cfg = settings.QDRANT
-    collection = cfg["COLLECTION"]
+    """Garantit l'existence de la collection utilisée pour indexer les documents.
+
+    Une nouvelle installation crée une collection datée derrière l'alias
+    ``QDRANT["COLLECTION"]`` : ``reindex_library`` pourra le basculer sans interruption.
+    """
+    collection = settings.QDRANT["COLLECTION"]
     try:
         client.get_collection(collection)
     except Exception:
-        logger.info("Creating Qdrant collection '%s'", collection)
-        client.recreate_collection(
-            collection_name=collection,
-            vectors_config=qmodels.VectorParams(
-                size=cfg["VECTOR_SIZE"],
-                distance=_distance_from_string(cfg["DISTANCE"]),
-            ),
-        )
+        physical = versioned_collection_name(collection)
+        create_vector_collection(client, physical)
+        switch_collection_alias(client, collection, physical)
 
 
-def _distance_from_string(name: str) -> qmodels.Distance:
-    """Mappe une chaîne de configuration vers l'enum Distance de Qdrant."""
-    mapping = {
-        "cosine": qmodels.Distance.COSINE,
-        "dot": qmodels.Distance.DOT,
-        "euclid": qmodels.Distance.EUCLID,
-        "l2": qmodels.Distance.EUCLID,
-        "manhattan": qmodels.Distance.MANHATTAN,
-    }
-    return mapping.get(name.lower(), qmodels.Distance.COSINE)
+def versioned_collection_name(alias: str) -> str:
+    return f"{alias}_{timezone.now():%Y%m%d%H%M%S%f}"
 
 
-@lru_cache(maxsize=1)
-def get_embedding_model() -> SentenceTransformer:
-    """Charge une seule fois le modèle SentenceTransformer défini en configuration."""
-    model_name = settings.QDRANT["EMBEDDING_MODEL"]
-    logger.info("Loading embedding model %s", model_name)
-    return SentenceTransformer(model_name)
+def create_vector_collection(client: QdrantClient, name: str) -> None:
+    """Crée une collection Qdrant avec un vecteur nommé par espace d'embedding configuré."""
+    logger.info("Creating Qdrant collection '%s'", name)
+    client.create_collection(collection_name=name, vectors_config=vectors_config())
 
 
-@lru_cache(maxsize=1)
-def get_easyocr_reader() -> easyocr.Reader:
-    """Initialise EasyOCR avec les langues et la politique GPU configurées."""
+def resolve_collection_alias(client: QdrantClient, alias: str) -> Optional[str]:
+    """Retourne la collection pointée par ``alias`` ou ``None`` si ce n'est pas un alias."""
+    for description in client.get_aliases().aliases:
+        if description.alias_name == alias:
+            return description.collection_name
+    return None
+
+
+def is_physical_collection(client: QdrantClient, name: str) -> bool:
+    """Vrai si ``name`` est une vraie collection et non un alias."""
+    return resolve_collection_alias(client, name) is None and client.collection_exists(name)
+
+
+def switch_collection_alias(client: QdrantClient, alias: str, collection: str) -> Optional[str]:
+    """Fait pointer ``alias`` vers ``collection`` (atomique) et retourne l'ancienne collection.
+
+    Refuse de remplacer une vraie collection du même nom : voir ``adopt_collection_alias``.
+    """
+    if is_physical_collection(client, alias):
+        raise ValueError(
+            f"'{alias}' is a collection, not an alias: run `reindex_library --adopt-alias` first."
+        )
+    previous = resolve_collection_alias(client, alias)
+    operations = []
+    if previous is not None:
+        operations.append(qmodels.DeleteAliasOperation(delete_alias=qmodels.DeleteAlias(alias_name=alias)))
+    operations.append(
+        qmodels.CreateAliasOperation(
+            create_alias=qmodels.CreateAlias(collection_name=collection, alias_name=alias)
+        )
+    )
+    client.update_collection_aliases(change_aliases_operations=operations)
+    forget_collection_info(alias)
+    return previous
+
+
+def copy_collection(client: QdrantClient, source: str, target: str, batch_size: int = 256) -> int:
+    """Recopie points, vecteurs et payloads de ``source`` dans une nouvelle collection."""
+    client.create_collection(
+        collection_name=target,
+        vectors_config=client.get_collection(source).config.params.vectors,
+    )
+    copied = 0
+    offset = None
+    while True:
+        records, offset = client.scroll(
+            collection_name=source,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        if records:
+            client.upsert(
+                collection_name=target,
+                points=[
+                    qmodels.PointStruct(id=record.id, vector=record.vector, payload=record.payload)
+                    for record in records
+                ],
+            )
+            copied += len(records)
+        if offset is None:
+            return copied
+
+
+def adopt_collection_alias(client: QdrantClient, alias: str) -> str:
+    """Transforme la vraie collection ``alias`` en alias d'une copie datée.
+
+    Une collection et un alias ne peuvent pas porter le même nom : la collection d'origine
+    n'est supprimée qu'une fois la copie complète vérifiée, et l'alias est créé juste après
+    (la recherche échoue pendant cet intervalle, à prévoir lors d'une maintenance). Si la
+    création de l'alias échoue, relancer l'opération le crée vers la copie existante.
+    """
+    copy = resolve_collection_alias(client, alias)
+    if copy is not None:
+        return copy
+    if client.collection_exists(alias):
+        copy = versioned_collection_name(alias)
+        copied = copy_collection(client, alias, copy)
+        expected = client.count(alias, exact=True).count
+        if copied != expected or client.count(copy, exact=True).count != expected:
+            client.delete_collection(copy)
+            raise RuntimeError(f"Copy of '{alias}' is incomplete ({copied}/{expected} points); nothing deleted.")
+        logger.warning("Replacing collection '%s' by an alias to its copy '%s'", alias, copy)
+        client.delete_collection(alias)
+    else:
+        # Reprise après un échec de création de l'alias : dernière copie datée, hors
+        # collections cibles de réindexations non terminées.
+        pattern = re.compile(rf"{re.escape(alias)}_\d{{14,20}}")
+        unfinished = set(
+            ReindexRun.objects.exclude(status='completed').values_list("target_collection", flat=True)
+        )
+        copies = sorted(
+            description.name
+            for description in client.get_collections().collections
+            if pattern.fullmatch(description.name) and description.name not in unfinished
+        )
+        if not copies:
+            raise ValueError(f"Neither a collection nor an alias named '{alias}' exists.")
+        copy = copies[-1]
+    switch_collection_alias(client, alias, copy)
+    return copy
+
+
+def ocr_languages_for(language: str) -> List[str]:
+    """Langues OCR d'un document : la sienne (plus ``OCR_FALLBACK_LANGUAGES``) si EasyOCR
+    la connaît, sinon ``OCR_LANGUAGES``."""
     cfg = settings.DOCUMENT_PROCESSING
-    languages = cfg.get("OCR_LANGUAGES", ["en"])
-    logger.info("Loading EasyOCR with languages %s", languages)
-    return easyocr.Reader(languages, gpu=cfg.get("EASYOCR_GPU", False))
+    code = re.split(r"[-_]", (language or "").strip().lower())[0]
+    if code not in easyocr_config.all_lang_list:
+        return list(cfg.get("OCR_LANGUAGES", ["en"]))
+    return list(dict.fromkeys([code, *cfg.get("OCR_FALLBACK_LANGUAGES", ["en"])]))
+
+
+def get_easyocr_reader(languages: Optional[Tuple[str, ...]] = None) -> easyocr.Reader:
+    """Lecteur EasyOCR pour ``languages`` (``OCR_LANGUAGES`` par défaut), pris dans le pool."""
+    return get_reader_pool().get(languages or settings.DOCUMENT_PROCESSING.get("OCR_LANGUAGES", ["en"]))
+
+
+FileSource = Union[str, bytes, bytearray, memoryview]
+
 
+def _open_pdf(source: FileSource) -> fitz.Document:
+    if isinstance(source, str):
+        return fitz.open(source)
+    return fitz.open(stream=source, filetype="pdf")
 
-def extract_text_from_pdf(file_path: str) -> List[Tuple[int, str]]:
-    """Retourne le texte d'un PDF page par page."""
+
+def layout_extraction_enabled() -> bool:
+    return settings.DOCUMENT_PROCESSING.get("PDF_EXTRACTION", "text") == "layout"
+
+
+def extract_layout_from_pdf(source: FileSource) -> List[Tuple[int, List[Block]]]:
+    """Blocs de chaque page dans l'ordre de lecture (voir ``services.layout``)."""
+    with _open_pdf(source) as doc:
+        return [(idx, page_blocks(page)) for idx, page in enumerate(doc, start=1)]
+
+
+def extract_text_from_pdf(source: FileSource) -> List[Tuple[int, str]]:
+    """Retourne le texte d'un PDF page par page (chemin ou contenu en mémoire)."""
     texts: List[Tuple[int, str]] = []
-    with fitz.open(file_path) as doc:
+    with _open_pdf(source) as doc:
         for idx, page in enumerate(doc, start=1):
             texts.append((idx, page.get_text("text")))
     return texts
 
 
-def extract_text_from_image(file_path: str) -> List[Tuple[int, str]]:
+def decode_image(data: Union[bytes, bytearray, memoryview]) -> np.ndarray:
+    """Décode une image en tableau NumPy directement depuis le tampon, sans fichier temporaire."""
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Unable to decode image content.")
+    return image
+
+
+def extract_text_from_image(source: FileSource, languages: Optional[List[str]] = None) -> List[Tuple[int, str]]:
     """Extrait le texte d'une image à l'aide d'EasyOCR."""
-    reader = get_easyocr_reader()
-    results = reader.readtext(file_path)
+    reader = get_easyocr_reader(tuple(languages) if languages else None)
+    image = source if isinstance(source, str) else decode_image(source)
+    results = reader.readtext(image)
     text = " ".join([content for (_, content, _) in results])
     return [(1, text)]
 
@@ -171,54 +318,165 @@ def detect_file_type(file_path: str) -> str:
     return "unknown"
 
 
-def remove_existing_embeddings(document: Document, client: QdrantClient) -> None:
-    """Nettoie les entrées Qdrant et SQL existantes pour un document donné."""
-    existing = list(document.embeddings.all())
-    if not existing:
-        return
-    point_ids = [str(entry.point_id) for entry in existing]
-    logger.info("Removing %d existing embeddings for %s", len(point_ids), document.id)
-    try:
-        client.delete(
-            collection_name=settings.QDRANT["COLLECTION"],
-            points_selector=qmodels.PointIdsList(points=point_ids),
-        )
-    except Exception as exc:
-        logger.warning("Failed to delete existing Qdrant points: %s", exc)
+def remove_existing_embeddings(
+    document: Document,
+    client: QdrantClient,
+    mirror: Optional[ReindexRun] = None,
+) -> None:
+    """Nettoie les entrées Qdrant et SQL existantes pour un document donné.
+
+    Les points partagés avec des quasi-doublons d'autres documents sont conservés
+    (voir ``dedup.release_document_chunks``). Avec ``mirror`` (réindexation en cours),
+    les points du document sont aussi retirés de sa collection cible. Les écritures Qdrant
+    n'ont lieu qu'une fois la transaction courante validée.
+    """
+    from .dedup import refresh_shared_points, release_document_chunks
+
+    using = current_db_alias()
+    if mirror is not None:
+        mirrored = [
+            str(point_id)
+            for point_id in document.embeddings.filter(canonical__isnull=True).values_list("point_id", flat=True)
+        ]
+        if mirrored:
+            transaction.on_commit(partial(delete_points, client, mirror.target_collection, mirrored), using=using)
+        clear_staged_embeddings(document, mirror, client)
+    kept, shared = release_document_chunks(document)
+    # Un doublon n'a pas de point propre : seuls les chunks canoniques en ont un.
+    point_ids = [
+        str(point_id)
+        for point_id in document.embeddings.filter(canonical__isnull=True).values_list("point_id", flat=True)
+        if str(point_id) not in kept
+    ]
+    if point_ids:
+        logger.info("Removing %d existing embeddings for %s", len(point_ids), document.id)
+
+        def delete_existing():
+            try:
+                delete_points(client, settings.QDRANT["COLLECTION"], point_ids)
+            except Exception as exc:
+                logger.warning("Failed to delete existing Qdrant points: %s", exc)
+
+        transaction.on_commit(delete_existing, using=using)
     document.embeddings.all().delete()
+    transaction.on_commit(partial(refresh_shared_points, client, shared), using=using)
 
 
-def build_qdrant_points(document: Document, chunks: List[Chunk], embeddings: List[List[float]]):
-    """Construit les objets PointStruct pour l'upsert dans Qdrant et persiste les chunks."""
-    points = []
-    for chunk, vector in zip(chunks, embeddings):
-        embedding_entry = DocumentEmbedding.objects.create(
-            document=document,
-            chunk_index=chunk.index,
-            page_number=chunk.page_number,
-            text=chunk.text,
+def clear_staged_embeddings(document: Document, run: ReindexRun, client: QdrantClient) -> None:
+    """Retire de la collection cible les points déjà écrits pour ``document`` par ``run``.
+
+    Les chunks actifs du document et leurs points dans la collection active ne sont pas
+    touchés : la recherche continue de les servir jusqu'à la bascule. Les points ne sont
+    supprimés qu'une fois la transaction courante validée.
+    """
+    stale = DocumentEmbedding.all_objects.filter(document=document, reindex_run=run)
+    point_ids = [str(point_id) for point_id in stale.values_list("point_id", flat=True)]
+    if point_ids:
+        transaction.on_commit(
+            partial(delete_points, client, run.target_collection, point_ids), using=current_db_alias()
         )
+    stale.delete()
+
+
+def delete_points(client: QdrantClient, collection: str, point_ids: List[str]) -> None:
+    client.delete(collection_name=collection, points_selector=qmodels.PointIdsList(points=point_ids))
+
+
+def promote_staged_embeddings(run: ReindexRun, batch_size: int = 500) -> int:
+    """Remplace les chunks actifs des documents réindexés par ceux de ``run``.
+
+    À appeler une fois l'alias basculé sur ``run.target_collection`` ; par lots de
+    documents, chacun dans sa transaction. Retourne le nombre de documents concernés.
+    """
+    staged = DocumentEmbedding.all_objects.filter(reindex_run=run)
+    document_ids = list(staged.values_list("document_id", flat=True).distinct())
+    for start in range(0, len(document_ids), batch_size):
+        batch = document_ids[start:start + batch_size]
+        with transaction.atomic():
+            DocumentEmbedding.objects.filter(document_id__in=batch).delete()
+            staged.filter(document_id__in=batch).update(reindex_run=None)
+    return len(document_ids)
+
+
+def discard_staged_embeddings(run: ReindexRun) -> None:
+    """Supprime les chunks d'une réindexation abandonnée (sa collection cible l'est aussi)."""
+    DocumentEmbedding.all_objects.filter(reindex_run=run).delete()
+
+
+def points_for_collection(
+    points: List[qmodels.PointStruct],
+    names: Optional[Set[str]],
+    primary: str,
+) -> List[qmodels.PointStruct]:
+    """Points limités aux vecteurs que déclare une collection (``None`` : vecteur anonyme,
+    celui de l'espace ``primary``)."""
+    adapted = []
+    for point in points:
+        vector = point.vector
+        if not isinstance(vector, dict) or (names is not None and set(vector) <= names):
+            adapted.append(point)
+            continue
+        if names is None:
+            vector = vector[primary]
+        else:
+            vector = {space: values for space, values in vector.items() if space in names}
+        adapted.append(qmodels.PointStruct(id=point.id, vector=vector, payload=point.payload))
+    return adapted
+
+
+def build_qdrant_points(
+    document: Document,
+    chunks: List[Chunk],
+    vectors_by_space: Dict[str, List[List[float]]],
+    named_vectors: bool = True,
+    minhashes: Optional[List[Optional[bytes]]] = None,
+    reindex_run: Optional[ReindexRun] = None,
+):
+    """Construit les objets PointStruct pour l'upsert dans Qdrant et persiste les chunks.
+
+    ``vectors_by_space`` associe chaque espace à la liste des vecteurs des chunks. Pour une
+    collection sans vecteurs nommés seul le premier espace (l'actif) est écrit.
+    ``minhashes`` donne, le cas échéant, la signature de déduplication de chaque chunk.
+    Avec ``reindex_run``, les chunks restent en attente jusqu'à la bascule de l'alias.
+    """
+    mode = storage_mode()
+    minhashes = minhashes or [None] * len(chunks)
+    entries = DocumentEmbedding.objects.bulk_create(
+        [
+            DocumentEmbedding(
+                document=document,
+                chunk_index=chunk.index,
+                page_number=chunk.page_number,
+                minhash=minhash,
+                boxes=chunk.boxes,
+                reindex_run=reindex_run,
+                **embedding_text_fields(chunk.text, mode),
+            )
+            for chunk, minhash in zip(chunks, minhashes)
+        ]
+    )
+    tag_name = document.tag.name if document.tag else None
+    primary_vectors = next(iter(vectors_by_space.values()))
+    points = []
+    for position, (entry, chunk) in enumerate(zip(entries, chunks)):
+        if named_vectors:
+            vector = {space: vectors[position] for space, vectors in vectors_by_space.items()}
+        else:
+            vector = primary_vectors[position]
         points.append(
             qmodels.PointStruct(
-                id=str(embedding_entry.point_id),
+                id=str(entry.point_id),
                 vector=vector,
-                payload={
-                    "document_id": str(document.id),
-                    "document_title": document.title,
-                    "chunk_index": chunk.index,
-                    "page_number": chunk.page_number,
-                    "text": chunk.text,
-                    "source": document.source,
-                    "language": document.language,
-                    "tag": document.tag.name if document.tag else None,
-                },
+                payload=build_payload(
+                    document, chunk.index, chunk.page_number, chunk.text, tag_name, mode, boxes=chunk.boxes
+                ),
             )
         )
     return points
 
 
-def process_document(document: Document) -> None:
-    """Pipeline complet : extraction texte, chunking, embeddings et indexation Qdrant."""
+def resolve_document_path(document: Document) -> str:
+    """Retourne le chemin local du fichier (ou "" pour un stockage distant) et le synchronise."""
     field_file = document.file
     file_path = ""
     if field_file:
@@ -227,65 +485,162 @@ def process_document(document: Document) -> None:
         except (ValueError, NotImplementedError):
             file_path = ""
 
-    if not file_path:
+    if not file_path and not field_file:
         file_path = document.path
 
-    if not file_path:
-        raise ValueError(f"Document {document.id} has no accessible file path.")
-
     if document.path != file_path:
         document.__class__.objects.filter(pk=document.pk).update(path=file_path)
         document.path = file_path
+    return file_path
+
+
+@contextmanager
+def open_document_source(document: Document) -> Iterator[Tuple[str, Union[bytes, memoryview]]]:
+    """Expose le contenu d'un document sous forme de tampon, sans copie sur disque.
+
+    Un fichier local est projeté en mémoire (mmap) ; sinon le contenu est lu via le
+    backend de stockage de ``document.file`` (stockage objet, mémoire, ...). Retourne le
+    nom du fichier (pour détecter son type) et le tampon.
+    """
+    file_path = resolve_document_path(document)
+    if file_path and os.path.exists(file_path):
+        with open(file_path, "rb") as handle:
+            if os.fstat(handle.fileno()).st_size == 0:
+                yield file_path, b""
+                return
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                with memoryview(mapped) as view:
+                    yield file_path, view
+        return
+
+    field_file = document.file
+    if not field_file or not field_file.storage.exists(field_file.name):
+        raise ValueError(f"Document {document.id} has no accessible file.")
+    with field_file.storage.open(field_file.name, "rb") as handle:
+        yield field_file.name, handle.read()
 
+
+def prepare_document_chunks(document: Document, update_status: bool = True) -> List[Chunk]:
+    """Extraction, nettoyage et découpage d'un document ; le passe au statut ``processed``."""
     cfg = settings.DOCUMENT_PROCESSING
     chunk_size = cfg.get("CHUNK_SIZE", 200)
     overlap = cfg.get("CHUNK_OVERLAP", 40)
-
-    file_type = detect_file_type(file_path)
-    logger.info("Processing document %s (%s)", document.id, file_type)
-
-    if file_type == "pdf":
-        pages = extract_text_from_pdf(file_path)
-    elif file_type == "image":
-        pages = extract_text_from_image(file_path)
-    else:
-        raise ValueError(f"Unsupported file type for {file_path}")
+    started = time.monotonic()
+
+    with open_document_source(document) as (file_name, content):
+        file_type = detect_file_type(file_name)
+        logger.info("Processing document %s (%s)", document.id, file_type)
+
+        if file_type not in {"pdf", "image"}:
+            raise ValueError(f"Unsupported file type for {file_name}")
+
+        ocr_languages = ocr_languages_for(document.language)
+        layout = file_type == "pdf" and layout_extraction_enabled()
+        version = extraction_cache.extractor_version(layout)
+        use_cache = extraction_cache.cache_enabled()
+        pages = None
+        blocks_by_page = None
+        if use_cache:
+            file_hash = extraction_cache.content_hash(content)
+            languages = extraction_cache.ocr_languages_key(file_type, ocr_languages)
+            pages = extraction_cache.load_pages(file_hash, languages, version)
+            if pages is not None:
+                logger.info("Using cached extraction for document %s", document.id)
+
+        if pages is None:
+            if layout:
+                blocks_by_page = extract_layout_from_pdf(content)
+                pages = [(page_number, dump_blocks(blocks)) for page_number, blocks in blocks_by_page]
+            elif file_type == "pdf":
+                pages = extract_text_from_pdf(content)
+            else:
+                pages = extract_text_from_image(content, ocr_languages)
+            if use_cache:
+                extraction_cache.store_pages(document, file_hash, languages, pages, version)
 
     cleaned_pages: List[Tuple[int, str]] = []
-    for page_number, text in pages:
-        cleaned = clean_text(text)
-        if cleaned:
-            cleaned_pages.append((page_number, cleaned))
+    if layout:
+        if blocks_by_page is None:
+            blocks_by_page = [(page_number, load_blocks(raw)) for page_number, raw in pages]
+        blocks_of_page = dict(blocks_by_page)
+        for page_number, blocks in blocks_by_page:
+            text = page_text(blocks)
+            if text:
+                cleaned_pages.append((page_number, text))
+    else:
+        for page_number, text in pages:
+            cleaned = clean_text(text)
+            if cleaned:
+                cleaned_pages.append((page_number, cleaned))
 
     if not cleaned_pages:
         raise ValueError("No text extracted from document.")
 
-    document.status = 'processed'
-    document.save(update_fields=['status'])
+    if not document.language and detection_enabled():
+        detection = detect_language(sample_text(cleaned_pages))
+        if detection is not None:
+            logger.info(
+                "Detected language '%s' (%.2f) for document %s",
+                detection.language,
+                detection.confidence,
+                document.id,
+            )
+            document.language = detection.language
+
+    if update_status:
+        document.status = 'processed'
+        document.save(update_fields=['status', 'language'])
 
     chunks: List[Chunk] = []
     chunk_index = 1
     for page_number, text in cleaned_pages:
-        for chunk_content in generate_chunks(text, chunk_size, overlap):
-            chunks.append(Chunk(text=chunk_content, page_number=page_number, index=chunk_index))
+        if layout:
+            pieces = layout_chunks(blocks_of_page[page_number], chunk_size, overlap)
+        else:
+            pieces = ((piece, None) for piece in generate_chunks(text, chunk_size, overlap))
+        for chunk_content, boxes in pieces:
+            chunks.append(Chunk(text=chunk_content, page_number=page_number, index=chunk_index, boxes=boxes))
             chunk_index += 1
 
     if not chunks:
         raise ValueError("No chunks generated for document text.")
 
-    model = get_embedding_model()
-    embeddings = model.encode([chunk.text for chunk in chunks], convert_to_numpy=True)
-    embeddings_list = [vector.tolist() for vector in embeddings]
-
-    client = get_qdrant_client()
-
-    with transaction.atomic():
-        remove_existing_embeddings(document, client)
-        points = build_qdrant_points(document, chunks, embeddings_list)
+    # Enregistrés avec le statut ``indexed`` par index_document_group (langue détectée comprise).
+    document.page_count = len(cleaned_pages)
+    document.char_count = sum(len(text) for _, text in cleaned_pages)
+    document.processing_ms = int((time.monotonic() - started) * 1000)
+    return chunks
+
+
+def encode_texts(texts: List[str], spaces: Optional[List[str]] = None) -> Dict[str, List[List[float]]]:
+    """Calcule les embeddings des textes pour chaque espace alimenté (actif puis candidat).
+
+    L'encodage se fait par lots de ``EMBEDDING_BATCH_SIZE``.
+    """
+    batch_size = settings.DOCUMENT_PROCESSING.get("EMBEDDING_BATCH_SIZE", 32)
+    vectors_by_space: Dict[str, List[List[float]]] = {}
+    for space in spaces or write_spaces():
+        embeddings = get_space_model(space).encode(texts, batch_size=batch_size, convert_to_numpy=True)
+        vectors_by_space[space] = [vector.tolist() for vector in embeddings]
+    return vectors_by_space
+
+
+def upsert_points(
+    client: QdrantClient,
+    points: List[qmodels.PointStruct],
+    collection: Optional[str] = None,
+) -> None:
+    """Envoie les points à Qdrant par lots de ``UPSERT_BATCH_SIZE``."""
+    batch_size = settings.DOCUMENT_PROCESSING.get("UPSERT_BATCH_SIZE", 256)
+    for start in range(0, len(points), batch_size):
         client.upsert(
-            collection_name=settings.QDRANT["COLLECTION"],
-            points=points,
+            collection_name=collection or settings.QDRANT["COLLECTION"],
+            points=points[start:start + batch_size],
         )
-        document.status = 'indexed'
-        document.save(update_fields=['status'])
-    logger.info("Document %s indexed with %d chunks", document.id, len(points))
+
+
+def process_document(document: Document) -> None:
+    """Pipeline complet : extraction texte, chunking, embeddings et indexation Qdrant."""
+    from .ingestion import index_document_group
+
+    index_document_group([(document, prepare_document_chunks(document))])
@@ -0,0 +1,110 @@
+import glob
+import logging
+import os
+from functools import lru_cache
+from typing import Optional
+
+from django.conf import settings
+from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+BACKEND_TORCH = "torch"
+BACKEND_ONNX = "onnx"
+
+
+class ImproperlyConfiguredBackend(ValueError):
+    """Levée lorsque le backend d'embedding configuré est inconnu ou indisponible."""
+
+
+def _onnx_export_dir(model_name: str) -> str:
+    """Dossier local où est stocké l'export ONNX quantifié d'un modèle."""
+    cfg = settings.QDRANT
+    base_dir = cfg.get("ONNX_EXPORT_DIR") or os.path.join(cfg["PATH"], "..", "onnx_models")
+    return os.path.abspath(os.path.join(base_dir, model_name.replace("/", "__")))
+
+
+def _quantized_file_name(export_dir: str, quantization: str) -> Optional[str]:
+    """Fichier quantifié (relatif à ``export_dir``) ; qint8 ou quint8 selon la cible."""
+    matches = sorted(glob.glob(os.path.join(export_dir, "onnx", f"model_q*int8_{quantization}.onnx")))
+    return os.path.relpath(matches[0], export_dir) if matches else None
+
+
+def export_quantized_onnx_model(model_name: str, quantization: Optional[str] = None) -> str:
+    """Exporte le modèle en ONNX avec quantification int8 dynamique et retourne son dossier.
+
+    L'export n'est réalisé qu'une seule fois : les appels suivants réutilisent les fichiers
+    présents sur disque.
+    """
+    quantization = quantization or settings.QDRANT.get("ONNX_QUANTIZATION", "avx2")
+    export_dir = _onnx_export_dir(model_name)
+    if _quantized_file_name(export_dir, quantization):
+        return export_dir
+
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    logger.info("Exporting %s to ONNX (%s int8) in %s", model_name, quantization, export_dir)
+    os.makedirs(export_dir, exist_ok=True)
+    onnx_model = SentenceTransformer(model_name, backend=BACKEND_ONNX, device="cpu")
+    onnx_model.save_pretrained(export_dir)
+    export_dynamic_quantized_onnx_model(onnx_model, quantization, export_dir)
+    return export_dir
+
+
+def _set_torch_threads(num_threads: Optional[int]) -> None:
+    if not num_threads:
+        return
+    import torch
+
+    torch.set_num_threads(num_threads)
+
+
+def load_embedding_model(
+    model_name: str,
+    backend: str = BACKEND_TORCH,
+    num_threads: Optional[int] = None,
+) -> SentenceTransformer:
+    """Instancie un SentenceTransformer pour le backend demandé ("torch" ou "onnx")."""
+    backend = (backend or BACKEND_TORCH).lower()
+    if backend == BACKEND_TORCH:
+        logger.info("Loading embedding model %s (torch)", model_name)
+        _set_torch_threads(num_threads)
+        return SentenceTransformer(model_name)
+    if backend == BACKEND_ONNX:
+        try:
+            import onnxruntime
+        except ImportError as exc:
+            raise ImproperlyConfiguredBackend(
+                "EMBEDDING_BACKEND='onnx' requires the 'onnxruntime' and 'optimum' packages."
+            ) from exc
+
+        quantization = settings.QDRANT.get("ONNX_QUANTIZATION", "avx2")
+        export_dir = export_quantized_onnx_model(model_name, quantization)
+        session_options = onnxruntime.SessionOptions()
+        session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            session_options.intra_op_num_threads = num_threads
+            session_options.inter_op_num_threads = 1
+        logger.info("Loading embedding model %s (onnx int8 %s)", model_name, quantization)
+        return SentenceTransformer(
+            export_dir,
+            backend=BACKEND_ONNX,
+            device="cpu",
+            model_kwargs={
+                "file_name": _quantized_file_name(export_dir, quantization),
+                "provider": "CPUExecutionProvider",
+                "session_options": session_options,
+            },
+        )
+    raise ImproperlyConfiguredBackend(f"Unknown embedding backend '{backend}'.")
+
+
+@lru_cache(maxsize=4)
+def get_embedding_model(model_name: str) -> SentenceTransformer:
+    """Charge une seule fois chaque modèle d'embedding avec le backend configuré."""
+    cfg = settings.QDRANT
+    return load_embedding_model(
+        model_name,
+        backend=cfg.get("EMBEDDING_BACKEND", BACKEND_TORCH),
+        num_threads=cfg.get("EMBEDDING_THREADS"),
+    )
@@ -0,0 +1,81 @@
+import hashlib
+import logging
+import zlib
+from typing import List, Optional, Tuple, Union
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from library.db_router import current_db_alias
+from library.models import Document, PageExtraction
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter dès que la sortie des extracteurs change, pour invalider le cache.
+EXTRACTOR_VERSION = "1"
+
+
+def extractor_version(layout: bool = False) -> str:
+    """Version de la clé de cache ; le mode ``layout`` stocke des blocs JSON, pas du texte."""
+    if layout:
+        from .layout import LAYOUT_VERSION
+
+        return f"{EXTRACTOR_VERSION}+{LAYOUT_VERSION}"
+    return EXTRACTOR_VERSION
+
+
+def cache_enabled() -> bool:
+    return settings.DOCUMENT_PROCESSING.get("EXTRACTION_CACHE", True)
+
+
+def content_hash(content: Union[bytes, memoryview]) -> str:
+    """Empreinte SHA-256 du contenu du fichier."""
+    return hashlib.sha256(content).hexdigest()
+
+
+def ocr_languages_key(file_type: str, languages) -> str:
+    """Les langues OCR ne font partie de la clé que pour les images."""
+    if file_type != "image":
+        return ""
+    return ",".join(sorted(languages))
+
+
+def load_pages(
+    file_hash: str,
+    ocr_languages: str,
+    version: str = EXTRACTOR_VERSION,
+) -> Optional[List[Tuple[int, str]]]:
+    """Retourne les pages en cache pour ce fichier, ou ``None`` si rien n'est en cache."""
+    rows = PageExtraction.objects.filter(
+        file_hash=file_hash,
+        extractor_version=version,
+        ocr_languages=ocr_languages,
+    ).order_by("page_number").values_list("page_number", "compressed_text")
+    pages = [(page_number, zlib.decompress(bytes(blob)).decode("utf-8")) for page_number, blob in rows]
+    return pages or None
+
+
+def store_pages(
+    document: Document,
+    file_hash: str,
+    ocr_languages: str,
+    pages: List[Tuple[int, str]],
+    version: str = EXTRACTOR_VERSION,
+) -> None:
+    """Enregistre les pages extraites ; une écriture concurrente identique est ignorée."""
+    entries = [
+        PageExtraction(
+            document=document,
+            file_hash=file_hash,
+            extractor_version=version,
+            ocr_languages=ocr_languages,
+            page_number=page_number,
+            compressed_text=zlib.compress(text.encode("utf-8"), 6),
+        )
+        for page_number, text in pages
+    ]
+    try:
+        with transaction.atomic(using=current_db_alias()):
+            PageExtraction.objects.bulk_create(entries, ignore_conflicts=True)
+    except IntegrityError as exc:
+        logger.warning("Could not store extraction cache for %s: %s", document.id, exc)
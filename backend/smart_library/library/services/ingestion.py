@@ -0,0 +1,359 @@
+import logging
+import os
+import threading
+import time
+import uuid
+import zipfile
+from functools import partial
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, connections, transaction
+from django.utils import timezone
+
+from library.db_router import current_db_alias, use_ingestion_db
+from library.models import Document, IngestionJob, ReindexRun
+
+from .centroids import batch_centroids, upsert_centroids
+from .dedup import dedup_enabled, encode_signature, find_duplicates, link_duplicates, signature
+from .document_processing import (
+    Chunk,
+    build_qdrant_points,
+    detect_file_type,
+    encode_texts,
+    get_qdrant_client,
+    clear_staged_embeddings,
+    points_for_collection,
+    remove_existing_embeddings,
+    upsert_points,
+)
+from .scheduler import Priority, get_scheduler
+from .stats import apply_changes, tracked_values, update_documents
+from .tagging import apply_suggested_tags
+from .vector_spaces import active_space, collection_vector_names, configured_models, write_spaces
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_DIR = "documents"
+
+
+def fallback_status(document: Document) -> str:
+    """Statut restauré lorsqu'un traitement échoue."""
+    return 'pending_meta' if document.source == 'general' else 'uploaded'
+
+
+def iter_archive_members(archive) -> Iterator[Tuple[str, File]]:
+    """Parcourt les fichiers d'une archive zip sans les extraire en mémoire.
+
+    La taille de chaque fichier est celle déclarée par l'archive (``ZipInfo.file_size``) :
+    la lecture d'un membre s'arrête à cette taille et échoue si le contenu la dépasse.
+    """
+    with zipfile.ZipFile(archive) as bundle:
+        for info in bundle.infolist():
+            name = os.path.basename(info.filename)
+            if info.is_dir() or not name or name.startswith(".") or info.filename.startswith("__MACOSX/"):
+                continue
+            with bundle.open(info) as member:
+                file = File(member, name=name)
+                # Sans cela, File.size décompresserait le membre pour en trouver la fin.
+                file.size = info.file_size
+                yield name, file
+
+
+def _storage_path(name: str) -> str:
+    try:
+        return default_storage.path(name)
+    except NotImplementedError:
+        return ""
+
+
+def create_bulk_documents(
+    owner,
+    files: Iterable[Tuple[str, File]],
+    *,
+    source: str = 'personal',
+    language: str = "",
+    tag=None,
+) -> Tuple[List[Document], List[Dict]]:
+    """Enregistre les fichiers dans le stockage puis crée les ``Document`` en un seul INSERT.
+
+    Chaque fichier est copié par blocs vers ``documents/`` ; les fichiers d'un type non
+    supporté sont refusés. Retourne les documents créés et le statut de chaque fichier.
+    Le stockage ne suit pas les transactions : en cas d'erreur, les fichiers déjà copiés
+    sont supprimés, et l'appelant dont la transaction échoue ensuite doit passer les
+    documents à :func:`delete_stored_files`.
+    """
+    documents: List[Document] = []
+    try:
+        results = _store_bulk_files(owner, files, documents, source=source, language=language, tag=tag)
+        Document.objects.bulk_create(documents)
+    except BaseException:
+        delete_stored_files(documents)
+        raise
+    apply_changes((None, tracked_values(document)) for document in documents)
+    return documents, results
+
+
+def _store_bulk_files(owner, files, documents: List[Document], **fields) -> List[Dict]:
+    max_files = settings.DOCUMENT_PROCESSING.get("BULK_MAX_FILES", 1000)
+    max_file_size = settings.DOCUMENT_PROCESSING.get("BULK_MAX_FILE_SIZE", 200 * 1024 * 1024)
+    max_total_size = settings.DOCUMENT_PROCESSING.get("BULK_MAX_TOTAL_SIZE", 2 * 1024 * 1024 * 1024)
+    results: List[Dict] = []
+    total_size = 0
+    for filename, fileobj in files:
+        if len(results) >= max_files:
+            results.append({"filename": filename, "status": "rejected", "error": "Too many files."})
+            break
+        if detect_file_type(filename) == "unknown":
+            results.append({"filename": filename, "status": "rejected", "error": "Unsupported file type."})
+            continue
+        # Tailles vérifiées avant toute lecture : une archive zip peut déclarer des membres énormes.
+        if fileobj.size > max_file_size:
+            results.append({"filename": filename, "status": "rejected", "error": "File too large."})
+            continue
+        if total_size + fileobj.size > max_total_size:
+            results.append({"filename": filename, "status": "rejected", "error": "Total size limit exceeded."})
+            break
+        total_size += fileobj.size
+        stored_name = default_storage.save(f"{UPLOAD_DIR}/{filename}", fileobj)
+        document = Document(
+            id=uuid.uuid4(),
+            file=stored_name,
+            filename=os.path.basename(stored_name),
+            path=_storage_path(stored_name),
+            title=os.path.splitext(filename)[0][:255],
+            owner=owner,
+            status='uploaded',
+            **fields,
+        )
+        documents.append(document)
+        results.append({"filename": filename, "document_id": str(document.id), "status": "accepted"})
+    return results
+
+
+def delete_stored_files(documents: Iterable[Document]) -> None:
+    """Supprime les fichiers de documents dont la création a été annulée."""
+    for document in documents:
+        try:
+            default_storage.delete(document.file.name)
+        except OSError as exc:
+            logger.warning("Could not delete orphaned file %s: %s", document.file.name, exc)
+
+
+def running_reindex() -> Optional[ReindexRun]:
+    return ReindexRun.objects.filter(status='running').first()
+
+
+def index_document_group(
+    prepared: List[Tuple[Document, List[Chunk]]],
+    target_collection: Optional[str] = None,
+) -> None:
+    """Vectorise et indexe plusieurs documents en partageant lots d'embedding et upserts.
+
+    Avec ``target_collection`` (réindexation), les points sont écrits dans cette collection
+    pour tous les espaces qu'elle déclare ; les chunks correspondants restent en attente et
+    ceux de la collection active, toujours servis par la recherche, sont laissés en place
+    jusqu'à la bascule de l'alias (voir ``promote_staged_embeddings``). Hors réindexation,
+    les points vont dans la collection active et, si une réindexation tourne, aussi dans sa
+    collection cible : sinon ces documents disparaîtraient à la bascule. Les quasi-doublons
+    des documents généraux ne sont pas vectorisés quand ``CHUNK_DEDUP`` est actif (voir
+    ``dedup``), sauf pendant une réindexation dont la cible n'a pas leurs points canoniques.
+    Le centroïde de chaque document est écrit dans la collection des centroïdes et sert à
+    suggérer un tag aux documents qui n'en ont pas (voir ``tagging``).
+
+    Les écritures Qdrant (suppressions, points, payloads partagés, centroïdes) sont
+    différées jusqu'à la validation de la transaction : une transaction annulée ne laisse
+    ni point orphelin ni point supprimé. Si l'une d'elles échoue, l'exception remonte et le
+    document reprend son statut de repli ; les lignes déjà validées sont nettoyées au
+    traitement suivant.
+    """
+    started = time.monotonic()
+    client = get_qdrant_client()
+    run = mirror = None
+    if target_collection:
+        run = ReindexRun.objects.filter(target_collection=target_collection, status='running').first()
+        if run is None:
+            raise ValueError(f"No running reindex writes into '{target_collection}'.")
+    else:
+        mirror = running_reindex()
+    names = collection_vector_names(client, target_collection)
+    named = names is not None
+    if not named:
+        spaces = [active_space()]
+    elif target_collection:
+        spaces = [space for space in configured_models() if space in names]
+    else:
+        spaces = [space for space in write_spaces() if space in names]
+    if not spaces:
+        collection = target_collection or settings.QDRANT["COLLECTION"]
+        raise ValueError(f"Collection '{collection}' declares none of the vector spaces to write.")
+    mirror_names = None
+    if mirror is not None:
+        mirror_names = collection_vector_names(client, mirror.target_collection) or set()
+        spaces += [space for space in configured_models() if space in mirror_names and space not in spaces]
+    deduplicate = target_collection is None and mirror is None and dedup_enabled()
+    flat = [(document, chunk) for document, chunks in prepared for chunk in chunks]
+    signatures = [
+        signature(chunk.text) if deduplicate and document.source == 'general' else None
+        for document, chunk in flat
+    ]
+    matches = (
+        find_duplicates(signatures, exclude_document_ids=[document.pk for document, _ in prepared])
+        if deduplicate
+        else [None] * len(flat)
+    )
+    texts = [chunk.text for (_, chunk), match in zip(flat, matches) if match is None]
+    vectors_by_space = encode_texts(texts, spaces=spaces)
+    documents = [document for document, _ in prepared]
+    centroids = batch_centroids(client, [len(chunks) for _, chunks in prepared], matches, vectors_by_space, named)
+    if target_collection is None:
+        # Avant build_qdrant_points : le payload des chunks porte le nom du tag.
+        apply_suggested_tags(documents, centroids)
+    points = []
+    # Point Qdrant de chaque chunk canonique du lot, par position dans ``flat``.
+    point_by_position: Dict[int, str] = {}
+    position = 0
+    offset = 0
+    using = current_db_alias()
+    with transaction.atomic(using=using):
+        for document, chunks in prepared:
+            if run is not None:
+                clear_staged_embeddings(document, run, client)
+            else:
+                remove_existing_embeddings(document, client, mirror=mirror)
+            positions = range(position, position + len(chunks))
+            position += len(chunks)
+            kept = [i for i in positions if matches[i] is None]
+            document_vectors = {
+                space: vectors[offset:offset + len(kept)] for space, vectors in vectors_by_space.items()
+            }
+            offset += len(kept)
+            document_points = build_qdrant_points(
+                document,
+                [flat[i][1] for i in kept],
+                document_vectors,
+                named_vectors=named or mirror is not None,
+                minhashes=[encode_signature(signatures[i]) if signatures[i] is not None else None for i in kept],
+                reindex_run=run,
+            )
+            point_by_position.update(zip(kept, (str(point.id) for point in document_points)))
+            points.extend(document_points)
+        # Écritures Qdrant après la validation, dans l'ordre d'enregistrement (suppressions
+        # des anciens points, nouveaux points, payloads partagés puis centroïdes).
+        transaction.on_commit(
+            partial(upsert_points, client, points_for_collection(points, names, spaces[0]), target_collection),
+            using=using,
+        )
+        if mirror is not None:
+            transaction.on_commit(
+                partial(
+                    upsert_points,
+                    client,
+                    points_for_collection(points, mirror_names, spaces[0]),
+                    mirror.target_collection,
+                ),
+                using=using,
+            )
+        if deduplicate:
+            link_duplicates(client, flat, signatures, matches, point_by_position)
+        transaction.on_commit(partial(upsert_centroids, client, documents, centroids), using=using)
+        # Part de l'indexation du lot ajoutée à la durée d'extraction de chaque document.
+        indexing_ms = int((time.monotonic() - started) * 1000 / len(prepared))
+        for document, chunks in prepared:
+            document.status = 'indexed'
+            document.chunk_count = len(chunks)
+            document.processing_ms = (document.processing_ms or 0) + indexing_ms
+            document.save(
+                update_fields=[
+                    'status', 'chunk_count', 'page_count', 'char_count', 'processing_ms', 'language', 'tag',
+                ]
+            )
+    logger.info(
+        "Indexed %d documents with %d chunks (%d points) in one batch", len(prepared), len(flat), len(points)
+    )
+
+
+def ingest_documents(documents: List[Document], priority: Priority = Priority.BULK) -> Dict[str, Optional[str]]:
+    """Traite une liste de documents par groupes de ``INGESTION_BATCH_DOCUMENTS``.
+
+    Les groupes passent par l'ordonnanceur d'ingestion avec la classe ``priority``.
+    Retourne pour chaque identifiant de document ``None`` en cas de succès ou le message
+    d'erreur. Un document en échec reprend son statut de repli.
+    """
+    group_size = settings.DOCUMENT_PROCESSING.get("INGESTION_BATCH_DOCUMENTS", 16)
+    scheduler = get_scheduler()
+    futures = [
+        scheduler.submit(documents[start:start + group_size], priority)
+        for start in range(0, len(documents), group_size)
+    ]
+    outcome: Dict[str, Optional[str]] = {}
+    for future in futures:
+        outcome.update(future.result())
+    for document in documents:
+        if outcome.get(str(document.id)) is not None:
+            update_documents(Document.objects.filter(pk=document.pk), status=fallback_status(document))
+    return outcome
+
+
+def run_ingestion_job(job_id, priority: Priority = Priority.BULK) -> None:
+    """Exécute un import en masse et met à jour le statut par fichier du job."""
+    job = IngestionJob.objects.get(pk=job_id)
+    job.status = 'running'
+    job.save(update_fields=['status'])
+
+    document_ids = [entry["document_id"] for entry in job.results if entry.get("status") == "accepted"]
+    # Un document général n'est traité qu'après validation (hors statut ``uploaded``).
+    documents = list(
+        Document.objects.select_related("tag")
+        .filter(pk__in=document_ids)
+        .exclude(source='general', status='uploaded')
+    )
+    # La connexion retourne au pool pendant que les workers de l'ordonnanceur traitent le job.
+    connections.close_all()
+    try:
+        outcome = ingest_documents(documents, priority)
+    except Exception as exc:
+        logger.exception("Ingestion job %s failed", job.id, exc_info=exc)
+        job.status = 'failed'
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'finished_at'])
+        return
+
+    for entry in job.results:
+        document_id = entry.get("document_id")
+        if document_id not in outcome:
+            if entry.get("status") == "accepted":
+                entry["status"] = "awaiting_approval"
+            continue
+        error = outcome[document_id]
+        entry["status"] = "failed" if error else "indexed"
+        if error:
+            entry["error"] = error
+    job.processed_count = sum(1 for error in outcome.values() if error is None)
+    job.failed_count = sum(1 for error in outcome.values() if error is not None)
+    job.status = 'completed'
+    job.finished_at = timezone.now()
+    job.save(update_fields=['results', 'processed_count', 'failed_count', 'status', 'finished_at'])
+
+
+def _run_in_background(job_id, priority: Priority) -> None:
+    with use_ingestion_db():
+        close_old_connections()
+        try:
+            run_ingestion_job(job_id, priority)
+        finally:
+            connections.close_all()
+
+
+def schedule_ingestion_job(job: IngestionJob, priority: Priority = Priority.BULK) -> None:
+    """Lance le job dans un thread de fond une fois la transaction courante validée."""
+    transaction.on_commit(
+        lambda: threading.Thread(
+            target=_run_in_background,
+            args=(job.pk, priority),
+            name=f"ingestion-{job.pk}",
+            daemon=True,
+        ).start()
+    )
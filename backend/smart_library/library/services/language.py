@@ -0,0 +1,89 @@
+"""Identification rapide de la langue d'un document à partir de ses premières pages.
+
+Pas de modèle à charger : l'écriture (arabe, cyrillique, grec) tranche d'abord, puis
+pour l'alphabet latin on compte les mots-outils de chaque langue, très fréquents et
+propres à chacune. Quelques milliers de caractères suffisent et l'appel coûte moins
+d'une milliseconde. Sans écart net entre les deux meilleures langues, on ne décide pas
+(``None``) : la langue reste à renseigner à la main.
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Iterable, Optional, Tuple
+
+from django.conf import settings
+
+STOPWORDS = {
+    "fr": "le la les des une est et en du que qui dans pour pas sur au aux avec ce cette sont par "
+    "plus ou il elle nous vous ils leur mais comme été être fait entre aussi",
+    "en": "the and of to is in that it for was on are with as be by this have from or not "
+    "which an at were but their has been its would these there",
+    "es": "el la los las del que es en y una por con para se su al lo como más pero sus "
+    "fue son está entre también este esta ha muy",
+    "de": "der die das und ist nicht mit ein eine den dem des von zu auf für sich auch im "
+    "werden wird sind bei oder aus nach wie wir",
+    "it": "il la che di è per una del della sono con non gli nel alla anche come le dei "
+    "delle più ma questo questa essere stato",
+    "pt": "o os as que é em um uma do da dos das para com não por mais como mas foi ao "
+    "seu sua são também pelo pela entre",
+    "nl": "het een van is dat op te zijn niet met voor die er aan ook als wordt "
+    "worden door bij naar maar uit dit",
+}
+_STOPWORDS = {language: frozenset(words.split()) for language, words in STOPWORDS.items()}
+
+# Écritures propres à une langue (parmi celles prises en charge par l'OCR).
+SCRIPTS: Tuple[Tuple[str, "re.Pattern"], ...] = (
+    ("ar", re.compile(r"[\u0600-\u06ff]")),
+    ("ru", re.compile(r"[\u0400-\u04ff]")),
+    ("el", re.compile(r"[\u0370-\u03ff]")),
+)
+WORD_RE = re.compile(r"[^\W\d_]+")
+
+
+@dataclass
+class Detection:
+    language: str
+    confidence: float
+
+
+def _config(name: str, default):
+    return settings.DOCUMENT_PROCESSING.get("LANGUAGE_DETECTION", {}).get(name, default)
+
+
+def detection_enabled() -> bool:
+    return _config("ENABLED", True)
+
+
+def sample_text(pages: Iterable[Tuple[int, str]]) -> str:
+    """Texte des ``SAMPLE_PAGES`` premières pages, tronqué à ``SAMPLE_CHARS``."""
+    max_pages = _config("SAMPLE_PAGES", 3)
+    max_chars = _config("SAMPLE_CHARS", 5000)
+    parts = []
+    size = 0
+    for count, (_, text) in enumerate(pages):
+        if count >= max_pages or size >= max_chars:
+            break
+        parts.append(text)
+        size += len(text)
+    return " ".join(parts)[:max_chars]
+
+
+def detect_language(text: str) -> Optional[Detection]:
+    """Langue dominante de ``text`` ou ``None`` si le texte ne permet pas de trancher."""
+    letters = sum(map(str.isalpha, text))
+    if not letters:
+        return None
+    for language, pattern in SCRIPTS:
+        share = len(pattern.findall(text)) / letters
+        if share >= 0.5:
+            return Detection(language, round(share, 3))
+
+    words = Counter(word.lower() for word in WORD_RE.findall(text))
+    scores = sorted(
+        ((sum(words[word] for word in stopwords), language) for language, stopwords in _STOPWORDS.items()),
+        reverse=True,
+    )
+    (best, language), (second, _) = scores[0], scores[1]
+    if best < _config("MIN_HITS", 5) or best < second * _config("MIN_MARGIN", 1.5):
+        return None
+    return Detection(language, round(best / (best + second), 3))
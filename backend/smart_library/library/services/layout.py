@@ -0,0 +1,255 @@
+"""Extraction PDF structurée : blocs dans l'ordre de lecture, tableaux par lignes, zones.
+
+Le mode ``"text"`` (``page.get_text("text")`` puis ``clean_text``) suit l'ordre du flux
+PDF et aplatit les lignes : deux colonnes s'entremêlent et un tableau devient une suite
+de cellules. Le mode ``"layout"`` part des blocs de la page (``extractBLOCKS``, moins
+coûteux que le texte brut) :
+
+* ordre de lecture : les blocs larges coupent la page en sections ; dans une section,
+  les blocs étroits sont regroupés en colonnes lues de gauche à droite, de haut en bas ;
+* tableaux : un bloc dont les lignes sont côte à côte plutôt qu'empilées (largeur par
+  caractère très supérieure à la hauteur de ligne) devient une rangée
+  ``cellule | cellule`` ; s'il couvre plusieurs rangées, il est relu mot à mot pour les
+  séparer. Les rangées consécutives fusionnent en un tableau ;
+* zones : chaque chunk garde le rectangle (en points PDF) de chaque bloc qu'il couvre.
+
+Le résultat par page est sérialisable en JSON pour le cache d'extraction.
+"""
+import json
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Tuple
+
+import fitz  # PyMuPDF
+
+# Partie de la clé du cache d'extraction propre à ce mode, à incrémenter avec sa sortie.
+LAYOUT_VERSION = "layout-1"
+TABLE_SEPARATOR = " | "
+TEXT_FLAGS = fitz.TEXTFLAGS_BLOCKS & ~fitz.TEXT_PRESERVE_IMAGES
+# Un bloc plus large que cette part de la zone de texte forme sa propre section.
+WIDE_BLOCK_RATIO = 0.6
+BULLETS_RE = re.compile(r"[~•·▪◆●■□¤▪️]")
+SPACES_RE = re.compile(r"\s+")
+
+Box = Tuple[float, float, float, float]
+
+
+@dataclass
+class Unit:
+    """Ligne d'un paragraphe ou rangée d'un tableau."""
+
+    text: str
+    bbox: Box
+
+
+@dataclass
+class Block:
+    kind: str  # "text" ou "table"
+    bbox: Box
+    units: List[Unit]
+
+    @property
+    def text(self) -> str:
+        return ("\n" if self.kind == "table" else " ").join(unit.text for unit in self.units)
+
+
+def _clean(text: str) -> str:
+    return SPACES_RE.sub(" ", BULLETS_RE.sub(" ", text)).strip()
+
+
+def _union(boxes) -> Box:
+    boxes = list(boxes)
+    return (
+        min(box[0] for box in boxes),
+        min(box[1] for box in boxes),
+        max(box[2] for box in boxes),
+        max(box[3] for box in boxes),
+    )
+
+
+def _is_tabular(bbox: Box, lines: List[str]) -> bool:
+    """Lignes côte à côte : la largeur par caractère dépasse de loin la hauteur de ligne."""
+    if len(lines) < 2:
+        return False
+    pitch = (bbox[3] - bbox[1]) / len(lines)
+    longest = max(len(line) for line in lines)
+    return (bbox[2] - bbox[0]) / max(longest, 1) > 2 * pitch
+
+
+def _table_rows(words: List[Tuple]) -> List[Unit]:
+    """Regroupe les mots d'un bloc en rangées (même hauteur) puis en cellules (même ligne)."""
+    cells: Dict[int, List] = {}
+    for x0, y0, x1, y1, word, _, line_no, _ in words:
+        cell = cells.setdefault(line_no, [x0, y0, x1, y1, []])
+        cell[0], cell[1] = min(cell[0], x0), min(cell[1], y0)
+        cell[2], cell[3] = max(cell[2], x1), max(cell[3], y1)
+        cell[4].append(word)
+    rows: List[List] = []
+    for cell in sorted(cells.values(), key=lambda cell: (cell[1] + cell[3]) / 2):
+        middle = (cell[1] + cell[3]) / 2
+        if rows and rows[-1][0][1] <= middle <= rows[-1][0][3]:
+            rows[-1].append(cell)
+        else:
+            rows.append([cell])
+    units = []
+    for row in rows:
+        row.sort(key=lambda cell: cell[0])
+        text = TABLE_SEPARATOR.join(_clean(" ".join(cell[4])) for cell in row)
+        units.append(Unit(text, _union(cell[:4] for cell in row)))
+    return units
+
+
+def reading_order(blocks: List[Block]) -> List[Block]:
+    if not blocks:
+        return []
+    left = min(block.bbox[0] for block in blocks)
+    right = max(block.bbox[2] for block in blocks)
+    wide = WIDE_BLOCK_RATIO * (right - left)
+    ordered: List[Block] = []
+    columns: List[List] = []
+
+    def flush():
+        for _, _, members in sorted(columns, key=lambda column: column[0]):
+            ordered.extend(sorted(members, key=lambda block: block.bbox[1]))
+        columns.clear()
+
+    for block in sorted(blocks, key=lambda block: (block.bbox[1], block.bbox[0])):
+        x0, _, x1, _ = block.bbox
+        if x1 - x0 >= wide:
+            flush()
+            ordered.append(block)
+            continue
+        for column in columns:
+            overlap = min(x1, column[1]) - max(x0, column[0])
+            if overlap > 0.5 * min(x1 - x0, column[1] - column[0]):
+                column[0], column[1] = min(x0, column[0]), max(x1, column[1])
+                column[2].append(block)
+                break
+        else:
+            columns.append([x0, x1, [block]])
+    flush()
+    return ordered
+
+
+def _merge_tables(blocks: List[Block]) -> List[Block]:
+    """Fusionne les rangées consécutives d'un même tableau (un bloc par rangée dans MuPDF)."""
+    merged: List[Block] = []
+    for block in blocks:
+        previous = merged[-1] if merged else None
+        if (
+            previous is not None
+            and block.kind == previous.kind == "table"
+            and block.units[0].text.count(TABLE_SEPARATOR) == previous.units[-1].text.count(TABLE_SEPARATOR)
+        ):
+            previous.units.extend(block.units)
+            previous.bbox = _union([previous.bbox, block.bbox])
+        else:
+            merged.append(block)
+    return merged
+
+
+def page_blocks(page: fitz.Page) -> List[Block]:
+    """Blocs de texte d'une page dans l'ordre de lecture."""
+    textpage = page.get_textpage(flags=TEXT_FLAGS)
+    blocks: List[Block] = []
+    candidates = []
+    pitches = []
+    for x0, y0, x1, y1, text, block_no, block_type in textpage.extractBLOCKS():
+        if block_type != 0:
+            continue
+        lines = [line for line in (_clean(line) for line in text.splitlines()) if line]
+        if not lines:
+            continue
+        bbox = (x0, y0, x1, y1)
+        if _is_tabular(bbox, lines):
+            candidates.append((block_no, len(blocks), lines))
+            blocks.append(Block("table", bbox, []))
+        else:
+            # Sans la géométrie de chaque ligne, toutes partagent la zone du bloc.
+            blocks.append(Block("text", bbox, [Unit(" ".join(lines), bbox)]))
+            if len(lines) > 1:
+                pitches.append((y1 - y0) / len(lines))
+    line_height = sorted(pitches)[len(pitches) // 2] if pitches else None
+    tabular: Dict[int, int] = {}
+    for block_no, position, lines in candidates:
+        block = blocks[position]
+        if line_height and block.bbox[3] - block.bbox[1] < 1.5 * line_height:
+            # Une seule rangée (cas courant : MuPDF fait un bloc par rangée), cellules dans l'ordre du flux.
+            block.units = [Unit(TABLE_SEPARATOR.join(lines), block.bbox)]
+        else:
+            tabular[block_no] = position
+    if tabular:
+        # Mots relus sur le même TextPage, uniquement pour les pages avec un tableau.
+        words_by_block: Dict[int, List[Tuple]] = {}
+        for word in textpage.extractWORDS():
+            if word[5] in tabular:
+                words_by_block.setdefault(word[5], []).append(word)
+        for block_no, position in tabular.items():
+            blocks[position].units = _table_rows(words_by_block.get(block_no, []))
+        blocks = [block for block in blocks if block.units]
+    return _merge_tables(reading_order(blocks))
+
+
+def page_text(blocks: List[Block]) -> str:
+    return "\n".join(block.text for block in blocks)
+
+
+def dump_blocks(blocks: List[Block]) -> str:
+    return json.dumps(
+        [
+            {"k": block.kind, "b": block.bbox, "u": [[unit.text, unit.bbox] for unit in block.units]}
+            for block in blocks
+        ],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+def load_blocks(raw: str) -> List[Block]:
+    return [
+        Block(item["k"], tuple(item["b"]), [Unit(text, tuple(bbox)) for text, bbox in item["u"]])
+        for item in json.loads(raw)
+    ]
+
+
+def layout_chunks(blocks: List[Block], chunk_size: int, overlap: int) -> Iterator[Tuple[str, List[List[float]]]]:
+    """Découpe comme ``generate_chunks`` (fenêtre de mots avec recouvrement) en gardant les
+    sauts de ligne entre blocs et rangées, sans couper une rangée de tableau ; chaque chunk
+    porte la zone couverte dans chacun de ses blocs."""
+    if chunk_size <= overlap:
+        raise ValueError("chunk_size must be greater than overlap")
+    words: List[str] = []
+    starts: List[int] = []
+    units: List[Tuple[int, Unit, bool]] = []
+    for block_index, block in enumerate(blocks):
+        for unit in block.units:
+            unit_words = unit.text.split()
+            if not unit_words:
+                continue
+            starts.append(len(words))
+            units.append((block_index, unit, block.kind == "table"))
+            words.extend(unit_words)
+    length = len(words)
+    ends = starts[1:] + [length]
+    start = 0
+    while start < length:
+        end = min(length, start + chunk_size)
+        last = bisect_right(starts, end - 1) - 1
+        if end < length and units[last][2] and ends[last] - starts[last] <= chunk_size:
+            end = ends[last]
+        first = bisect_right(starts, start) - 1
+        parts: List[str] = []
+        boxes: Dict[int, List[Box]] = {}
+        for index in range(first, last + 1):
+            block_index, unit, is_row = units[index]
+            text = " ".join(words[max(start, starts[index]):min(end, ends[index])])
+            if parts:
+                new_line = is_row or block_index != units[index - 1][0]
+                parts.append("\n" if new_line else " ")
+            parts.append(text)
+            boxes.setdefault(block_index, []).append(unit.bbox)
+        yield "".join(parts), [[round(value, 1) for value in _union(group)] for group in boxes.values()]
+        if end == length:
+            break
+        start = max(end - overlap, start + 1)
@@ -0,0 +1,99 @@
+"""Bibliothèque d'un utilisateur : documents personnels, favoris et documents généraux récents.
+
+Trois requêtes indexées (aucune par document), le drapeau ``is_favorite`` étant calculé
+par un ``Exists`` corrélé. Le résultat sérialisé est mis en cache par utilisateur :
+
+* une modification de favori ou d'un document personnel incrémente la génération des
+  utilisateurs concernés ;
+* une modification d'un document général (visible de tous) incrémente une génération
+  commune, ce qui périme toutes les clés d'un coup sans les parcourir.
+
+La clé inclut aussi l'origine de la requête : ``file`` est une URL absolue.
+"""
+from typing import Dict, Iterable
+
+from django.core.cache import cache
+from django.db.models import Exists, F, Max, OuterRef
+from rest_framework.renderers import JSONRenderer
+
+from library.models import Document, Favorite
+from library.serializers import LibraryDocumentSerializer
+
+LIBRARY_CACHE_TTL = 300
+RECENT_GENERAL_LIMIT = 20
+GENERATION_KEY = "library:me:generation"
+
+
+def _user_generation_key(user_id) -> str:
+    return f"library:me:{user_id}:generation"
+
+
+def _generation(key: str) -> int:
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, 1, None)
+        generation = cache.get(key, 1)
+    return generation
+
+
+def _cache_key(user_id, origin: str) -> str:
+    general = _generation(GENERATION_KEY)
+    personal = _generation(_user_generation_key(user_id))
+    return f"library:me:{user_id}:{general}:{personal}:{origin}"
+
+
+def _bump(key: str) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+
+
+def invalidate_users(user_ids: Iterable) -> None:
+    for user_id in set(user_ids):
+        _bump(_user_generation_key(user_id))
+
+
+def invalidate_general() -> None:
+    """Périme la bibliothèque de tous les utilisateurs (document général modifié)."""
+    _bump(GENERATION_KEY)
+
+
+def _documents(user):
+    return Document.objects.select_related("tag").annotate(
+        is_favorite=Exists(Favorite.objects.filter(user=user, document=OuterRef("pk")))
+    )
+
+
+def build_user_library(user, request=None) -> Dict:
+    personal = _documents(user).filter(owner=user, source="personal").order_by("-date_added")
+    favorites = (
+        _documents(user)
+        .filter(favorited_by__user=user)
+        .annotate(favorited_at=F("favorited_by__created_at"))
+        .order_by("-favorited_at")
+    )
+    recent_general = (
+        _documents(user)
+        .filter(source="general", message_references__message__conversation__user=user)
+        .annotate(last_used=Max("message_references__message__created_at"))
+        .order_by("-last_used")[:RECENT_GENERAL_LIMIT]
+    )
+    return {
+        name: list(LibraryDocumentSerializer(queryset, many=True, context={"request": request}).data)
+        for name, queryset in (
+            ("personal", personal),
+            ("favorites", favorites),
+            ("recent_general", recent_general),
+        )
+    }
+
+
+def user_library_json(request) -> bytes:
+    """Réponse JSON déjà rendue : une lecture en cache ne désérialise aucun document."""
+    key = _cache_key(request.user.pk, request.build_absolute_uri("/"))
+    body = cache.get(key)
+    if body is None:
+        body = JSONRenderer().render(build_user_library(request.user, request))
+        cache.set(key, body, LIBRARY_CACHE_TTL)
+    return body
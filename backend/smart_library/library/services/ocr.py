@@ -0,0 +1,120 @@
+"""Lecteurs EasyOCR partagés, un par combinaison de langues.
+
+Un lecteur embarque un détecteur et un modèle de reconnaissance propre à ses langues :
+le charger prend plusieurs secondes et plusieurs centaines de Mo. Le pool garde les
+lecteurs déjà chargés (clé : tuple trié des langues) dans la limite de ``MAX_READERS``
+et de ``MAX_MEMORY_MB``, mesurée sur les poids des réseaux, et évince le moins
+récemment utilisé. Un lecteur évincé reste valide pour les appels en cours.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Tuple
+
+import easyocr
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+LanguageKey = Tuple[str, ...]
+
+
+@dataclass
+class _Entry:
+    reader: easyocr.Reader
+    size: int
+
+
+def reader_size(reader: easyocr.Reader) -> int:
+    """Octets occupés par les poids du détecteur et du modèle de reconnaissance."""
+    size = 0
+    for name in ("detector", "recognizer"):
+        module = getattr(reader, name, None)
+        if module is not None and hasattr(module, "parameters"):
+            size += sum(param.numel() * param.element_size() for param in module.parameters())
+    return size
+
+
+class ReaderPool:
+    def __init__(self, max_readers: int, max_bytes: int, gpu: bool = False):
+        self.max_readers = max(1, max_readers)
+        self.max_bytes = max_bytes
+        self.gpu = gpu
+        self._readers: "OrderedDict[LanguageKey, _Entry]" = OrderedDict()
+        self._loading: Dict[LanguageKey, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    @staticmethod
+    def key(languages: Iterable[str]) -> LanguageKey:
+        return tuple(sorted(set(languages)))
+
+    def get(self, languages: Iterable[str]) -> easyocr.Reader:
+        key = self.key(languages)
+        with self._lock:
+            entry = self._readers.get(key)
+            if entry is not None:
+                self._readers.move_to_end(key)
+                self.hits += 1
+                return entry.reader
+            loading = self._loading.setdefault(key, threading.Lock())
+        # Un seul chargement par clé ; les autres demandeurs attendent son résultat.
+        with loading:
+            with self._lock:
+                entry = self._readers.get(key)
+                if entry is not None:
+                    self._readers.move_to_end(key)
+                    self.hits += 1
+                    return entry.reader
+                self.misses += 1
+            logger.info("Loading EasyOCR with languages %s", list(key))
+            reader = easyocr.Reader(list(key), gpu=self.gpu)
+            size = reader_size(reader)
+            with self._lock:
+                self._readers[key] = _Entry(reader, size)
+                self._loading.pop(key, None)
+                self._evict()
+        return reader
+
+    def _evict(self) -> None:
+        # Le lecteur le plus récent est toujours conservé, même seul au-dessus du budget.
+        while len(self._readers) > 1 and (
+            len(self._readers) > self.max_readers or self.memory_bytes() > self.max_bytes
+        ):
+            key, entry = self._readers.popitem(last=False)
+            self.evictions += 1
+            logger.info("Evicting EasyOCR reader %s (%.0f MiB)", list(key), entry.size / 1024 / 1024)
+
+    def memory_bytes(self) -> int:
+        return sum(entry.size for entry in self._readers.values())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._readers.clear()
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "readers": [
+                    {"languages": list(key), "memory_mb": round(entry.size / 1024 / 1024, 1)}
+                    for key, entry in self._readers.items()
+                ],
+                "memory_mb": round(self.memory_bytes() / 1024 / 1024, 1),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+@lru_cache(maxsize=1)
+def get_reader_pool() -> ReaderPool:
+    """Pool partagé du processus, configuré par ``OCR_READER_POOL``."""
+    cfg = settings.DOCUMENT_PROCESSING
+    pool = cfg.get("OCR_READER_POOL", {})
+    return ReaderPool(
+        max_readers=pool.get("MAX_READERS", 3),
+        max_bytes=int(pool.get("MAX_MEMORY_MB", 1024) * 1024 * 1024),
+        gpu=cfg.get("EASYOCR_GPU", False),
+    )
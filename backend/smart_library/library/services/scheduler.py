@@ -0,0 +1,318 @@
+"""Ordonnanceur d'ingestion : classes de priorité, limite par propriétaire, deux étages.
+
+L'extraction (PDF/OCR, un document par tâche) et l'indexation (embedding + upsert, un
+lot de documents par tâche) ont chacune leur pool de threads, dimensionné selon le
+nombre de CPU. Une tâche d'extraction n'est lancée que si son propriétaire a moins de
+``PER_OWNER_CONCURRENCY`` extractions en cours : un import massif ne monopolise donc
+pas les workers au détriment d'une validation d'administrateur (non limitée).
+"""
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from enum import IntEnum
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+from library.db_router import use_ingestion_db
+from library.models import Document
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Classes de priorité, de la plus urgente à la moins urgente."""
+
+    APPROVAL = 0
+    INTERACTIVE = 1
+    BULK = 2
+    REINDEX = 3
+
+
+@dataclass
+class _Batch:
+    """Documents soumis ensemble : extraits un par un, puis indexés en un seul lot."""
+
+    priority: Priority
+    target_collection: Optional[str]
+    update_status: bool
+    future: Future
+    pending: int
+    submitted_at: float
+    prepared: List[Tuple[Document, list]] = field(default_factory=list)
+    outcome: Dict[str, Optional[str]] = field(default_factory=dict)
+
+
+@dataclass(order=True)
+class _Task:
+    priority: int
+    seq: int
+    enqueued_at: float = field(compare=False)
+    batch: _Batch = field(compare=False)
+    document: Optional[Document] = field(default=None, compare=False)
+
+
+@dataclass
+class ClassStats:
+    queued: int = 0
+    running: int = 0
+    completed: int = 0
+    failed: int = 0
+    waits: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def as_dict(self) -> Dict:
+        return {
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_wait_ms": round(self.total_wait / self.waits * 1000, 1) if self.waits else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+        }
+
+
+class _StagePool:
+    """File à priorités servie par un nombre fixe de threads.
+
+    Un tas par couple (priorité, propriétaire) : l'admission ne dépend que de ce couple,
+    seules les têtes de tas sont donc examinées pour trouver la prochaine tâche.
+    """
+
+    def __init__(self, scheduler: "IngestionScheduler", name: str, workers: int, run: Callable[[_Task], None]):
+        self.scheduler = scheduler
+        self.name = name
+        self.workers = workers
+        self._run = run
+        self._queues: Dict[Tuple[int, Optional[str]], List[_Task]] = {}
+        self._threads: List[threading.Thread] = []
+
+    @staticmethod
+    def _queue_key(task: _Task) -> Tuple[int, Optional[str]]:
+        owner = str(task.document.owner_id) if task.document is not None else None
+        return task.priority, owner
+
+    def push(self, task: _Task) -> None:
+        heapq.heappush(self._queues.setdefault(self._queue_key(task), []), task)
+        self.scheduler.stats[self.name][Priority(task.priority)].queued += 1
+        if len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._loop,
+                name=f"ingestion-{self.name}-{len(self._threads)}",
+                daemon=True,
+            )
+            self._threads.append(thread)
+            thread.start()
+        self.scheduler.condition.notify_all()
+
+    def _pop_eligible(self) -> Optional[_Task]:
+        best = None
+        for key, queue in self._queues.items():
+            head = queue[0]
+            if (best is None or head < self._queues[best][0]) and self.scheduler.admits(self.name, head):
+                best = key
+        if best is None:
+            return None
+        queue = self._queues[best]
+        task = heapq.heappop(queue)
+        if not queue:
+            del self._queues[best]
+        return task
+
+    def _loop(self) -> None:
+        condition = self.scheduler.condition
+        while True:
+            with condition:
+                task = self._pop_eligible()
+                while task is None:
+                    condition.wait()
+                    task = self._pop_eligible()
+                self.scheduler.started(self.name, task)
+            try:
+                with use_ingestion_db():
+                    self._run(task)
+            except Exception as exc:
+                logger.exception("Ingestion %s task crashed", self.name)
+                if not task.batch.future.done():
+                    task.batch.future.set_exception(exc)
+            finally:
+                close_old_connections()
+                connections.close_all()
+                with condition:
+                    self.scheduler.finished(self.name, task)
+
+
+class IngestionScheduler:
+    """Répartit extraction et indexation entre classes de priorité et propriétaires."""
+
+    def __init__(
+        self,
+        extraction_workers: Optional[int] = None,
+        indexing_workers: int = 1,
+        per_owner_concurrency: int = 2,
+    ):
+        if extraction_workers is None:
+            extraction_workers = max(1, (os.cpu_count() or 2) // 2)
+        self.per_owner_concurrency = per_owner_concurrency
+        self.condition = threading.Condition()
+        self._seq = itertools.count()
+        self._running_by_owner: Dict[str, int] = {}
+        self.stats = {
+            stage: {priority: ClassStats() for priority in Priority}
+            for stage in ("extraction", "indexing")
+        }
+        self.extraction = _StagePool(self, "extraction", extraction_workers, self._extract)
+        self.indexing = _StagePool(self, "indexing", indexing_workers, self._index)
+
+    # -- soumission ---------------------------------------------------------------------
+
+    def submit(
+        self,
+        documents: List[Document],
+        priority: Priority,
+        *,
+        target_collection: Optional[str] = None,
+        update_status: bool = True,
+    ) -> Future:
+        """Planifie l'extraction puis l'indexation des documents.
+
+        Le ``Future`` retourné donne, par identifiant de document, ``None`` en cas de
+        succès ou le message d'erreur.
+        """
+        future: Future = Future()
+        if not documents:
+            future.set_result({})
+            return future
+        now = time.monotonic()
+        batch = _Batch(
+            priority=priority,
+            target_collection=target_collection,
+            update_status=update_status,
+            future=future,
+            pending=len(documents),
+            submitted_at=now,
+        )
+        with self.condition:
+            for document in documents:
+                self.extraction.push(
+                    _Task(priority=priority, seq=next(self._seq), enqueued_at=now, batch=batch, document=document)
+                )
+        return future
+
+    def run(self, documents: List[Document], priority: Priority, **kwargs) -> Dict[str, Optional[str]]:
+        """Variante bloquante de :meth:`submit`."""
+        return self.submit(documents, priority, **kwargs).result()
+
+    # -- règles d'admission et statistiques (appelées sous ``condition``) ---------------
+
+    def admits(self, stage: str, task: _Task) -> bool:
+        # La limite par propriétaire ne freine que les envois des utilisateurs.
+        if stage != "extraction" or task.priority not in (Priority.INTERACTIVE, Priority.BULK):
+            return True
+        owner = str(task.document.owner_id)
+        return self._running_by_owner.get(owner, 0) < self.per_owner_concurrency
+
+    def started(self, stage: str, task: _Task) -> None:
+        wait = time.monotonic() - task.enqueued_at
+        stats = self.stats[stage][Priority(task.priority)]
+        stats.queued -= 1
+        stats.running += 1
+        stats.waits += 1
+        stats.total_wait += wait
+        stats.max_wait = max(stats.max_wait, wait)
+        if stage == "extraction":
+            owner = str(task.document.owner_id)
+            self._running_by_owner[owner] = self._running_by_owner.get(owner, 0) + 1
+        logger.debug("%s %s task started after %.0f ms", Priority(task.priority).name, stage, wait * 1000)
+
+    def finished(self, stage: str, task: _Task) -> None:
+        self.stats[stage][Priority(task.priority)].running -= 1
+        if stage == "extraction":
+            owner = str(task.document.owner_id)
+            self._running_by_owner[owner] -= 1
+            if not self._running_by_owner[owner]:
+                del self._running_by_owner[owner]
+        self.condition.notify_all()
+
+    def snapshot(self) -> Dict:
+        """Profondeur de file, tâches en cours et attentes par étage et par classe."""
+        with self.condition:
+            return {
+                stage: {priority.name.lower(): stats.as_dict() for priority, stats in by_class.items()}
+                for stage, by_class in self.stats.items()
+            }
+
+    # -- étages -------------------------------------------------------------------------
+
+    def _extract(self, task: _Task) -> None:
+        from .document_processing import prepare_document_chunks
+
+        batch, document = task.batch, task.document
+        stats = self.stats["extraction"][Priority(task.priority)]
+        try:
+            chunks = prepare_document_chunks(document, update_status=batch.update_status)
+        except Exception as exc:
+            logger.exception("Document processing failed for %s", document.id, exc_info=exc)
+            error, chunks = str(exc), None
+        with self.condition:
+            if chunks is None:
+                batch.outcome[str(document.id)] = error
+                stats.failed += 1
+            else:
+                batch.prepared.append((document, chunks))
+                stats.completed += 1
+            batch.pending -= 1
+            if batch.pending:
+                return
+            if not batch.prepared:
+                batch.future.set_result(batch.outcome)
+                return
+            self.indexing.push(
+                _Task(priority=batch.priority, seq=next(self._seq), enqueued_at=time.monotonic(), batch=batch)
+            )
+
+    def _index(self, task: _Task) -> None:
+        from .ingestion import index_document_group
+
+        batch = task.batch
+        stats = self.stats["indexing"][Priority(task.priority)]
+        try:
+            index_document_group(batch.prepared, target_collection=batch.target_collection)
+        except Exception as exc:
+            logger.exception("Batch indexing failed", exc_info=exc)
+            error = str(exc)
+        else:
+            error = None
+        with self.condition:
+            for document, _ in batch.prepared:
+                batch.outcome[str(document.id)] = error
+            if error:
+                stats.failed += 1
+            else:
+                stats.completed += 1
+        logger.info(
+            "%s batch of %d documents done in %.0f ms",
+            batch.priority.name,
+            len(batch.prepared),
+            (time.monotonic() - batch.submitted_at) * 1000,
+        )
+        batch.future.set_result(batch.outcome)
+
+
+@lru_cache(maxsize=1)
+def get_scheduler() -> IngestionScheduler:
+    """Ordonnanceur partagé du processus, configuré par ``INGESTION_SCHEDULER``."""
+    cfg = settings.DOCUMENT_PROCESSING.get("INGESTION_SCHEDULER", {})
+    return IngestionScheduler(
+        extraction_workers=cfg.get("EXTRACTION_WORKERS"),
+        indexing_workers=cfg.get("INDEXING_WORKERS", 1),
+        per_owner_concurrency=cfg.get("PER_OWNER_CONCURRENCY", 2),
+    )
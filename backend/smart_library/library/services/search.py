@@ -0,0 +1,324 @@
+import asyncio
+import logging
+import random
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http import models as qmodels
+
+from .chunk_storage import hydrate_hits
+from .dedup import expand_sources
+from .diversity import diversity_setting, merge_adjacent, mmr_select, point_vector
+from .document_processing import get_qdrant_client
+from .vector_spaces import active_space, candidate_space, collection_uses_named_vectors, get_space_model
+
+logger = logging.getLogger(__name__)
+
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncQdrantClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+@lru_cache(maxsize=1)
+def get_embedding_executor() -> ThreadPoolExecutor:
+    """Pool de threads dédié aux calculs d'embedding (CPU) appelés depuis les vues async."""
+    return ThreadPoolExecutor(
+        max_workers=settings.QDRANT.get("EMBEDDING_WORKERS", 2),
+        thread_name_prefix="embedding",
+    )
+
+
+@lru_cache(maxsize=1)
+def get_shadow_executor() -> ThreadPoolExecutor:
+    """Pool séparé pour les requêtes fantômes : elles ne retardent jamais la réponse."""
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow-search")
+
+
+@dataclass
+class QueryPlan:
+    """Espace interrogé, nom du vecteur Qdrant (``None`` si anonyme) et espace fantôme."""
+
+    space: str
+    using: Optional[str]
+    shadow_space: Optional[str]
+
+
+def plan_query() -> QueryPlan:
+    named = collection_uses_named_vectors(get_qdrant_client())
+    space = active_space()
+    shadow = candidate_space() if named else None
+    if shadow and random.random() >= settings.QDRANT.get("SHADOW_SAMPLE_RATE", 1.0):
+        shadow = None
+    return QueryPlan(space=space, using=space if named else None, shadow_space=shadow)
+
+
+def build_search_filter(
+    user,
+    source: Optional[str] = None,
+    document_id: Optional[str] = None,
+) -> qmodels.Filter:
+    """Restreint la recherche aux documents généraux et aux documents personnels de l'utilisateur."""
+    general = qmodels.FieldCondition(key="source", match=qmodels.MatchValue(value="general"))
+    personal = qmodels.Filter(
+        must=[
+            qmodels.FieldCondition(key="source", match=qmodels.MatchValue(value="personal")),
+            qmodels.FieldCondition(key="owner_id", match=qmodels.MatchValue(value=str(user.pk))),
+        ]
+    )
+    if source == "general":
+        must = [general]
+    elif source == "personal":
+        must = [personal]
+    else:
+        must = [qmodels.Filter(should=[general, personal])]
+    if document_id:
+        # ``document_ids`` : documents dont un chunk dédupliqué partage ce point.
+        must.append(
+            qmodels.Filter(
+                should=[
+                    qmodels.FieldCondition(key=key, match=qmodels.MatchValue(value=str(document_id)))
+                    for key in ("document_id", "document_ids")
+                ]
+            )
+        )
+    return qmodels.Filter(must=must)
+
+
+def embed_query(query: str, space: Optional[str] = None) -> List[float]:
+    """Vectorise une requête utilisateur avec le modèle de l'espace demandé (actif par défaut)."""
+    model = get_space_model(space or active_space())
+    return model.encode([query], convert_to_numpy=True)[0].tolist()
+
+
+def _hit_to_dict(point) -> Dict:
+    payload = point.payload or {}
+    return {
+        "point_id": str(point.id),
+        "score": point.score,
+        "document_id": payload.get("document_id"),
+        "document_title": payload.get("document_title"),
+        "chunk_index": payload.get("chunk_index"),
+        "page_number": payload.get("page_number"),
+        "boxes": payload.get("boxes"),
+        "text": payload.get("text"),
+        "source": payload.get("source"),
+        "language": payload.get("language"),
+        "tag": payload.get("tag"),
+    }
+
+
+@dataclass
+class Diversity:
+    """Réglages de diversification d'une recherche (voir ``services.diversity``)."""
+
+    enabled: bool
+    fetch_limit: int
+    single_document: bool
+
+    @classmethod
+    def for_request(cls, limit: int, diversify: Optional[bool], document_id: Optional[str]) -> "Diversity":
+        if diversify is None:
+            diversify = diversity_setting("ENABLED", True)
+        fetch_limit = limit * diversity_setting("CANDIDATES", 4) if diversify else limit
+        return cls(enabled=diversify, fetch_limit=fetch_limit, single_document=bool(document_id))
+
+    def with_vectors(self, using: Optional[str]):
+        if not self.enabled:
+            return False
+        return [using] if using else True
+
+
+def _diversified(points, query_vector: List[float], using: Optional[str], limit: int, single_document: bool):
+    vectors = [point_vector(point, using) for point in points]
+    if not points or any(vector is None for vector in vectors):
+        return points[:limit]
+    chosen = mmr_select(
+        query_vector,
+        np.asarray(vectors, dtype=np.float32),
+        limit,
+        diversity_setting("LAMBDA", 0.7),
+        groups=[(point.payload or {}).get("document_id") for point in points],
+        per_group=None if single_document else diversity_setting("PER_DOCUMENT", 3),
+    )
+    return [points[index] for index in chosen]
+
+
+def _collect_hits(
+    points,
+    limit: int,
+    diversity: Diversity,
+    query_vector: List[float],
+    using: Optional[str],
+) -> List[Dict]:
+    """Résultats diversifiés, complétés depuis la base et développés vers tous les documents sources."""
+    if diversity.enabled:
+        points = _diversified(points, query_vector, using, limit, diversity.single_document)
+    hits = hydrate_hits([_hit_to_dict(point) for point in points[:limit]])
+    if diversity.enabled and diversity_setting("MERGE_ADJACENT", True):
+        hits = merge_adjacent(hits)
+    return expand_sources(hits)
+
+
+def run_shadow_query(
+    query: str,
+    query_filter: qmodels.Filter,
+    limit: int,
+    space: str,
+    primary_ids: List[str],
+    primary_ms: float,
+) -> None:
+    """Interroge l'espace candidat et journalise recouvrement et latence face à l'actif."""
+    try:
+        start = time.perf_counter()
+        vector = embed_query(query, space)
+        response = get_qdrant_client().query_points(
+            collection_name=settings.QDRANT["COLLECTION"],
+            query=vector,
+            using=space,
+            query_filter=query_filter,
+            limit=limit,
+            with_payload=False,
+        )
+        shadow_ms = (time.perf_counter() - start) * 1000
+    except Exception as exc:
+        logger.warning("Shadow query on '%s' failed: %s", space, exc)
+        return
+    shadow_ids = [str(point.id) for point in response.points]
+    overlap = len(set(primary_ids) & set(shadow_ids)) / max(1, len(primary_ids))
+    logger.info(
+        "shadow_search space=%s overlap@%d=%.2f primary_ms=%.1f shadow_ms=%.1f",
+        space,
+        limit,
+        overlap,
+        primary_ms,
+        shadow_ms,
+    )
+
+
+def search_chunks(
+    query: str,
+    user,
+    limit: int = 10,
+    source: Optional[str] = None,
+    document_id: Optional[str] = None,
+    diversify: Optional[bool] = None,
+) -> List[Dict]:
+    """Recherche sémantique synchrone dans les chunks indexés.
+
+    ``diversify`` (par défaut ``QDRANT["DIVERSITY"]["ENABLED"]``) active MMR, le plafond
+    par document et la fusion des chunks voisins.
+    """
+    plan = plan_query()
+    query_filter = build_search_filter(user, source, document_id)
+    diversity = Diversity.for_request(limit, diversify, document_id)
+    start = time.perf_counter()
+    vector = embed_query(query, plan.space)
+    response = get_qdrant_client().query_points(
+        collection_name=settings.QDRANT["COLLECTION"],
+        query=vector,
+        using=plan.using,
+        query_filter=query_filter,
+        limit=diversity.fetch_limit,
+        with_payload=True,
+        with_vectors=diversity.with_vectors(plan.using),
+    )
+    hits = _collect_hits(response.points, limit, diversity, vector, plan.using)
+    if plan.shadow_space:
+        get_shadow_executor().submit(
+            run_shadow_query,
+            query,
+            query_filter,
+            limit,
+            plan.shadow_space,
+            [hit["point_id"] for hit in hits],
+            (time.perf_counter() - start) * 1000,
+        )
+    return hits
+
+
+async def get_async_qdrant_client() -> Optional[AsyncQdrantClient]:
+    """Retourne le client Qdrant asynchrone de la boucle courante.
+
+    Le moteur embarqué (``QDRANT["PATH"]``) verrouille son dossier de stockage : dans ce
+    mode on retourne ``None`` et l'appelant passe par le client synchrone partagé.
+    """
+    cfg = settings.QDRANT
+    if not cfg.get("URL"):
+        return None
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = AsyncQdrantClient(url=cfg["URL"], api_key=cfg.get("API_KEY"))
+        if not await client.collection_exists(cfg["COLLECTION"]):
+            # Le client synchrone crée la collection (tailles dérivées des modèles).
+            await loop.run_in_executor(None, get_qdrant_client)
+        _async_clients[loop] = client
+    return client
+
+
+async def aembed_query(query: str, space: Optional[str] = None) -> List[float]:
+    """Vectorise la requête dans le pool dédié pour ne pas bloquer la boucle d'événements."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_embedding_executor(), embed_query, query, space)
+
+
+async def asearch_chunks(
+    query: str,
+    user,
+    limit: int = 10,
+    source: Optional[str] = None,
+    document_id: Optional[str] = None,
+    diversify: Optional[bool] = None,
+) -> List[Dict]:
+    """Variante asynchrone de :func:`search_chunks` (embedding en thread, Qdrant non bloquant)."""
+    plan = await sync_to_async(plan_query)()
+    query_filter = build_search_filter(user, source, document_id)
+    diversity = Diversity.for_request(limit, diversify, document_id)
+    start = time.perf_counter()
+    vector = await aembed_query(query, plan.space)
+    client = await get_async_qdrant_client()
+    loop = asyncio.get_running_loop()
+    if client is None:
+        response = await loop.run_in_executor(
+            None,
+            lambda: get_qdrant_client().query_points(
+                collection_name=settings.QDRANT["COLLECTION"],
+                query=vector,
+                using=plan.using,
+                query_filter=query_filter,
+                limit=diversity.fetch_limit,
+                with_payload=True,
+                with_vectors=diversity.with_vectors(plan.using),
+            ),
+        )
+    else:
+        response = await client.query_points(
+            collection_name=settings.QDRANT["COLLECTION"],
+            query=vector,
+            using=plan.using,
+            query_filter=query_filter,
+            limit=diversity.fetch_limit,
+            with_payload=True,
+            with_vectors=diversity.with_vectors(plan.using),
+        )
+    hits = await sync_to_async(_collect_hits)(response.points, limit, diversity, vector, plan.using)
+    if plan.shadow_space:
+        loop.run_in_executor(
+            get_shadow_executor(),
+            run_shadow_query,
+            query,
+            query_filter,
+            limit,
+            plan.shadow_space,
+            [hit["point_id"] for hit in hits],
+            (time.perf_counter() - start) * 1000,
+        )
+    return hits
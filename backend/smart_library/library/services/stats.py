@@ -0,0 +1,157 @@
+"""Statistiques de la bibliothèque tenues à jour par deltas.
+
+Chaque écriture de document retire sa contribution de l'ancien seau (source, statut) et
+l'ajoute au nouveau : la lecture des statistiques ne parcourt que ces quelques seaux,
+quelle que soit la taille de la bibliothèque.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from library.db_router import current_db_alias
+from library.models import Document, Favorite, LibraryStats
+
+STATS_CACHE_KEY = "library:stats"
+STATS_CACHE_TTL = 60
+TRACKED_FIELDS = ("source", "status", "chunk_count", "page_count", "char_count", "processing_ms")
+COUNTERS = ("document_count", "chunk_count", "page_count", "char_count", "processing_ms", "processed_documents")
+
+
+def tracked_values(document: Document) -> Dict:
+    return {name: getattr(document, name) for name in TRACKED_FIELDS}
+
+
+def _contribution(values: Mapping) -> Dict[str, int]:
+    return {
+        "document_count": 1,
+        "chunk_count": values["chunk_count"] or 0,
+        "page_count": values["page_count"] or 0,
+        "char_count": values["char_count"] or 0,
+        "processing_ms": values["processing_ms"] or 0,
+        "processed_documents": 0 if values["processing_ms"] is None else 1,
+    }
+
+
+def apply_changes(changes: Iterable[Tuple[Optional[Mapping], Optional[Mapping]]]) -> None:
+    """Applique des couples (anciennes valeurs, nouvelles valeurs) aux seaux concernés."""
+    deltas: Dict[Tuple[str, str], Dict[str, int]] = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    for before, after in changes:
+        for values, sign in ((before, -1), (after, 1)):
+            if values is None:
+                continue
+            bucket = deltas[(values["source"], values["status"])]
+            for name, amount in _contribution(values).items():
+                bucket[name] += sign * amount
+    changed = False
+    for (source, status), delta in deltas.items():
+        delta = {name: amount for name, amount in delta.items() if amount}
+        if not delta:
+            continue
+        LibraryStats.objects.get_or_create(source=source, status=status)
+        LibraryStats.objects.filter(source=source, status=status).update(
+            **{name: F(name) + amount for name, amount in delta.items()}
+        )
+        changed = True
+    if changed:
+        transaction.on_commit(lambda: cache.delete(STATS_CACHE_KEY), using=current_db_alias())
+
+
+def update_documents(queryset, **changes) -> int:
+    """``queryset.update(**changes)`` en répercutant le changement sur les statistiques.
+
+    ``update()`` n'émet pas ``post_save`` : les bibliothèques en cache des propriétaires et
+    des utilisateurs ayant ces documents en favori sont périmées ici.
+    """
+    using = current_db_alias()
+    with transaction.atomic(using=using):
+        rows = list(queryset.select_for_update().values("pk", "owner_id", *TRACKED_FIELDS))
+        if not rows:
+            return 0
+        pks = [row.pop("pk") for row in rows]
+        owners = {row.pop("owner_id") for row in rows}
+        updated = Document.objects.filter(pk__in=pks).update(**changes)
+        apply_changes((row, {**row, **changes}) for row in rows)
+        general = "general" in {changes.get("source"), *(row["source"] for row in rows)}
+        transaction.on_commit(lambda: _invalidate_libraries(pks, owners, general), using=using)
+    return updated
+
+
+def _invalidate_libraries(pks, owners, general: bool) -> None:
+    # Import local : my_library -> serializers -> uploads -> ingestion -> stats.
+    from library.services.my_library import invalidate_general, invalidate_users
+
+    if general:
+        invalidate_general()
+    favorited_by = Favorite.objects.filter(document_id__in=pks).values_list("user_id", flat=True)
+    invalidate_users([*owners, *favorited_by])
+
+
+def rebuild_library_stats() -> None:
+    """Recalcule tous les seaux depuis les colonnes agrégées de ``documents``."""
+    totals = (
+        Document.objects.values("source", "status")
+        .annotate(
+            document_count=Count("pk"),
+            chunk_count_total=Sum("chunk_count"),
+            page_count_total=Sum("page_count"),
+            char_count_total=Sum("char_count"),
+            processing_ms_total=Sum("processing_ms"),
+            processed_documents=Count("processing_ms"),
+        )
+        .order_by()
+    )
+    with transaction.atomic():
+        LibraryStats.objects.all().delete()
+        LibraryStats.objects.bulk_create(
+            [
+                LibraryStats(
+                    source=row["source"],
+                    status=row["status"],
+                    document_count=row["document_count"],
+                    chunk_count=row["chunk_count_total"] or 0,
+                    page_count=row["page_count_total"] or 0,
+                    char_count=row["char_count_total"] or 0,
+                    processing_ms=row["processing_ms_total"] or 0,
+                    processed_documents=row["processed_documents"],
+                )
+                for row in totals
+            ]
+        )
+        transaction.on_commit(lambda: cache.delete(STATS_CACHE_KEY))
+
+
+def library_stats() -> Dict:
+    """Résumé pour les tableaux de bord, servi depuis le cache ou les seaux agrégés."""
+    summary = cache.get(STATS_CACHE_KEY)
+    if summary is not None:
+        return summary
+    by_status: Dict[str, int] = defaultdict(int)
+    by_source: Dict[str, int] = defaultdict(int)
+    totals = dict.fromkeys(COUNTERS, 0)
+    for bucket in LibraryStats.objects.all():
+        by_status[bucket.status] += bucket.document_count
+        by_source[bucket.source] += bucket.document_count
+        for name in COUNTERS:
+            totals[name] += getattr(bucket, name)
+    indexed = by_status.get("indexed", 0)
+    summary = {
+        "documents": {
+            "total": totals["document_count"],
+            "by_status": dict(by_status),
+            "by_source": dict(by_source),
+        },
+        "chunks": totals["chunk_count"],
+        "pages": totals["page_count"],
+        "characters": totals["char_count"],
+        "avg_chunks_per_document": (
+            round(totals["chunk_count"] / indexed, 1) if indexed else 0.0
+        ),
+        "avg_processing_ms": (
+            round(totals["processing_ms"] / totals["processed_documents"]) if totals["processed_documents"] else None
+        ),
+    }
+    cache.set(STATS_CACHE_KEY, summary, STATS_CACHE_TTL)
+    return summary
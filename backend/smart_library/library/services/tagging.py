@@ -0,0 +1,83 @@
+"""Suggestion de tag sans exemple annoté (zero-shot) à partir du centroïde d'un document.
+
+Le nom de chaque tag est vectorisé une fois par espace d'embedding (gabarit
+``TAG_SUGGESTION["TEMPLATE"]``) et gardé en mémoire du processus tant que le tag ne
+change pas de nom. Le tag retenu est le plus proche du centroïde (voir ``centroids``),
+s'il dépasse ``MIN_SCORE`` et devance le suivant d'au moins ``MIN_MARGIN``.
+"""
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from library.models import Document, Tag
+
+from .vector_spaces import active_space, get_space_model
+
+# Espace -> identifiant du tag -> (nom vectorisé, vecteur normalisé)
+_tag_vectors: Dict[str, Dict[int, Tuple[str, np.ndarray]]] = {}
+_lock = threading.Lock()
+
+
+def _config(name: str, default):
+    return settings.DOCUMENT_PROCESSING.get("TAG_SUGGESTION", {}).get(name, default)
+
+
+def suggestion_enabled() -> bool:
+    return _config("ENABLED", True)
+
+
+def tag_vectors(space: str) -> Tuple[List[Tag], np.ndarray]:
+    """Tags existants et matrice de leurs vecteurs (une ligne par tag)."""
+    tags = list(Tag.objects.only("id", "name"))
+    with _lock:
+        cached = _tag_vectors.setdefault(space, {})
+        missing = [tag for tag in tags if tag.pk not in cached or cached[tag.pk][0] != tag.name]
+    if missing:
+        template = _config("TEMPLATE", "{name}")
+        vectors = get_space_model(space).encode(
+            [template.format(name=tag.name) for tag in missing], convert_to_numpy=True
+        )
+        vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        with _lock:
+            cached.update({tag.pk: (tag.name, vector) for tag, vector in zip(missing, vectors)})
+    if not tags:
+        return [], np.empty((0, 0), dtype=np.float32)
+    return tags, np.stack([cached[tag.pk][1] for tag in tags])
+
+
+def rank_tags(centroid: List[float], space: str) -> List[Tuple[Tag, float]]:
+    """Tags classés par similarité cosinus avec le centroïde (déjà normalisé)."""
+    tags, matrix = tag_vectors(space)
+    if not tags:
+        return []
+    scores = matrix @ np.asarray(centroid, dtype=matrix.dtype)
+    return [(tags[index], float(scores[index])) for index in np.argsort(-scores)]
+
+
+def suggest_tag(centroid: List[float], space: str) -> Optional[Tag]:
+    ranked = rank_tags(centroid, space)
+    if not ranked:
+        return None
+    best, score = ranked[0]
+    runner_up = ranked[1][1] if len(ranked) > 1 else -1.0
+    if score < _config("MIN_SCORE", 0.3) or score - runner_up < _config("MIN_MARGIN", 0.02):
+        return None
+    return best
+
+
+def apply_suggested_tags(documents: List[Document], centroids: List[Dict[str, List[float]]]) -> List[Document]:
+    """Renseigne le tag des documents qui n'en ont pas ; retourne les documents modifiés."""
+    if not suggestion_enabled():
+        return []
+    space = active_space()
+    tagged = []
+    for document, centroid in zip(documents, centroids):
+        if document.tag_id is not None or space not in centroid:
+            continue
+        tag = suggest_tag(centroid[space], space)
+        if tag is not None:
+            document.tag = tag
+            tagged.append(document)
+    return tagged
@@ -0,0 +1,215 @@
+import hashlib
+import os
+import re
+import tempfile
+from typing import BinaryIO, Optional, Tuple
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from library.models import Document, IngestionJob, UploadSession
+
+from .ingestion import UPLOAD_DIR, schedule_ingestion_job
+from .scheduler import Priority
+
+COPY_BUFFER_SIZE = 1024 * 1024
+CONTENT_RANGE_RE = re.compile(r"^bytes (\d+)-(\d+)/(\d+|\*)$")
+
+
+class UploadError(ValueError):
+    """Erreur de protocole lors d'un téléversement reprenable."""
+
+
+class UploadOffsetMismatch(UploadError):
+    """La partie reçue ne commence pas à l'octet attendu par la session."""
+
+    def __init__(self, expected: int):
+        super().__init__(f"Expected part starting at byte {expected}.")
+        self.expected = expected
+
+
+class UploadAlreadyCompleted(UploadError):
+    """La session a déjà produit un document : elle ne peut plus être abandonnée."""
+
+    def __init__(self, document_id):
+        super().__init__("Upload session is already completed.")
+        self.document_id = document_id
+
+
+def parse_content_range(header: Optional[str]) -> Tuple[int, int]:
+    """Analyse ``Content-Range: bytes <start>-<end>/<total>`` et retourne (start, longueur)."""
+    match = CONTENT_RANGE_RE.match((header or "").strip())
+    if not match:
+        raise UploadError("Content-Range header 'bytes <start>-<end>/<total>' is required.")
+    start, end = int(match.group(1)), int(match.group(2))
+    if end < start:
+        raise UploadError("Invalid Content-Range.")
+    return start, end - start + 1
+
+
+def _local_path(name: str) -> str:
+    try:
+        return default_storage.path(name)
+    except NotImplementedError as exc:
+        raise UploadError("Resumable uploads require a filesystem storage.") from exc
+
+
+def start_upload_session(owner, filename: str, total_size: int, checksum: str, metadata: dict) -> UploadSession:
+    """Crée la session et le fichier partiel vide dans ``documents/``."""
+    session = UploadSession(
+        owner=owner,
+        filename=os.path.basename(filename),
+        total_size=total_size,
+        checksum=checksum.lower(),
+        metadata=metadata,
+    )
+    session.storage_name = f"{UPLOAD_DIR}/{session.id}.part"
+    path = _local_path(session.storage_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "wb").close()
+    session.save()
+    return session
+
+
+def _copy_bytes(source: BinaryIO, target: BinaryIO, length: int) -> int:
+    written = 0
+    while written < length:
+        buffer = source.read(min(COPY_BUFFER_SIZE, length - written))
+        if not buffer:
+            break
+        target.write(buffer)
+        written += len(buffer)
+    return written
+
+
+def _check_part(session: UploadSession, start: int, length: int) -> None:
+    if session.status != 'open':
+        raise UploadError("Upload session is not open.")
+    if start != session.received_bytes:
+        raise UploadOffsetMismatch(session.received_bytes)
+    if start + length > session.total_size:
+        raise UploadError("Part exceeds declared file size.")
+
+
+def append_part(session: UploadSession, stream: BinaryIO, start: int, length: int) -> UploadSession:
+    """Écrit une plage d'octets à la suite du fichier partiel.
+
+    Les parties doivent arriver dans l'ordre : une partie qui ne démarre pas à
+    ``received_bytes`` est refusée avec l'offset attendu pour que le client reprenne.
+    La partie est d'abord lue dans un fichier temporaire, sans verrou ; la ligne de la
+    session n'est verrouillée qu'ensuite, le temps de revérifier l'offset, de recopier
+    la partie depuis le disque local et d'avancer ``received_bytes``.
+    """
+    max_part = settings.DOCUMENT_PROCESSING.get("UPLOAD_MAX_PART_SIZE", 64 * 1024 * 1024)
+    if length > max_part:
+        raise UploadError(f"Part exceeds UPLOAD_MAX_PART_SIZE ({max_part} bytes).")
+    _check_part(UploadSession.objects.get(pk=session.pk), start, length)
+
+    partial_path = _local_path(session.storage_name)
+    with tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(partial_path), prefix=f"{session.id}.", suffix=".incoming"
+    ) as incoming:
+        written = _copy_bytes(stream, incoming, length)
+        incoming.flush()
+        incoming.seek(0)
+        with transaction.atomic():
+            session = UploadSession.objects.select_for_update().get(pk=session.pk)
+            # Une autre requête a pu ajouter une partie pendant la lecture.
+            _check_part(session, start, length)
+            with open(partial_path, "r+b") as target:
+                target.seek(start)
+                _copy_bytes(incoming, target, written)
+                target.truncate(start + written)
+            session.received_bytes = start + written
+            session.save(update_fields=['received_bytes', 'updated_at'])
+    if written != length:
+        raise UploadError(f"Incomplete part: received {written} of {length} bytes.")
+    return session
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(COPY_BUFFER_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def finalize_upload(session: UploadSession) -> Tuple[Document, Optional[IngestionJob]]:
+    """Vérifie taille et SHA-256, crée le ``Document`` puis le confie au traitement.
+
+    Si la transaction échoue après le déplacement du fichier, il reprend sa place de
+    fichier partiel : la session reste ouverte et peut être finalisée à nouveau.
+    """
+    moved = None
+    try:
+        with transaction.atomic():
+            session = UploadSession.objects.select_for_update().get(pk=session.pk)
+            if session.status != 'open':
+                raise UploadError("Upload session is not open.")
+            if session.received_bytes != session.total_size:
+                raise UploadError(
+                    f"Upload incomplete: {session.received_bytes} of {session.total_size} bytes received."
+                )
+            partial_path = _local_path(session.storage_name)
+            if _sha256(partial_path) != session.checksum:
+                raise UploadError("Checksum mismatch.")
+
+            final_name = default_storage.get_available_name(f"{UPLOAD_DIR}/{session.filename}")
+            os.replace(partial_path, _local_path(final_name))
+            moved = (partial_path, _local_path(final_name))
+
+            metadata = session.metadata or {}
+            document = Document(
+                file=final_name,
+                title=metadata.get("title") or os.path.splitext(session.filename)[0][:255],
+                owner=session.owner,
+                source=metadata.get("source") or 'personal',
+                language=metadata.get("language", ""),
+                tag_id=metadata.get("tag"),
+                status='uploaded',
+            )
+            document.save()
+            session.status = 'completed'
+            session.document = document
+            session.save(update_fields=['status', 'document', 'updated_at'])
+
+            job = None
+            if document.source != 'general':
+                job = IngestionJob.objects.create(
+                    owner=session.owner,
+                    total_files=1,
+                    results=[
+                        {"filename": session.filename, "document_id": str(document.id), "status": "accepted"}
+                    ],
+                )
+                schedule_ingestion_job(job, Priority.INTERACTIVE)
+    except BaseException:
+        if moved is not None:
+            os.replace(moved[1], moved[0])
+        raise
+    return document, job
+
+
+def abort_upload(session: UploadSession) -> None:
+    """Abandonne la session et supprime le fichier partiel.
+
+    Une session déjà abandonnée est laissée telle quelle ; une session terminée est
+    refusée (``UploadAlreadyCompleted``) : son document existe déjà.
+    """
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().get(pk=session.pk)
+        if session.status == 'completed':
+            raise UploadAlreadyCompleted(session.document_id)
+        if session.status != 'open':
+            return
+        session.status = 'aborted'
+        session.save(update_fields=['status', 'updated_at'])
+        storage_name = session.storage_name
+
+        def delete_partial():
+            if default_storage.exists(storage_name):
+                default_storage.delete(storage_name)
+
+        transaction.on_commit(delete_partial)
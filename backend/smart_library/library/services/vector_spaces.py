@@ -0,0 +1,141 @@
+"""Espaces de vecteurs nommés : un par version de modèle d'embedding.
+
+Chaque point Qdrant porte un vecteur nommé par espace. L'espace actif sert la recherche ;
+un espace candidat optionnel reçoit les mêmes écritures (double écriture) et peut être
+interrogé en parallèle (requêtes fantômes) avant la bascule.
+"""
+import logging
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Set
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qmodels
+from sentence_transformers import SentenceTransformer
+
+from users.models import Setting
+
+from .embeddings import get_embedding_model
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SPACE = "default"
+ACTIVE_SETTING_KEY = "embedding.active_vector"
+CANDIDATE_SETTING_KEY = "embedding.candidate_vector"
+COLLECTION_INFO_TTL = 60.0
+
+_vector_names_cache: Dict[str, tuple] = {}
+
+
+def configured_models() -> Dict[str, str]:
+    """Associe chaque nom d'espace au modèle SentenceTransformer correspondant."""
+    cfg = settings.QDRANT
+    models = cfg.get("EMBEDDING_MODELS")
+    if models:
+        return dict(models)
+    return {DEFAULT_SPACE: cfg["EMBEDDING_MODEL"]}
+
+
+def _validate_space(name: str) -> str:
+    if name not in configured_models():
+        raise ImproperlyConfigured(f"Unknown embedding vector space '{name}'.")
+    return name
+
+
+def _stored_space(key: str) -> Optional[str]:
+    name = Setting.get_value(key)
+    if name and name not in configured_models():
+        logger.warning("Ignoring %s=%r: vector space no longer declared in QDRANT.", key, name)
+        return None
+    return name or None
+
+
+def active_space() -> str:
+    """Espace servant la recherche (modifiable à chaud via ``embedding_cutover``)."""
+    name = _stored_space(ACTIVE_SETTING_KEY) or settings.QDRANT.get("ACTIVE_VECTOR")
+    return _validate_space(name or next(iter(configured_models())))
+
+
+def candidate_space() -> Optional[str]:
+    """Espace en évaluation (double écriture et requêtes fantômes), ou ``None``."""
+    name = _stored_space(CANDIDATE_SETTING_KEY) or settings.QDRANT.get("CANDIDATE_VECTOR")
+    if not name or name == active_space():
+        return None
+    return _validate_space(name)
+
+
+def write_spaces() -> List[str]:
+    """Espaces alimentés à l'indexation : l'actif puis, le cas échéant, le candidat."""
+    spaces = [active_space()]
+    candidate = candidate_space()
+    if candidate:
+        spaces.append(candidate)
+    return spaces
+
+
+def get_space_model(space: str) -> SentenceTransformer:
+    return get_embedding_model(configured_models()[space])
+
+
+@lru_cache(maxsize=8)
+def vector_size(space: str) -> int:
+    """Dimension des vecteurs d'un espace, lue sur le modèle plutôt que configurée."""
+    return get_space_model(space).get_sentence_embedding_dimension()
+
+
+def distance_from_string(name: str) -> qmodels.Distance:
+    """Mappe une chaîne de configuration vers l'enum Distance de Qdrant."""
+    mapping = {
+        "cosine": qmodels.Distance.COSINE,
+        "dot": qmodels.Distance.DOT,
+        "euclid": qmodels.Distance.EUCLID,
+        "l2": qmodels.Distance.EUCLID,
+        "manhattan": qmodels.Distance.MANHATTAN,
+    }
+    return mapping.get(name.lower(), qmodels.Distance.COSINE)
+
+
+def vectors_config() -> Dict[str, qmodels.VectorParams]:
+    """Configuration des vecteurs nommés pour tous les espaces déclarés."""
+    return {
+        space: qmodels.VectorParams(
+            size=vector_size(space),
+            distance=distance_from_string(settings.QDRANT.get("DISTANCE", "cosine")),
+        )
+        for space in configured_models()
+    }
+
+
+def collection_vector_names(client: QdrantClient, collection: Optional[str] = None) -> Optional[Set[str]]:
+    """Espaces déclarés par la collection (ou l'alias), ``None`` pour un vecteur anonyme.
+
+    Un espace ajouté à ``EMBEDDING_MODELS`` n'existe dans une collection qu'après sa
+    reconstruction par ``reindex_library`` : on n'y écrit ni n'y cherche avant.
+    """
+    collection = collection or settings.QDRANT["COLLECTION"]
+    cached = _vector_names_cache.get(collection)
+    if cached and time.monotonic() - cached[1] < COLLECTION_INFO_TTL:
+        return cached[0]
+    vectors = client.get_collection(collection).config.params.vectors
+    names = set(vectors) if isinstance(vectors, dict) else None
+    _vector_names_cache[collection] = (names, time.monotonic())
+    return names
+
+
+def collection_uses_named_vectors(client: QdrantClient, collection: Optional[str] = None) -> bool:
+    """Indique si la collection (ou l'alias) utilise des vecteurs nommés.
+
+    Les collections créées avant l'introduction des espaces n'ont qu'un vecteur anonyme ;
+    elles restent utilisables jusqu'à leur reconstruction par ``reindex_library``.
+    """
+    return collection_vector_names(client, collection) is not None
+
+
+def forget_collection_info(collection: Optional[str] = None) -> None:
+    """Oublie la configuration mise en cache (après une bascule d'alias)."""
+    if collection is None:
+        _vector_names_cache.clear()
+    else:
+        _vector_names_cache.pop(collection, None)
@@ -0,0 +1,80 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .models import Document, Favorite
+from .services.dedup import refresh_shared_points, release_document_chunks
+from .services.my_library import invalidate_general, invalidate_users
+from .services.stats import TRACKED_FIELDS, apply_changes, tracked_values
+
+
+@receiver(pre_save, sender=Document)
+def remember_tracked_values(sender, instance, update_fields=None, **kwargs):
+    """Relit les valeurs en base avant l'écriture pour calculer le delta des statistiques."""
+    instance._stats_before = None
+    instance._stats_skip = update_fields is not None and not set(update_fields) & set(TRACKED_FIELDS)
+    if instance._state.adding or instance._stats_skip:
+        return
+    instance._stats_before = (
+        Document.objects.filter(pk=instance.pk).values(*TRACKED_FIELDS).first()
+    )
+
+
+@receiver(post_save, sender=Document)
+def update_stats_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw or getattr(instance, "_stats_skip", False):
+        return
+    before = None if created else instance._stats_before
+    apply_changes([(before, tracked_values(instance))])
+
+
+@receiver(post_delete, sender=Document)
+def update_stats_on_delete(sender, instance, **kwargs):
+    apply_changes([(tracked_values(instance), None)])
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+def invalidate_library_on_favorite(sender, instance, using=None, **kwargs):
+    user_ids = [instance.user_id]
+    transaction.on_commit(lambda: invalidate_users(user_ids), using=using)
+
+
+@receiver(post_save, sender=Document)
+@receiver(post_delete, sender=Document)
+def invalidate_library_on_document(sender, instance, using=None, **kwargs):
+    """Invalidation après le commit : une lecture concurrente ne remet pas l'ancien état en cache."""
+    before = getattr(instance, "_stats_before", None) or {}
+    if "general" in (instance.source, before.get("source")):
+        transaction.on_commit(invalidate_general, using=using)
+        return
+    favorited_by = Favorite.objects.using(using).filter(document_id=instance.pk).values_list("user_id", flat=True)
+    user_ids = [instance.owner_id, *favorited_by]
+    transaction.on_commit(lambda: invalidate_users(user_ids), using=using)
+
+
+@receiver(post_save, sender="chatbot.MessageReference")
+def invalidate_library_on_reference(sender, instance, created, using=None, **kwargs):
+    """Un document général cité dans une conversation rejoint les « récents » de son auteur."""
+    if created and instance.document_id:
+        user_ids = [instance.message.conversation.user_id]
+        transaction.on_commit(lambda: invalidate_users(user_ids), using=using)
+
+
+@receiver(pre_delete, sender=Document)
+def release_shared_chunks(sender, instance, using=None, **kwargs):
+    """Les chunks partagés avec d'autres documents survivent à la suppression (voir dedup)."""
+    _, shared = release_document_chunks(instance)
+    if shared:
+        from .services.document_processing import get_qdrant_client
+
+        transaction.on_commit(lambda: refresh_shared_points(get_qdrant_client(), shared), using=using)
+
+
+@receiver(post_delete, sender=Document)
+def delete_centroid(sender, instance, using=None, **kwargs):
+    from .services.centroids import delete_centroids
+    from .services.document_processing import get_qdrant_client
+
+    document_id = instance.pk
+    transaction.on_commit(lambda: delete_centroids(get_qdrant_client(), [document_id]), using=using)
@@ -1,3 +1,704 @@
-from django.test import TestCase
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+from importlib.util import find_spec
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase, override_settings
+from qdrant_client.http import models as qmodels
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from library import db_router
+from library.db_router import IngestionRouter, use_ingestion_db
+from library.models import ChunkBand, Document, DocumentEmbedding, Favorite, ReindexRun
+from library.services import centroids, tagging, vector_spaces
+from library.services.dedup import band_rows, encode_signature, find_duplicates, link_duplicates, signature
+from library.services.dedup import similarity as dedup_similarity
+from library.services.diversity import merge_adjacent, mmr_select
+from library.services.document_processing import (
+    Chunk,
+    adopt_collection_alias,
+    create_vector_collection,
+    discard_staged_embeddings,
+    generate_chunks,
+    get_qdrant_client,
+    is_physical_collection,
+    promote_staged_embeddings,
+    resolve_collection_alias,
+    switch_collection_alias,
+)
+from library.services.embeddings import load_embedding_model
+from library.services.ingestion import create_bulk_documents, index_document_group, iter_archive_members
+from library.services.scheduler import IngestionScheduler, Priority, _Task
+from library.services.layout import Block, Unit, layout_chunks
+from library.services.search import search_chunks
+from library.services.stats import update_documents
+from library.services.uploads import UploadError, parse_content_range
+from users.models import Setting
+from users.setting_cache import setting_cache
+
+
+class FakeEmbeddingModel:
+    """Vecteurs déterministes (mots hachés dans 32 dimensions), sans modèle à télécharger."""
+
+    dimension = 32
+
+    def get_sentence_embedding_dimension(self):
+        return self.dimension
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, **kwargs):
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                digest = hashlib.md5(word.encode("utf-8")).digest()
+                vectors[row, digest[0] % self.dimension] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.clip(norms, 1e-12, None)
+
+
+class QdrantTestCase(TestCase):
+    """Qdrant embarqué dans un dossier temporaire et un espace d'embedding factice."""
+
+    def setUp(self):
+        self.storage = tempfile.mkdtemp()
+        qdrant = dict(
+            settings.QDRANT,
+            URL=None,
+            PATH=self.storage,
+            COLLECTION="test_chunks",
+            CENTROID_COLLECTION="test_centroids",
+            EMBEDDING_MODELS={"fake": "fake-model"},
+            ACTIVE_VECTOR="fake",
+            CANDIDATE_VECTOR=None,
+        )
+        processing = dict(
+            settings.DOCUMENT_PROCESSING,
+            CHUNK_TEXT_STORAGE="database",
+            CHUNK_DEDUP=dict(settings.DOCUMENT_PROCESSING.get("CHUNK_DEDUP", {}), ENABLED=False),
+            TAG_SUGGESTION={"ENABLED": False},
+        )
+        overrides = override_settings(QDRANT=qdrant, DOCUMENT_PROCESSING=processing)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        patcher = mock.patch.object(vector_spaces, "get_embedding_model", return_value=FakeEmbeddingModel())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self._reset_caches()
+        self.addCleanup(self._reset_caches)
+        self.addCleanup(shutil.rmtree, self.storage, True)
+        self.user = get_user_model().objects.create_user(email="reader@example.com", password="x", name="Reader")
+
+    def _reset_caches(self):
+        if get_qdrant_client.cache_info().currsize:
+            get_qdrant_client().close()
+        get_qdrant_client.cache_clear()
+        vector_spaces.vector_size.cache_clear()
+        vector_spaces.forget_collection_info()
+        centroids._ready_collections.clear()
+        tagging._tag_vectors.clear()
+        setting_cache.invalidate()
+
+    def make_document(self, title="Document", source="general"):
+        return Document.objects.create(title=title, owner=self.user, source=source, status='processed')
+
+    def index(self, prepared, **kwargs):
+        # Les écritures Qdrant attendent la validation de la transaction.
+        with self.captureOnCommitCallbacks(execute=True):
+            index_document_group(prepared, **kwargs)
+
+    @staticmethod
+    def chunks(*texts):
+        return [Chunk(text=text, page_number=1, index=index) for index, text in enumerate(texts, start=1)]
+
+
+class ReindexLiveSearchTests(QdrantTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = get_qdrant_client()
+        self.document = self.make_document("Astronomie")
+        self.index([(self.document, self.chunks("comètes et astéroïdes", "orbites des planètes"))])
+        self.run = ReindexRun.objects.create(target_collection="test_chunks_next")
+        create_vector_collection(self.client, self.run.target_collection)
+        self.index(
+            [(self.document, self.chunks("comètes, astéroïdes et météores"))],
+            target_collection=self.run.target_collection,
+        )
+
+    def search_texts(self):
+        return [hit["text"] for hit in search_chunks("comètes astéroïdes", self.user, diversify=False)]
+
+    def test_live_collection_keeps_serving_text_during_reindex(self):
+        self.assertEqual(self.search_texts()[0], "comètes et astéroïdes")
+        self.assertEqual(self.document.embeddings.count(), 2)
+        self.assertEqual(DocumentEmbedding.all_objects.filter(reindex_run=self.run).count(), 1)
+
+    def test_switch_then_promote_serves_reindexed_chunks(self):
+        switch_collection_alias(self.client, settings.QDRANT["COLLECTION"], self.run.target_collection)
+        # Entre la bascule et l'échange des lignes, les chunks en attente restent lisibles.
+        self.assertEqual(self.search_texts(), ["comètes, astéroïdes et météores"])
+        self.assertEqual(promote_staged_embeddings(self.run), 1)
+        self.assertEqual(self.search_texts(), ["comètes, astéroïdes et météores"])
+        self.assertEqual(list(self.document.embeddings.values_list("chunk_index", flat=True)), [1])
+
+    def test_abandoned_run_leaves_live_chunks_untouched(self):
+        self.client.delete_collection(self.run.target_collection)
+        discard_staged_embeddings(self.run)
+        self.assertFalse(DocumentEmbedding.all_objects.filter(reindex_run=self.run).exists())
+        self.assertEqual(self.search_texts()[0], "comètes et astéroïdes")
+
+    def test_document_indexed_during_reindex_is_written_to_both_collections(self):
+        late = self.make_document("Océans")
+        self.index([(late, self.chunks("marées et courants marins"))])
+        point_id = str(late.embeddings.get().point_id)
+        for collection in (settings.QDRANT["COLLECTION"], self.run.target_collection):
+            self.assertEqual(len(self.client.retrieve(collection, [point_id])), 1)
+        switch_collection_alias(self.client, settings.QDRANT["COLLECTION"], self.run.target_collection)
+        promote_staged_embeddings(self.run)
+        hits = search_chunks("marées courants", self.user, diversify=False)
+        self.assertEqual(hits[0]["text"], "marées et courants marins")
+
+    def test_reindexing_a_mirrored_document_replaces_its_target_points(self):
+        self.index([(self.document, self.chunks("comètes et astéroïdes"))])
+        live_point = str(self.document.embeddings.get().point_id)
+        # Les chunks en attente de la réindexation ont été retirés avec leurs points.
+        self.assertFalse(DocumentEmbedding.all_objects.filter(reindex_run=self.run).exists())
+        target_ids = [str(point.id) for point in self.client.scroll(self.run.target_collection)[0]]
+        self.assertEqual(target_ids, [live_point])
+
+
+class CollectionAliasTests(QdrantTestCase):
+    def test_new_install_serves_collection_through_an_alias(self):
+        client = get_qdrant_client()
+        self.assertIsNotNone(resolve_collection_alias(client, settings.QDRANT["COLLECTION"]))
+
+    def test_physical_collection_is_copied_before_becoming_an_alias(self):
+        client = get_qdrant_client()
+        alias = settings.QDRANT["COLLECTION"]
+        # Installation antérieure aux alias : une vraie collection porte le nom.
+        client.update_collection_aliases(
+            change_aliases_operations=[
+                qmodels.DeleteAliasOperation(delete_alias=qmodels.DeleteAlias(alias_name=alias))
+            ]
+        )
+        create_vector_collection(client, alias)
+        vector_spaces.forget_collection_info()
+        self.index([(self.make_document(), self.chunks("volcans et séismes"))])
+
+        with self.assertRaises(ValueError):
+            switch_collection_alias(client, alias, "test_chunks_next")
+        copy = adopt_collection_alias(client, alias)
+        self.assertFalse(is_physical_collection(client, alias))
+        self.assertEqual(resolve_collection_alias(client, alias), copy)
+        self.assertEqual(client.count(copy).count, 1)
+        self.assertEqual(search_chunks("volcans", self.user, diversify=False)[0]["text"], "volcans et séismes")
+
+
+class CentroidSpaceTests(QdrantTestCase):
+    def test_reindex_with_new_space_only_writes_known_centroid_vectors(self):
+        document = self.make_document()
+        self.index([(document, self.chunks("galaxies spirales"))])
+        client = get_qdrant_client()
+        models = {"fake": "fake-model", "fake-next": "fake-model-next"}
+        with override_settings(QDRANT=dict(settings.QDRANT, EMBEDDING_MODELS=models)):
+            run = ReindexRun.objects.create(target_collection="test_chunks_next")
+            create_vector_collection(client, run.target_collection)
+            self.index(
+                [(document, self.chunks("galaxies spirales"))], target_collection=run.target_collection
+            )
+        point = client.retrieve(centroids.centroid_collection(), [str(document.pk)], with_vectors=True)[0]
+        self.assertEqual(set(point.vector), {"fake"})
+
+
+class IndexTransactionTests(QdrantTestCase):
+    def test_rolled_back_indexing_leaves_qdrant_untouched(self):
+        document = self.make_document()
+        self.index([(document, self.chunks("volcans et séismes"))])
+        point_id = str(document.embeddings.get().point_id)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks, \
+                mock.patch.object(Document, "save", side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                index_document_group([(document, self.chunks("laves", "cratères"))])
+        self.assertEqual(callbacks, [])
+        client = get_qdrant_client()
+        self.assertEqual(str(document.embeddings.get().point_id), point_id)
+        self.assertEqual([str(point.id) for point in client.scroll(settings.QDRANT["COLLECTION"])[0]], [point_id])
+
+
+class EmbeddingCutoverTests(QdrantTestCase):
+    def setUp(self):
+        super().setUp()
+        models = {"fake": "fake-model", "fake-next": "fake-model-next"}
+        overrides = override_settings(QDRANT=dict(settings.QDRANT, EMBEDDING_MODELS=models))
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        # Indexé sans espace candidat : seul l'actif est écrit.
+        self.index([(self.make_document(), self.chunks("forêts tropicales"))])
+
+    def active_setting(self):
+        return Setting.objects.filter(key=vector_spaces.ACTIVE_SETTING_KEY).values_list("value", flat=True).first()
+
+    def test_activation_refuses_space_missing_from_points(self):
+        with self.assertRaisesMessage(CommandError, "1 points have no 'fake-next' vector"):
+            call_command("embedding_cutover", activate="fake-next", stdout=StringIO())
+        self.assertIsNone(self.active_setting())
+
+    def test_force_activates_despite_missing_vectors(self):
+        call_command("embedding_cutover", activate="fake-next", force=True, stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(self.active_setting(), "fake-next")
+
+    def test_space_absent_from_collection_is_refused_even_with_force(self):
+        models = dict(settings.QDRANT["EMBEDDING_MODELS"], other="other-model")
+        with override_settings(QDRANT=dict(settings.QDRANT, EMBEDDING_MODELS=models)):
+            with self.assertRaisesMessage(CommandError, "no 'other' vector"):
+                call_command("embedding_cutover", activate="other", force=True, stdout=StringIO())
+            with self.assertRaisesMessage(CommandError, "no 'other' vector"):
+                call_command("embedding_cutover", candidate="other", stdout=StringIO())
+
+
+class ChunkExportTests(QdrantTestCase):
+    def setUp(self):
+        super().setUp()
+        self.document = self.make_document("Astronomie")
+        self.index([(self.document, self.chunks("comètes", "astéroïdes", "météores"))])
+        self.url = f"/api/documents/{self.document.pk}/chunks/export/"
+        self.headers = {"authorization": f"Token {Token.objects.create(user=self.user).key}"}
+
+    def lines(self, body):
+        return [json.loads(line) for line in body.decode("utf-8").splitlines()]
+
+    def test_wsgi_export_streams_header_then_chunks(self):
+        response = self.client.get(self.url, headers=self.headers)
+        self.assertFalse(response.is_async)
+        lines = self.lines(b"".join(response.streaming_content))
+        self.assertEqual(lines[0]["document_title"], "Astronomie")
+        self.assertEqual([line["text"] for line in lines[1:]], ["comètes", "astéroïdes", "météores"])
+
+    async def test_asgi_export_uses_an_async_iterator(self):
+        response = await self.async_client.get(self.url, headers=self.headers)
+        self.assertTrue(response.is_async)
+        body = b"".join([block async for block in response.streaming_content])
+        self.assertEqual([line["text"] for line in self.lines(body)[1:]], ["comètes", "astéroïdes", "météores"])
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email="pager@example.com", password="x", name="Pager")
+        for index in range(3):
+            Document.objects.create(title=f"Doc {index}", owner=self.user, source="general", status="processed")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_document_list_is_paginated_by_default(self):
+        response = self.client.get("/api/documents/", {"page_size": 2})
+        self.assertEqual(len(response.data["results"]), 2)
+        following = self.client.get(response.data["next"])
+        self.assertEqual(len(following.data["results"]), 1)
+        self.assertIsNone(following.data["next"])
+        self.assertEqual(len(self.client.get("/api/documents/").data["results"]), 3)
+
+    def test_legacy_clients_can_still_ask_for_the_full_array(self):
+        response = self.client.get("/api/documents/", {"paginate": "false"})
+        self.assertEqual([item["title"] for item in response.data], ["Doc 2", "Doc 1", "Doc 0"])
+
+    def test_list_filters_select_rows_before_paging(self):
+        other = get_user_model().objects.create_user(email="other@example.com", password="x", name="Other")
+        Document.objects.create(title="Mine", owner=self.user, source="personal", status="indexed")
+        Document.objects.create(title="Theirs", owner=other, source="personal", status="indexed")
+        Document.objects.create(title="Pending", owner=other, source="general", status="uploaded")
+
+        def titles(query):
+            response = self.client.get(f"/api/documents/?fields=title&{query}")
+            self.assertEqual({name for item in response.data["results"] for name in item}, {"title"})
+            return sorted(item["title"] for item in response.data["results"])
+
+        self.assertEqual(titles("source=personal&owner=me"), ["Mine"])
+        self.assertEqual(titles("source=general&exclude_status=uploaded"), ["Doc 0", "Doc 1", "Doc 2"])
+        self.assertEqual(titles("visible_to=me&q=e"), ["Mine", "Pending"])
+        self.assertEqual(self.client.get("/api/documents/?status=archived").status_code, 400)
+
+
+class MyLibraryCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(email="owner@example.com", password="x", name="Owner")
+        self.document = Document.objects.create(
+            title="Notes", owner=self.user, source="personal", status="uploaded", file="documents/notes.txt"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def personal(self):
+        return json.loads(self.client.get("/api/me/library/").content)["personal"]
+
+    def test_file_is_an_absolute_url(self):
+        self.assertEqual(self.personal()[0]["file"], "http://testserver/media/documents/notes.txt")
+
+    def test_bulk_status_update_refreshes_the_cached_library(self):
+        self.assertEqual(self.personal()[0]["status"], "uploaded")
+        with self.captureOnCommitCallbacks(execute=True):
+            update_documents(Document.objects.filter(pk=self.document.pk), status="indexed")
+        self.assertEqual(self.personal()[0]["status"], "indexed")
+
+    def test_favorite_invalidates_the_cached_library_after_commit(self):
+        self.assertEqual(self.personal()[0]["is_favorite"], False)
+        with self.captureOnCommitCallbacks() as callbacks:
+            Favorite.objects.create(user=self.user, document=self.document)
+        self.assertEqual(self.personal()[0]["is_favorite"], False)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.personal()[0]["is_favorite"], True)
+
+
+class IngestionRouterTests(SimpleTestCase):
+    def test_only_ingestion_threads_use_the_ingestion_alias(self):
+        router = IngestionRouter()
+        databases = {"default": {}, "ingestion": {}}
+        with mock.patch.object(db_router, "settings", SimpleNamespace(DATABASES=databases)):
+            self.assertIsNone(router.db_for_write(Document))
+            with use_ingestion_db():
+                self.assertEqual(router.db_for_write(Document), "ingestion")
+                self.assertEqual(router.db_for_read(Document), "ingestion")
+                seen = []
+                thread = threading.Thread(target=lambda: seen.append(router.db_for_read(Document)))
+                thread.start()
+                thread.join()
+                self.assertEqual(seen, [None])
+            self.assertIsNone(router.db_for_read(Document))
+        self.assertFalse(router.allow_migrate("ingestion", "library"))
+
+    def test_without_ingestion_alias_everything_stays_on_default(self):
+        databases = {"default": {}}
+        with mock.patch.object(db_router, "settings", SimpleNamespace(DATABASES=databases)):
+            with use_ingestion_db():
+                self.assertIsNone(IngestionRouter().db_for_write(Document))
+
+
+class BulkUploadRollbackTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, True)
+        overrides = override_settings(MEDIA_ROOT=self.media)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.user = get_user_model().objects.create_user(email="bulk@example.com", password="x", name="Bulk")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def stored_files(self):
+        return [name for _, _, names in os.walk(self.media) for name in names]
+
+    def test_failed_bulk_request_leaves_no_stored_file(self):
+        files = [SimpleUploadedFile(f"note{index}.pdf", b"%PDF-1.4") for index in range(2)]
+        with mock.patch("library.views.IngestionJob.objects.create", side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                self.client.post("/api/documents/bulk/", {"files": files}, format="multipart")
+        self.assertFalse(Document.objects.exists())
+        self.assertEqual(self.stored_files(), [])
+
+    def test_files_copied_before_an_error_are_deleted(self):
+        def files():
+            yield "first.pdf", ContentFile(b"%PDF-1.4", name="first.pdf")
+            raise zipfile.BadZipFile("truncated")
+
+        with self.assertRaises(zipfile.BadZipFile):
+            create_bulk_documents(self.user, files())
+        self.assertEqual(self.stored_files(), [])
+
+    def archive(self, members):
+        buffer = ContentFile(b"", name="bundle.zip")
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as bundle:
+            for name, content in members:
+                bundle.writestr(name, content)
+        buffer.seek(0)
+        return buffer
+
+    def test_archive_members_over_the_size_limits_are_not_read(self):
+        limits = {**settings.DOCUMENT_PROCESSING, "BULK_MAX_FILE_SIZE": 1000, "BULK_MAX_TOTAL_SIZE": 1500}
+        archive = self.archive([
+            ("bomb.pdf", b"\0" * 100_000),
+            ("first.pdf", b"%PDF-1.4" + b"\0" * 792),
+            ("second.pdf", b"%PDF-1.4" + b"\0" * 792),
+            ("third.pdf", b"%PDF-1.4"),
+        ])
+        with override_settings(DOCUMENT_PROCESSING=limits), \
+                mock.patch("zipfile.ZipExtFile.read", autospec=True, side_effect=zipfile.ZipExtFile.read) as read:
+            documents, results = create_bulk_documents(self.user, iter_archive_members(archive))
+        self.assertEqual(
+            [(entry["filename"], entry["status"], entry.get("error")) for entry in results],
+            [
+                ("bomb.pdf", "rejected", "File too large."),
+                ("first.pdf", "accepted", None),
+                ("second.pdf", "rejected", "Total size limit exceeded."),
+            ],
+        )
+        self.assertEqual(len(documents), 1)
+        self.assertEqual({call.args[0].name for call in read.call_args_list}, {"first.pdf"})
+
+
+class SchedulerAdmissionTests(SimpleTestCase):
+    def setUp(self):
+        # Sans worker : les tâches restent en file et sont retirées à la main.
+        self.scheduler = IngestionScheduler(extraction_workers=0, indexing_workers=0, per_owner_concurrency=1)
+        self.batch = SimpleNamespace()
+
+    def push(self, priority, owner):
+        task = _Task(
+            priority=priority,
+            seq=next(self.scheduler._seq),
+            enqueued_at=0.0,
+            batch=self.batch,
+            document=SimpleNamespace(owner_id=owner),
+        )
+        with self.scheduler.condition:
+            self.scheduler.extraction.push(task)
+        return task
+
+    def pop(self):
+        with self.scheduler.condition:
+            task = self.scheduler.extraction._pop_eligible()
+            if task is not None:
+                self.scheduler.started("extraction", task)
+        return task
+
+    def finish(self, task):
+        with self.scheduler.condition:
+            self.scheduler.finished("extraction", task)
+
+    def test_busy_owner_is_skipped_without_blocking_others(self):
+        first = self.push(Priority.BULK, "alice")
+        second = self.push(Priority.BULK, "alice")
+        other = self.push(Priority.BULK, "bob")
+        self.assertIs(self.pop(), first)
+        self.assertIs(self.pop(), other)
+        self.assertIsNone(self.pop())
+        self.finish(first)
+        self.assertIs(self.pop(), second)
+
+    def test_higher_priority_and_unlimited_classes_go_first(self):
+        bulk = self.push(Priority.BULK, "alice")
+        self.assertIs(self.pop(), bulk)
+        interactive = self.push(Priority.INTERACTIVE, "alice")
+        approvals = [self.push(Priority.APPROVAL, "alice") for _ in range(2)]
+        self.assertEqual([self.pop(), self.pop()], approvals)
+        self.assertIsNone(self.pop())
+        for task in (bulk, *approvals):
+            self.finish(task)
+        self.assertIs(self.pop(), interactive)
+
+
+class ChunkingTests(SimpleTestCase):
+    def test_generate_chunks_overlaps_consecutive_windows(self):
+        text = " ".join(f"w{index}" for index in range(10))
+        self.assertEqual(list(generate_chunks(text, 4, 1)), ["w0 w1 w2 w3", "w3 w4 w5 w6", "w6 w7 w8 w9"])
+        self.assertEqual(list(generate_chunks("   ", 4, 1)), [])
+        with self.assertRaises(ValueError):
+            list(generate_chunks(text, 4, 4))
+
+    def test_layout_chunks_keep_table_rows_whole_and_report_boxes(self):
+        blocks = [
+            Block("text", (0, 0, 100, 20), [Unit("alpha beta", (0, 0, 100, 10)), Unit("gamma delta", (0, 10, 100, 20))]),
+            Block("table", (0, 30, 100, 50), [Unit("a | b | c", (0, 30, 100, 40)), Unit("d | e | f", (0, 40, 100, 50))]),
+        ]
+        chunks = list(layout_chunks(blocks, 6, 1))
+        # La fenêtre de 6 mots s'arrêterait au milieu de la rangée « a | b | c ».
+        self.assertEqual(chunks[0], ("alpha beta gamma delta\na | b | c", [[0, 0, 100, 20], [0, 30, 100, 40]]))
+        self.assertEqual(chunks[-1], ("c\nd | e | f", [[0, 30, 100, 50]]))
+
+
+class DiversityTests(SimpleTestCase):
+    def test_mmr_trades_relevance_for_novelty(self):
+        vectors = np.array([[1.0, 0.05], [1.0, 0.06], [0.05, 1.0]])
+        self.assertEqual(mmr_select([1, 1], vectors, 2, 1.0), [1, 0])
+        self.assertEqual(mmr_select([1, 1], vectors, 2, 0.5), [1, 2])
+        self.assertEqual(mmr_select([1, 1], vectors, 3, 1.0, groups=["a", "a", "b"], per_group=1), [1, 2])
+        self.assertEqual(mmr_select([1, 1], np.zeros((0, 2)), 3, 0.5), [])
+
+    def test_merge_adjacent_joins_consecutive_chunks_at_the_best_rank(self):
+        def hit(document, index, text):
+            return {
+                "document_id": document, "page_number": 1, "chunk_index": index,
+                "text": text, "point_id": f"{document}-{index}",
+            }
+
+        passages = merge_adjacent([hit("d1", 2, "c d e f"), hit("d2", 1, "autre"), hit("d1", 1, "a b c d")])
+        self.assertEqual([passage["document_id"] for passage in passages], ["d1", "d2"])
+        self.assertEqual(passages[0]["text"], "a b c d e f")
+        self.assertEqual(passages[0]["chunk_indexes"], [1, 2])
+        self.assertEqual(passages[0]["point_ids"], ["d1-1", "d1-2"])
+        self.assertIsNone(passages[0]["boxes"])
+
+
+class DedupTests(TestCase):
+    text = " ".join(f"mot{index}" for index in range(200))
+    # Un mot changé ne touche que 5 shingles sur 196.
+    near_duplicate = text.replace("mot100", "variante")
+    unrelated = " ".join(f"autre{index}" for index in range(200))
+
+    def test_signature_estimates_jaccard_similarity(self):
+        self.assertIsNone(signature("   "))
+        original = signature(self.text)
+        self.assertTrue(np.array_equal(original, signature(self.text)))
+        self.assertGreater(dedup_similarity(original, signature(self.near_duplicate)), 0.85)
+        self.assertLess(dedup_similarity(original, signature(self.unrelated)), 0.2)
+
+    def test_find_duplicates_within_a_batch(self):
+        signatures = [signature(self.text), signature(self.near_duplicate), signature(self.unrelated), None]
+        matches = find_duplicates(signatures)
+        self.assertIsNone(matches[0])
+        self.assertEqual(matches[1].position, 0)
+        self.assertIsNone(matches[2])
+        self.assertIsNone(matches[3])
+
+    def test_find_duplicates_against_stored_bands(self):
+        user = get_user_model().objects.create_user(email="dedup@example.com", password="x", name="Dedup")
+        document = Document.objects.create(title="Manuel", owner=user, source="general", status="indexed")
+        original = signature(self.text)
+        embedding = DocumentEmbedding.objects.create(
+            document=document, chunk_index=1, text=self.text, minhash=encode_signature(original)
+        )
+        ChunkBand.objects.bulk_create(band_rows(embedding.id, original))
+        [match] = find_duplicates([signature(self.near_duplicate)])
+        self.assertEqual((match.embedding_id, match.point_id), (embedding.id, str(embedding.point_id)))
+        self.assertEqual(find_duplicates([signature(self.near_duplicate)], exclude_document_ids=[document.id]), [None])
+
+    def test_duplicates_keep_the_boxes_of_their_canonical_chunk(self):
+        user = get_user_model().objects.create_user(email="boxes@example.com", password="x", name="Boxes")
+        stored_document = Document.objects.create(title="Manuel", owner=user, source="general", status="indexed")
+        stored_boxes = [[0.1, 0.2, 0.5, 0.6]]
+        stored = DocumentEmbedding.objects.create(
+            document=stored_document,
+            chunk_index=1,
+            text=self.text,
+            minhash=encode_signature(signature(self.text)),
+            boxes=stored_boxes,
+        )
+        ChunkBand.objects.bulk_create(band_rows(stored.id, signature(self.text)))
+        document = Document.objects.create(title="Réédition", owner=user, source="general", status="processing")
+        batch_boxes = [[0.0, 0.0, 1.0, 1.0]]
+        canonical = DocumentEmbedding.objects.create(
+            document=document, chunk_index=1, text=self.unrelated, boxes=batch_boxes
+        )
+        texts = [self.unrelated, self.unrelated.replace("autre100", "variante"), self.near_duplicate]
+        flat = [(document, Chunk(text=text, page_number=1, index=index)) for index, text in enumerate(texts, start=1)]
+        signatures = [signature(text) for text in texts]
+        matches = find_duplicates(signatures, exclude_document_ids=[document.id])
+        self.assertEqual((matches[1].position, matches[2].embedding_id), (0, stored.id))
+        link_duplicates(mock.Mock(), flat, signatures, matches, {0: str(canonical.point_id)})
+        duplicates = document.embeddings.filter(canonical__isnull=False).order_by("chunk_index")
+        self.assertEqual([row.boxes for row in duplicates], [batch_boxes, stored_boxes])
+
+
+class ContentRangeTests(SimpleTestCase):
+    def test_parse_content_range(self):
+        self.assertEqual(parse_content_range("bytes 0-99/200"), (0, 100))
+        self.assertEqual(parse_content_range(" bytes 100-199/* "), (100, 100))
+        for header in (None, "", "bytes=0-99/200", "bytes 10-5/20"):
+            with self.assertRaises(UploadError):
+                parse_content_range(header)
+
+
+class UploadSessionTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, True)
+        overrides = override_settings(MEDIA_ROOT=media)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.user = get_user_model().objects.create_user(email="upload@example.com", password="x", name="Upload")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.data = b"%PDF-1.4 resumable upload"
+        response = self.client.post(
+            "/api/uploads/",
+            {
+                "filename": "notes.pdf",
+                "total_size": len(self.data),
+                "checksum": hashlib.sha256(self.data).hexdigest(),
+                "source": "general",
+            },
+            format="json",
+        )
+        self.url = f"/api/uploads/{response.data['id']}/"
+
+    def put(self, start, end):
+        return self.client.put(
+            self.url,
+            self.data[start:end],
+            content_type="application/octet-stream",
+            HTTP_CONTENT_RANGE=f"bytes {start}-{end - 1}/{len(self.data)}",
+        )
+
+    def test_parts_are_appended_in_order_and_others_get_the_expected_offset(self):
+        self.assertEqual(self.put(0, 10).data["received_bytes"], 10)
+        conflict = self.put(0, 10)
+        self.assertEqual((conflict.status_code, conflict.data["received_bytes"]), (409, 10))
+        self.assertEqual(self.put(10, len(self.data)).data["received_bytes"], len(self.data))
+        self.assertEqual(self.client.post(f"{self.url}finalize/").status_code, 201)
+        document = Document.objects.get(title="notes")
+        with document.file.open("rb") as handle:
+            self.assertEqual(handle.read(), self.data)
+
+    def test_completed_session_cannot_be_aborted(self):
+        self.put(0, len(self.data))
+        self.client.post(f"{self.url}finalize/")
+        response = self.client.delete(self.url)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.client.get(self.url).data["status"], "completed")
+
+    def test_abort_deletes_the_partial_file_once(self):
+        self.put(0, 10)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete(self.url).status_code, 204)
+        self.assertEqual(self.client.get(self.url).data["status"], "aborted")
+        self.assertEqual(self.client.delete(self.url).status_code, 204)
+        self.assertEqual(os.listdir(os.path.join(settings.MEDIA_ROOT, "documents")), [])
+
+
+@skipUnless(find_spec("onnxruntime") and find_spec("optimum"), "onnxruntime/optimum not installed")
+class OnnxBackendParityTests(SimpleTestCase):
+    def setUp(self):
+        from transformers import BertConfig, BertModel, BertTokenizerFast
+
+        # Petit modèle BERT aléatoire : aucun téléchargement.
+        self.model_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.model_dir, True)
+        words = "la bibliothèque indexe des documents pdf et images pour la recherche sémantique".split()
+        vocab = os.path.join(self.model_dir, "vocab.txt")
+        with open(vocab, "w", encoding="utf-8") as handle:
+            handle.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", *dict.fromkeys(words)]))
+        BertTokenizerFast(vocab).save_pretrained(self.model_dir)
+        config = BertConfig(
+            vocab_size=5 + len(set(words)), hidden_size=32, num_hidden_layers=2,
+            num_attention_heads=2, intermediate_size=64, max_position_embeddings=64,
+        )
+        BertModel(config).save_pretrained(self.model_dir)
+        export_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, export_dir, True)
+        overrides = override_settings(QDRANT=dict(settings.QDRANT, ONNX_EXPORT_DIR=export_dir))
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def test_quantized_onnx_embeddings_match_torch(self):
+        sentences = ["la bibliothèque indexe des documents", "recherche sémantique des images pdf"]
+        reference = load_embedding_model(self.model_dir, "torch").encode(sentences, normalize_embeddings=True)
+        candidate = load_embedding_model(self.model_dir, "onnx").encode(sentences, normalize_embeddings=True)
+        self.assertGreater(float(np.sum(reference * candidate, axis=1).min()), 0.99)
+        # Le second chargement réutilise l'export présent sur disque.
+        with mock.patch("sentence_transformers.export_dynamic_quantized_onnx_model") as export:
+            load_embedding_model(self.model_dir, "onnx")
+        export.assert_not_called()
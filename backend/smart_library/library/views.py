@@ -1,20 +1,56 @@
+import json
 import logging
-from typing import Optional
+import uuid
+from itertools import islice
+from typing import Iterator, List, Optional
 
-from rest_framework import permissions, status, viewsets
+import zipfile
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import Q
+from django.http import HttpResponse, StreamingHttpResponse
+from rest_framework import mixins, permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.exceptions import ValidationError
 
-from .models import Document, Favorite, Tag
+from .models import Document, Favorite, IngestionJob, Tag, UploadSession
+from .pagination import DocumentPagination, FavoritePagination
 from .serializers import (
-    DocumentEmbeddingSerializer,
     DocumentSerializer,
     FavoriteSerializer,
+    IngestionJobSerializer,
+    LibraryDocumentSerializer,
     TagSerializer,
+    UploadSessionSerializer,
+)
+from .async_views import parse_limit
+from .services.centroids import similar_documents
+from .services.chunk_storage import iter_chunk_rows
+from .services.ingestion import (
+    create_bulk_documents,
+    delete_stored_files,
+    iter_archive_members,
+    schedule_ingestion_job,
+)
+from .services.language import detection_enabled
+from .services.my_library import user_library_json
+from .services.ocr import get_reader_pool
+from .services.scheduler import Priority, get_scheduler
+from .services.stats import library_stats, update_documents
+from .services.uploads import (
+    UploadAlreadyCompleted,
+    UploadError,
+    UploadOffsetMismatch,
+    abort_upload,
+    append_part,
+    finalize_upload,
+    parse_content_range,
 )
-from .services.document_processing import process_document
 from .permissions import IsSuperAdmin
 
 
@@ -26,22 +62,141 @@ def _is_truthy(value) -> bool:
 
 logger = logging.getLogger(__name__)
 
+CHUNK_EXPORT_BATCH_SIZE = 2000
+CHUNK_EXPORT_LINES_PER_SEND = 200
+APPROVE_BULK_MAX = 500
 
-def _metadata_is_complete(document: Document) -> bool:
-    return bool(document.title and document.language)
 
+def _async_lines(lines: Iterator[str], batch_size: int = CHUNK_EXPORT_LINES_PER_SEND):
+    """Itérateur async pour ASGI : les lignes sont produites par lots dans le thread sync.
+
+    Sous ASGI, Django consomme entièrement un itérateur synchrone avant d'envoyer la
+    réponse ; ici chaque lot est envoyé dès qu'il est lu, et le curseur est fermé si le
+    client se déconnecte.
+    """
+    take = sync_to_async(lambda: "".join(islice(lines, batch_size)), thread_sensitive=True)
+
+    async def stream():
+        try:
+            while True:
+                block = await take()
+                if not block:
+                    return
+                yield block
+        finally:
+            await sync_to_async(lines.close, thread_sensitive=True)()
 
-def _process_document_or_raise(document: Document, *, fallback_status: Optional[str] = None) -> None:
+    return stream()
+
+
+def _optional_int_param(params, name: str) -> Optional[int]:
+    value = params.get(name)
+    if value in (None, ""):
+        return None
     try:
-        process_document(document)
-    except Exception as exc:
-        logger.exception("Document processing failed for %s", document.id, exc_info=exc)
-        if fallback_status is not None:
-            document.status = fallback_status
-        else:
-            document.status = 'pending_meta' if document.source == 'general' else 'uploaded'
-        document.save(update_fields=['status'])
-        raise ValidationError({"detail": "Document processing failed. Consultez les logs serveur."})
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValidationError({name: "Un entier est attendu."})
+
+
+def _filter_chunk_ranges(queryset, params):
+    """Applique les filtres page_from/page_to et chunk_from/chunk_to (bornes incluses)."""
+    bounds = {
+        "page_number__gte": _optional_int_param(params, "page_from"),
+        "page_number__lte": _optional_int_param(params, "page_to"),
+        "chunk_index__gte": _optional_int_param(params, "chunk_from"),
+        "chunk_index__lte": _optional_int_param(params, "chunk_to"),
+    }
+    return queryset.filter(**{lookup: value for lookup, value in bounds.items() if value is not None})
+
+
+def _parse_uuid_list(value, name: str, max_items: int) -> List[uuid.UUID]:
+    if not isinstance(value, list) or not value:
+        raise ValidationError({name: "Une liste d'identifiants est attendue."})
+    if len(value) > max_items:
+        raise ValidationError({name: f"{max_items} identifiants au maximum."})
+    try:
+        return [uuid.UUID(str(item)) for item in value]
+    except ValueError:
+        raise ValidationError({name: "Identifiant de document invalide."})
+
+
+def _filter_approval_queue(queryset, params):
+    """Filtres de la file de validation : tag, language, owner et q (titre)."""
+    tag = _optional_int_param(params, "tag")
+    if tag is not None:
+        queryset = queryset.filter(tag_id=tag)
+    if params.get("language"):
+        queryset = queryset.filter(language=params["language"])
+    if params.get("owner"):
+        try:
+            queryset = queryset.filter(owner_id=uuid.UUID(params["owner"]))
+        except ValueError:
+            raise ValidationError({"owner": "Identifiant d'utilisateur invalide."})
+    if params.get("q"):
+        queryset = queryset.filter(title__icontains=params["q"])
+    return queryset
+
+
+def _filter_document_list(queryset, params, user):
+    """Filtres de la liste : source, owner (``me``), visible_to=me, status, exclude_status et q.
+
+    Les pages de la bibliothèque lisent ainsi une page filtrée côté serveur au lieu de
+    charger tous les documents pour les trier dans le navigateur.
+    """
+    for name in ("source", "status", "exclude_status"):
+        choices = Document.SOURCE_CHOICES if name == "source" else Document.STATUS_CHOICES
+        if params.get(name) and params[name] not in dict(choices):
+            raise ValidationError({name: "Valeur invalide."})
+    if params.get("source"):
+        queryset = queryset.filter(source=params["source"])
+    if params.get("status"):
+        queryset = queryset.filter(status=params["status"])
+    if params.get("exclude_status"):
+        queryset = queryset.exclude(status=params["exclude_status"])
+    if params.get("owner") == "me":
+        queryset = queryset.filter(owner=user)
+    elif params.get("owner"):
+        try:
+            queryset = queryset.filter(owner_id=uuid.UUID(params["owner"]))
+        except ValueError:
+            raise ValidationError({"owner": "Identifiant d'utilisateur invalide."})
+    if params.get("visible_to") == "me":
+        # Bibliothèque générale et documents personnels de l'utilisateur.
+        queryset = queryset.filter(Q(source="general") | Q(owner=user))
+    if params.get("q"):
+        query = params["q"].strip()
+        queryset = queryset.filter(
+            Q(title__icontains=query)
+            | Q(filename__icontains=query)
+            | Q(language__icontains=query)
+            | Q(tag__name__icontains=query)
+        )
+    return queryset
+
+
+def _metadata_is_complete(document: Document) -> bool:
+    """La langue peut manquer si elle est détectée au traitement (``LANGUAGE_DETECTION``)."""
+    return bool(document.title and (document.language or detection_enabled()))
+
+
+def _process_document_or_raise(
+    document: Document,
+    *,
+    fallback_status: Optional[str] = None,
+    priority: Priority = Priority.INTERACTIVE,
+) -> None:
+    """Traite le document via l'ordonnanceur d'ingestion et attend le résultat."""
+    error = get_scheduler().run([document], priority).get(str(document.id))
+    if error is None:
+        document.refresh_from_db(fields=['status'])
+        return
+    if fallback_status is not None:
+        document.status = fallback_status
+    else:
+        document.status = 'pending_meta' if document.source == 'general' else 'uploaded'
+    document.save(update_fields=['status'])
+    raise ValidationError({"detail": "Document processing failed. Consultez les logs serveur."})
 
 
 class TagViewSet(viewsets.ModelViewSet):
@@ -58,7 +213,15 @@ class DocumentViewSet(viewsets.ModelViewSet):
     serializer_class = DocumentSerializer
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
-    queryset = Document.objects.select_related("tag", "owner").all().order_by("-date_added")
+    pagination_class = DocumentPagination
+    # Le serializer n'expose que les clés étrangères : pas de jointure nécessaire.
+    queryset = Document.objects.all().order_by("-date_added")
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action == "list":
+            queryset = _filter_document_list(queryset, self.request.query_params, self.request.user)
+        return queryset
 
     def perform_create(self, serializer):
         if "file" not in self.request.FILES:
@@ -90,6 +253,57 @@ class DocumentViewSet(viewsets.ModelViewSet):
             if should_reprocess:
                 _process_document_or_raise(document)
 
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk_upload(self, request):
+        """Import en masse : plusieurs champs ``files`` et/ou une archive zip ``archive``.
+
+        Les documents sont créés en un seul INSERT puis indexés par lots en arrière-plan ;
+        la réponse contient le statut de chaque fichier et l'identifiant du job.
+        """
+        files = request.FILES.getlist("files")
+        archive = request.FILES.get("archive")
+        if not files and not archive:
+            raise ValidationError({"files": "Au moins un fichier ou une archive zip est requis."})
+        source = request.data.get("source") or 'personal'
+        if source not in dict(Document.SOURCE_CHOICES):
+            raise ValidationError({"source": "Valeur invalide."})
+        tag = None
+        tag_id = request.data.get("tag")
+        if tag_id:
+            tag = Tag.objects.filter(pk=tag_id).first()
+            if tag is None:
+                raise ValidationError({"tag": "Tag introuvable."})
+
+        def iter_uploads():
+            for uploaded in files:
+                yield uploaded.name, uploaded
+            if archive:
+                yield from iter_archive_members(archive)
+
+        documents = []
+        try:
+            with transaction.atomic():
+                documents, results = create_bulk_documents(
+                    request.user,
+                    iter_uploads(),
+                    source=source,
+                    language=request.data.get("language", ""),
+                    tag=tag,
+                )
+                job = IngestionJob.objects.create(
+                    owner=request.user,
+                    total_files=len(documents),
+                    results=results,
+                )
+                schedule_ingestion_job(job)
+        except zipfile.BadZipFile:
+            raise ValidationError({"archive": "Archive zip invalide."})
+        except BaseException:
+            # Transaction annulée : aucun document ne référence plus les fichiers copiés.
+            delete_stored_files(documents)
+            raise
+        return Response(IngestionJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
     @action(detail=True, methods=["post"], url_path="reprocess")
     def reprocess(self, request, pk=None):
         document = self.get_object()
@@ -100,11 +314,32 @@ class DocumentViewSet(viewsets.ModelViewSet):
         refreshed = self.get_serializer(document)
         return Response(refreshed.data, status=status.HTTP_200_OK)
 
+    @action(detail=True, methods=["get"], url_path="similar")
+    def similar(self, request, pk=None):
+        """Documents proches (centroïdes), limités aux documents visibles par l'utilisateur.
+
+        ``?limit=`` (10 par défaut, 50 au plus) et ``?source=general|personal``.
+        """
+        document = self.get_object()
+        source = request.query_params.get("source")
+        if source not in {None, "general", "personal"}:
+            raise ValidationError({"source": "Valeur attendue : general ou personal."})
+        matches = similar_documents(
+            document,
+            request.user,
+            limit=parse_limit(request.query_params.get("limit")),
+            source=source,
+        )
+        results = [
+            {**LibraryDocumentSerializer(match).data, "score": score}
+            for match, score in matches
+        ]
+        return Response({"document_id": str(document.id), "results": results}, status=status.HTTP_200_OK)
+
     @action(detail=True, methods=["get"], url_path="chunks")
     def chunks(self, request, pk=None):
         document = self.get_object()
-        embeddings = document.embeddings.order_by("chunk_index")
-        serializer = DocumentEmbeddingSerializer(embeddings, many=True)
+        embeddings = _filter_chunk_ranges(document.embeddings.order_by("chunk_index"), request.query_params)
         base = {
             "document_id": str(document.id),
             "document_title": document.title,
@@ -113,15 +348,53 @@ class DocumentViewSet(viewsets.ModelViewSet):
             "tag": document.tag.name if document.tag else None,
         }
         payload = []
-        for chunk_data in serializer.data:
+        for chunk_index, page_number, text in iter_chunk_rows(embeddings, CHUNK_EXPORT_BATCH_SIZE):
             payload.append(
                 {
                     **base,
-                    **chunk_data,
+                    "chunk_index": chunk_index,
+                    "page_number": page_number,
+                    "text": text,
                 }
             )
         return Response(payload, status=status.HTTP_200_OK)
 
+    @action(detail=True, methods=["get"], url_path="chunks/export")
+    def export_chunks(self, request, pk=None):
+        """Diffuse les chunks en NDJSON (une ligne par chunk) avec une mémoire constante.
+
+        La première ligne contient les métadonnées du document ; les chunks sont lus par
+        lots via un curseur serveur et ne passent pas par le serializer DRF. Sous ASGI le
+        flux passe par un itérateur async (voir ``_async_lines``).
+        """
+        document = self.get_object()
+        rows = iter_chunk_rows(
+            _filter_chunk_ranges(document.embeddings.order_by("chunk_index"), request.query_params),
+            CHUNK_EXPORT_BATCH_SIZE,
+        )
+        header = {
+            "document_id": str(document.id),
+            "document_title": document.title,
+            "source": document.source,
+            "language": document.language,
+            "tag": document.tag.name if document.tag else None,
+        }
+
+        def stream():
+            yield json.dumps(header, ensure_ascii=False) + "\n"
+            for chunk_index, page_number, text in rows:
+                yield json.dumps(
+                    {"chunk_index": chunk_index, "page_number": page_number, "text": text},
+                    ensure_ascii=False,
+                ) + "\n"
+
+        lines = stream()
+        if isinstance(request._request, ASGIRequest):
+            lines = _async_lines(lines)
+        response = StreamingHttpResponse(lines, content_type="application/x-ndjson")
+        response["Content-Disposition"] = f'attachment; filename="{document.id}-chunks.ndjson"'
+        return response
+
     @action(
         detail=False,
         methods=["get"],
@@ -129,10 +402,61 @@ class DocumentViewSet(viewsets.ModelViewSet):
         permission_classes=[permissions.IsAuthenticated, IsSuperAdmin],
     )
     def awaiting_approval(self, request):
-        queryset = self.get_queryset().filter(source='general', status='uploaded')
+        """File de validation filtrable (tag, language, owner, q) et paginée à la demande."""
+        queryset = _filter_approval_queue(
+            self.get_queryset().filter(source='general', status='uploaded'),
+            request.query_params,
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="approve-bulk",
+        permission_classes=[permissions.IsAuthenticated, IsSuperAdmin],
+    )
+    def approve_bulk(self, request):
+        """Valide plusieurs documents en un UPDATE et confie leur traitement à un job.
+
+        Corps : ``{"ids": [<uuid>, ...]}``. Seuls les documents aux métadonnées complètes
+        sont indexés ; les autres restent en ``pending_meta`` comme avec ``approve``.
+        """
+        ids = _parse_uuid_list(request.data.get("ids"), "ids", APPROVE_BULK_MAX)
+        with transaction.atomic():
+            documents = list(
+                Document.objects.select_for_update()
+                .filter(pk__in=ids, source='general', status='uploaded')
+                .order_by("pk")
+            )
+            approved_ids = [document.pk for document in documents]
+            update_documents(Document.objects.filter(pk__in=approved_ids), status='pending_meta')
+            ready = [document for document in documents if _metadata_is_complete(document)]
+            job = None
+            if ready:
+                job = IngestionJob.objects.create(
+                    owner=request.user,
+                    total_files=len(ready),
+                    results=[
+                        {"filename": document.filename, "document_id": str(document.id), "status": "accepted"}
+                        for document in ready
+                    ],
+                )
+                schedule_ingestion_job(job, Priority.APPROVAL)
+        approved = {str(pk) for pk in approved_ids}
+        return Response(
+            {
+                "approved": sorted(approved),
+                "pending_meta": sorted(approved - {str(document.pk) for document in ready}),
+                "skipped": sorted({str(pk) for pk in ids} - approved),
+                "ingestion_job": str(job.pk) if job else None,
+            },
+            status=status.HTTP_202_ACCEPTED if job else status.HTTP_200_OK,
+        )
+
     @action(
         detail=True,
         methods=["post"],
@@ -148,14 +472,130 @@ class DocumentViewSet(viewsets.ModelViewSet):
         document.status = 'pending_meta'
         document.save(update_fields=['status'])
         if _metadata_is_complete(document):
-            _process_document_or_raise(document, fallback_status='pending_meta')
+            _process_document_or_raise(document, fallback_status='pending_meta', priority=Priority.APPROVAL)
         serializer = self.get_serializer(document)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 class FavoriteViewSet(viewsets.ModelViewSet):
-    """CRUD complet pour les favoris."""
+    """CRUD complet pour les favoris de l'utilisateur courant."""
 
     serializer_class = FavoriteSerializer
     permission_classes = [permissions.IsAuthenticated]
-    queryset = Favorite.objects.select_related("user", "document").all().order_by("-created_at")
+    pagination_class = FavoritePagination
+    queryset = Favorite.objects.all().order_by("-created_at")
+
+    def get_queryset(self):
+        return super().get_queryset().filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        document = serializer.validated_data["document"]
+        if Favorite.objects.filter(user=self.request.user, document=document).exists():
+            raise ValidationError({"document": "Ce document est déjà dans vos favoris."})
+        serializer.save(user=self.request.user)
+
+
+class IngestionJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Consultation des imports en masse de l'utilisateur courant."""
+
+    serializer_class = IngestionJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    queryset = IngestionJob.objects.all().order_by("-created_at")
+
+    def get_queryset(self):
+        return super().get_queryset().filter(owner=self.request.user)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="scheduler",
+        permission_classes=[permissions.IsAuthenticated, IsSuperAdmin],
+    )
+    def scheduler(self, request):
+        """Profondeur de file et temps d'attente par étage et classe de priorité, lecteurs OCR chargés."""
+        return Response(
+            {**get_scheduler().snapshot(), "ocr_readers": get_reader_pool().snapshot()},
+            status=status.HTTP_200_OK,
+        )
+
+
+class LibraryStatsView(APIView):
+    """GET /api/library/stats/ : compteurs agrégés pour les tableaux de bord."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response(library_stats(), status=status.HTTP_200_OK)
+
+
+class MyLibraryView(APIView):
+    """GET /api/me/library/ : documents personnels, favoris et documents généraux récents."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return HttpResponse(user_library_json(request), content_type="application/json")
+
+
+class UploadSessionViewSet(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """Téléversement reprenable : création, envoi des plages d'octets (PUT), finalisation."""
+
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    queryset = UploadSession.objects.all().order_by("-created_at")
+
+    def get_queryset(self):
+        return super().get_queryset().filter(owner=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(owner=self.request.user)
+
+    def update(self, request, *args, **kwargs):
+        """PUT avec le corps brut de la partie et ``Content-Range: bytes start-end/total``."""
+        session = self.get_object()
+        try:
+            start, length = parse_content_range(request.headers.get("Content-Range"))
+            if request.stream is None:
+                raise UploadError("Empty part.")
+            session = append_part(session, request.stream, start, length)
+        except UploadOffsetMismatch as exc:
+            return Response(
+                {"detail": str(exc), "received_bytes": exc.expected},
+                status=status.HTTP_409_CONFLICT,
+            )
+        except UploadError as exc:
+            raise ValidationError({"detail": str(exc)})
+        return Response(self.get_serializer(session).data, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=["post"], url_path="finalize")
+    def finalize(self, request, pk=None):
+        session = self.get_object()
+        try:
+            document, job = finalize_upload(session)
+        except UploadError as exc:
+            raise ValidationError({"detail": str(exc)})
+        return Response(
+            {
+                "document": DocumentSerializer(document, context=self.get_serializer_context()).data,
+                "ingestion_job": str(job.id) if job else None,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    def destroy(self, request, *args, **kwargs):
+        """Abandonne la session ; 409 si elle a déjà produit un document."""
+        try:
+            return super().destroy(request, *args, **kwargs)
+        except UploadAlreadyCompleted as exc:
+            return Response(
+                {"detail": str(exc), "document": str(exc.document_id)},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+    def perform_destroy(self, instance):
+        abort_upload(instance)
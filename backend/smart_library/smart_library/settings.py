@@ -89,17 +89,48 @@ WSGI_APPLICATION = 'smart_library.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Connexions Postgres : pool psycopg 3 (Django >= 5.1) par défaut, sinon connexions persistantes.
+# Les threads d'ingestion (ordonnanceur, jobs d'import) passent par l'alias « ingestion » :
+# même base, pool séparé (library/db_router.py), pour ne pas priver les requêtes web.
+DB_POOL_ENABLED = os.environ.get("DB_POOL", "1") == "1"
+DB_POOL_WEB_SIZE = int(os.environ.get("DB_POOL_WEB_SIZE", "10"))
+DB_POOL_INGESTION_SIZE = int(
+    os.environ.get("DB_POOL_INGESTION_SIZE", str(max(1, (os.cpu_count() or 2) // 2) + 1))
+)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'smart_library',
-        'USER': 'postgres',
-        'PASSWORD': '123',
-        'HOST': 'localhost',
-        'PORT': '5432',
+        'NAME': os.environ.get('DB_NAME', 'smart_library'),
+        'USER': os.environ.get('DB_USER', 'postgres'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', '123'),
+        'HOST': os.environ.get('DB_HOST', 'localhost'),
+        'PORT': os.environ.get('DB_PORT', '5432'),
+        # Sans pool : connexion gardée entre les requêtes.
+        'CONN_MAX_AGE': 0 if DB_POOL_ENABLED else int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+        # Vérifie la connexion avant usage (à l'emprunt quand le pool est actif).
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
     }
 }
 
+DATABASES['ingestion'] = dict(DATABASES['default'], OPTIONS={}, TEST={'MIRROR': 'default'})
+
+if DB_POOL_ENABLED:
+    for alias, min_size, max_size in (
+        ('default', int(os.environ.get('DB_POOL_MIN_SIZE', '2')), DB_POOL_WEB_SIZE),
+        ('ingestion', 1, DB_POOL_INGESTION_SIZE),
+    ):
+        DATABASES[alias]['OPTIONS']['pool'] = {
+            'min_size': min(min_size, max_size),
+            'max_size': max_size,
+            'timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),  # attente max d'une connexion libre
+            'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', '300')),
+            'max_lifetime': float(os.environ.get('DB_POOL_MAX_LIFETIME', '1800')),
+        }
+
+DATABASE_ROUTERS = ['library.db_router.IngestionRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -141,7 +172,9 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        # Même en-tête "Token <clé>" que TokenAuthentication, sans requête SQL quand le token est en cache.
+        'users.authentication.CachedTokenAuthentication',
+        # N'est consultée qu'en l'absence de token (admin, API navigable).
         'rest_framework.authentication.SessionAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
@@ -154,16 +187,110 @@ QDRANT = {
     "URL": None,  # ex: "http://localhost:6333"
     "API_KEY": None,
     "COLLECTION": "documents",
-    "VECTOR_SIZE": 384,
+    # Un point par document (moyenne de ses chunks) pour /api/documents/<id>/similar/
+    "CENTROID_COLLECTION": "document_centroids",
     "DISTANCE": "cosine",
-    "EMBEDDING_MODEL": "sentence-transformers/all-MiniLM-L6-v2",
+    # Un vecteur nommé par modèle ; la taille est lue sur le modèle.
+    "EMBEDDING_MODELS": {
+        "minilm-l6-v2": "sentence-transformers/all-MiniLM-L6-v2",
+    },
+    # Valeurs par défaut, surchargées par la commande embedding_cutover (table Setting)
+    "ACTIVE_VECTOR": "minilm-l6-v2",
+    "CANDIDATE_VECTOR": None,  # double écriture + requêtes fantômes
+    "SHADOW_SAMPLE_RATE": 1.0,  # part des recherches rejouées sur le candidat
+    # Diversification des résultats (services/diversity.py)
+    "DIVERSITY": {
+        "ENABLED": True,
+        "CANDIDATES": 4,  # points demandés à Qdrant = limit x CANDIDATES
+        "LAMBDA": 0.7,  # 1 = pertinence seule, 0 = diversité seule
+        "PER_DOCUMENT": 3,  # passages max par document (hors recherche sur un document)
+        "MERGE_ADJACENT": True,  # fusionne les chunks consécutifs d'une même page
+    },
+    # "torch" (SentenceTransformer/PyTorch) ou "onnx" (export int8 + onnxruntime, CPU)
+    "EMBEDDING_BACKEND": os.environ.get("EMBEDDING_BACKEND", "torch"),
+    "EMBEDDING_THREADS": None,  # None = valeur par défaut du runtime
+    "EMBEDDING_WORKERS": 2,  # pool de threads des vues async (recherche, chat)
+    "ONNX_QUANTIZATION": "avx2",  # arm64, avx2, avx512, avx512_vnni
+    "ONNX_EXPORT_DIR": str((BASE_DIR / ".." / "onnx_models").resolve()),
 }
 
 DOCUMENT_PROCESSING = {
+    # Langues OCR d'un document sans langue connue ; sinon sa langue + OCR_FALLBACK_LANGUAGES
     "OCR_LANGUAGES": ["fr", "en"],
+    "OCR_FALLBACK_LANGUAGES": ["en"],
+    # Lecteurs EasyOCR gardés en mémoire, un par combinaison de langues (services/ocr.py)
+    "OCR_READER_POOL": {
+        "MAX_READERS": 3,
+        "MAX_MEMORY_MB": 1024,  # poids des réseaux chargés ; le LRU est évincé au-delà
+    },
+    # Langue déduite des premières pages quand Document.language est vide (services/language.py)
+    "LANGUAGE_DETECTION": {
+        "ENABLED": True,
+        "SAMPLE_PAGES": 3,
+        "SAMPLE_CHARS": 5000,
+        "MIN_HITS": 5,  # mots-outils reconnus au minimum
+        "MIN_MARGIN": 1.5,  # rapport entre la première et la deuxième langue
+    },
+    # Tag proposé aux documents sans tag, par similarité centroïde / nom du tag (services/tagging.py)
+    "TAG_SUGGESTION": {
+        "ENABLED": True,
+        "TEMPLATE": "{name}",
+        "MIN_SCORE": 0.3,
+        "MIN_MARGIN": 0.02,
+    },
     "EASYOCR_GPU": False,
     "CHUNK_SIZE": 200,
     "CHUNK_OVERLAP": 40,
+    # "layout" : blocs dans l'ordre de lecture, tableaux par rangées et zones par chunk
+    # (services/layout.py) ; "text" : texte brut de PyMuPDF aplati par clean_text.
+    # "text" reste le défaut tant que benchmark_extraction ne montre pas la parité de vitesse.
+    "PDF_EXTRACTION": "text",
+    # Cache du texte brut par page (évite de refaire PDF/OCR lors d'un retraitement)
+    "EXTRACTION_CACHE": True,
+    "EMBEDDING_BATCH_SIZE": 32,
+    "UPSERT_BATCH_SIZE": 256,
+    # Texte des chunks : "database" (compressé en base, payload Qdrant minimal),
+    # "payload" (Qdrant seulement) ou "both" (historique). Voir compact_chunk_storage.
+    "CHUNK_TEXT_STORAGE": "database",
+    # Quasi-doublons entre documents généraux (MinHash/LSH) : un seul point Qdrant par
+    # groupe, les résultats de recherche listent tous les documents sources (voir dedup_chunks).
+    "CHUNK_DEDUP": {
+        "ENABLED": False,
+        "THRESHOLD": 0.85,  # similarité de Jaccard estimée minimale
+        "NUM_PERM": 128,  # changer NUM_PERM/BANDS/SHINGLE_SIZE impose de relancer dedup_chunks --rebuild
+        "BANDS": 32,
+        "SHINGLE_SIZE": 5,  # mots par shingle
+    },
+    # Import en masse (POST /api/documents/bulk/)
+    "BULK_MAX_FILES": 1000,
+    "BULK_MAX_FILE_SIZE": 200 * 1024 * 1024,  # par fichier, taille décompressée pour une archive
+    "BULK_MAX_TOTAL_SIZE": 2 * 1024 * 1024 * 1024,  # cumul des fichiers acceptés d'une requête
+    "INGESTION_BATCH_DOCUMENTS": 16,  # documents vectorisés/indexés ensemble
+    # Ordonnanceur : validation > envoi interactif > import en masse > réindexation
+    # DB_POOL_INGESTION_SIZE (plus haut) doit couvrir EXTRACTION_WORKERS + INDEXING_WORKERS.
+    "INGESTION_SCHEDULER": {
+        "EXTRACTION_WORKERS": None,  # None = moitié des CPU (PDF/OCR)
+        "INDEXING_WORKERS": 1,  # l'embedding utilise déjà plusieurs threads
+        "PER_OWNER_CONCURRENCY": 2,
+    },
+    # Téléversement reprenable (PUT /api/uploads/<id>/)
+    "UPLOAD_MAX_PART_SIZE": 64 * 1024 * 1024,
+}
+
+AUTH_TOKEN_CACHE = {
+    "LOCAL_SIZE": 1024,  # tokens gardés en mémoire par processus
+    "LOCAL_TTL": 30,  # délai max de prise en compte d'une désactivation dans les autres processus
+    "SHARED": True,  # second niveau dans le cache Django
+    "SHARED_TTL": 300,
+}
+
+SETTING_CACHE = {
+    "POLL_INTERVAL": 2,  # secondes entre deux vérifications de la version des paramètres
+}
+
+CHATBOT = {
+    "HISTORY_WINDOW": 20,  # derniers messages fournis tels quels au contexte
+    "SUMMARY_MAX_CHARS": 4000,  # taille maximale du résumé glissant
 }
 
 # Default primary key field type
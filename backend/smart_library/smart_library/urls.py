@@ -20,12 +20,22 @@ from django.contrib import admin
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from chatbot import async_views as chatbot_async_views
 from chatbot.views import (
     ConversationViewSet,
     MessageReferenceViewSet,
     MessageViewSet,
 )
-from library.views import DocumentViewSet, FavoriteViewSet, TagViewSet
+from library import async_views as library_async_views
+from library.views import (
+    DocumentViewSet,
+    FavoriteViewSet,
+    IngestionJobViewSet,
+    LibraryStatsView,
+    MyLibraryView,
+    TagViewSet,
+    UploadSessionViewSet,
+)
 from users.views import LoginView, LogoutView, UserViewSet
 
 router = DefaultRouter()
@@ -33,6 +43,8 @@ router.register(r'users', UserViewSet, basename='user')
 router.register(r'tags', TagViewSet, basename='tag')
 router.register(r'documents', DocumentViewSet, basename='document')
 router.register(r'favorites', FavoriteViewSet, basename='favorite')
+router.register(r'ingestion-jobs', IngestionJobViewSet, basename='ingestion-job')
+router.register(r'uploads', UploadSessionViewSet, basename='upload')
 router.register(r'conversations', ConversationViewSet, basename='conversation')
 router.register(r'messages', MessageViewSet, basename='message')
 router.register(r'message-references', MessageReferenceViewSet, basename='message-reference')
@@ -47,6 +59,14 @@ urlpatterns = [
         DocumentViewSet.as_view({'get': 'chunks'}),
         name='document-chunks',
     ),
+    path('api/library/stats/', LibraryStatsView.as_view(), name='library-stats'),
+    path('api/me/library/', MyLibraryView.as_view(), name='my-library'),
+    path('api/search/', library_async_views.search, name='api-search'),
+    path(
+        'api/conversations/<uuid:pk>/retrieve/',
+        chatbot_async_views.retrieve,
+        name='conversation-retrieve',
+    ),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,172 @@
+"""Authentification par token avec cache à deux niveaux.
+
+``TokenAuthentication`` de DRF lit ``authtoken_token`` joint à ``users`` à chaque requête.
+``CachedTokenAuthentication`` garde l'utilisateur associé à un token dans un LRU du
+processus (TTL court) puis, en option, dans le cache Django partagé (TTL plus long) :
+la base n'est interrogée qu'en cas d'absence dans les deux niveaux. Seuls les champs de
+``CACHED_USER_FIELDS`` sont mis en cache (jamais le hash du mot de passe) ; l'utilisateur
+est reconstruit avec les autres champs différés.
+
+La déconnexion, la suppression d'un token et toute modification d'un utilisateur
+(désactivation, changement de rôle) invalident les entrées concernées. Le LRU des
+autres processus n'est pas joignable : il expire au bout de ``LOCAL_TTL`` secondes.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+DEFAULT_TOKEN_CACHE = {
+    "LOCAL_SIZE": 1024,  # tokens gardés en mémoire par processus
+    "LOCAL_TTL": 30,  # secondes ; borne le délai de prise en compte dans les autres processus
+    "SHARED": True,  # second niveau dans le cache Django (Redis/Memcached en production)
+    "SHARED_TTL": 300,
+}
+
+
+# Champs nécessaires aux permissions et à ``/api/me`` ; les autres restent différés.
+CACHED_USER_FIELDS = (
+    "id",
+    "email",
+    "name",
+    "role",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+    "last_login",
+    "created_at",
+)
+
+
+def _config(name: str):
+    return getattr(settings, "AUTH_TOKEN_CACHE", {}).get(name, DEFAULT_TOKEN_CACHE[name])
+
+
+def _shared_key(key: str) -> str:
+    # Le token lui-même ne sort pas du processus : seule son empreinte sert de clé.
+    return "auth:token:" + hashlib.sha256(key.encode()).hexdigest()
+
+
+def _user_entry(user) -> dict:
+    return {name: getattr(user, name) for name in CACHED_USER_FIELDS}
+
+
+def _user_from_entry(entry: dict):
+    """Utilisateur chargé comme par ``.only(*CACHED_USER_FIELDS)``, sans requête."""
+    model = get_user_model()
+    names = [field.attname for field in model._meta.concrete_fields if field.attname in entry]
+    return model.from_db(router.db_for_read(model), names, [entry[name] for name in names])
+
+
+class _LocalTokenCache:
+    """LRU borné et thread-safe ``token -> (champs de l'utilisateur, expiration)``."""
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, Tuple[object, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            fields, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return fields
+
+    def set(self, key: str, fields: dict) -> None:
+        size = _config("LOCAL_SIZE")
+        if size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (fields, time.monotonic() + _config("LOCAL_TTL"))
+            self._entries.move_to_end(key)
+            while len(self._entries) > size:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+local_token_cache = _LocalTokenCache()
+
+
+def invalidate_token(key: Optional[str]) -> None:
+    """Retire un token des deux niveaux de cache."""
+    if not key:
+        return
+    local_token_cache.discard(key)
+    if _config("SHARED"):
+        cache.delete(_shared_key(key))
+
+
+def invalidate_user(user) -> None:
+    """Retire du cache les tokens d'un utilisateur (désactivation, changement de rôle...)."""
+    for key in Token.objects.filter(user_id=user.pk).values_list("key", flat=True):
+        invalidate_token(key)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """``TokenAuthentication`` servie depuis le cache, même format d'en-tête ``Token <clé>``."""
+
+    def authenticate_credentials(self, key):
+        fields = local_token_cache.get(key)
+        if fields is None and _config("SHARED"):
+            fields = cache.get(_shared_key(key))
+            if fields is not None:
+                local_token_cache.set(key, fields)
+        if fields is None:
+            user, token = super().authenticate_credentials(key)
+            fields = _user_entry(user)
+            local_token_cache.set(key, fields)
+            if _config("SHARED"):
+                cache.set(_shared_key(key), fields, _config("SHARED_TTL"))
+            return user, token
+        user = _user_from_entry(fields)
+        if not user.is_active:
+            raise AuthenticationFailed("User inactive or deleted.")
+        return user, self._cached_token(key, user)
+
+    def _cached_token(self, key, user) -> Token:
+        """``request.auth`` reste un ``Token`` (clé et utilisateur), sans relire la table."""
+        token = self.get_model()(key=key, user=user)
+        token._state.adding = False
+        return token
+
+
+async def aget_request_user(request, allow_session: bool = True):
+    """Authentifie une requête pour les vues async (token DRF puis session Django).
+
+    Retourne l'utilisateur actif ou ``None`` si la requête n'est pas authentifiée.
+    Les vues exemptées de CSRF doivent passer ``allow_session=False``.
+    """
+    try:
+        result = await sync_to_async(CachedTokenAuthentication().authenticate)(request)
+    except AuthenticationFailed:
+        return None
+    if result is not None:
+        return result[0]
+    if not allow_session:
+        return None
+    user = await request.auser()
+    if user.is_authenticated and user.is_active:
+        return user
+    return None
@@ -0,0 +1,54 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from library.views import TagViewSet
+from users.authentication import CachedTokenAuthentication, local_token_cache
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure le débit (requêtes/s) et le nombre de requêtes SQL de GET /api/tags/ "
+        "avec TokenAuthentication puis CachedTokenAuthentication."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--email", help="Utilisateur dont le token est utilisé (défaut : le premier actif).")
+
+    def _measure(self, view, token, count):
+        factory = APIRequestFactory()
+        view(factory.get("/api/tags/", HTTP_AUTHORIZATION=f"Token {token}"))  # warm-up
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            for _ in range(count):
+                response = view(factory.get("/api/tags/", HTTP_AUTHORIZATION=f"Token {token}"))
+                if response.status_code != 200:
+                    raise CommandError(f"Unexpected status {response.status_code}.")
+            elapsed = time.perf_counter() - start
+        return count / elapsed, len(queries) / count
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.filter(is_active=True)
+        if options["email"]:
+            users = users.filter(email=options["email"])
+        user = users.first()
+        if user is None:
+            raise CommandError("No active user to authenticate with.")
+        token, _ = Token.objects.get_or_create(user=user)
+        local_token_cache.clear()
+
+        results = {}
+        for label, authentication in (("token", TokenAuthentication), ("cached", CachedTokenAuthentication)):
+            view = TagViewSet.as_view({"get": "list"}, authentication_classes=[authentication])
+            results[label] = self._measure(view, token.key, options["requests"])
+            rate, queries = results[label]
+            self.stdout.write(f"{label:>7}: {rate:8.0f} req/s, {queries:.2f} SQL queries per request")
+        speedup = results["cached"][0] / results["token"][0]
+        self.stdout.write(self.style.SUCCESS(f"Cached authentication is {speedup:.2f}x faster."))
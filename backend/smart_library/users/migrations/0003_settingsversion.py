@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:18
+
+from django.db import migrations, models
+
+
+def create_version_row(apps, schema_editor):
+    SettingsVersion = apps.get_model('users', 'SettingsVersion')
+    SettingsVersion.objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_alter_user_managers_alter_user_password'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SettingsVersion',
+            fields=[
+                ('id', models.PositiveSmallIntegerField(default=1, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=0, verbose_name='Version')),
+            ],
+            options={
+                'verbose_name': 'Version des paramètres',
+                'verbose_name_plural': 'Versions des paramètres',
+                'db_table': 'settings_version',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.RunPython(create_version_row, migrations.RunPython.noop),
+    ]
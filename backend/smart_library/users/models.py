@@ -89,11 +89,10 @@ class Setting(models.Model):
     
     @classmethod
     def get_value(cls, key, default=None):
-        """Récupère la valeur d'un paramètre par sa clé"""
-        try:
-            return cls.objects.get(key=key).value
-        except cls.DoesNotExist:
-            return default
+        """Récupère la valeur d'un paramètre par sa clé (depuis le cache du processus)"""
+        from .setting_cache import setting_cache
+
+        return setting_cache.get(key, default)
     
     @classmethod
     def set_value(cls, key, value):
@@ -103,3 +102,23 @@ class Setting(models.Model):
             defaults={'value': value}
         )
         return obj
+
+
+class SettingsVersion(models.Model):
+    """Ligne unique incrémentée à chaque modification de ``Setting``.
+
+    Chaque processus compare périodiquement ce numéro à celui de son cache
+    (voir ``users.setting_cache``) pour recharger les paramètres modifiés.
+    """
+
+    id = models.PositiveSmallIntegerField(primary_key=True, default=1)
+    version = models.BigIntegerField(default=0, verbose_name="Version")
+
+    class Meta:
+        db_table = 'settings_version'
+        verbose_name = "Version des paramètres"
+        verbose_name_plural = "Versions des paramètres"
+        ordering = ['id']
+
+    def __str__(self):
+        return f"v{self.version}"
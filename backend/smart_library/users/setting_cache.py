@@ -0,0 +1,66 @@
+"""Cache des paramètres ``Setting`` par processus.
+
+Toutes les lignes sont chargées d'un coup dans un dictionnaire : une lecture est une
+simple recherche de clé. Toutes les ``POLL_INTERVAL`` secondes au plus, une lecture
+compare le numéro de ``SettingsVersion`` (une requête par clé primaire) à celui du
+cache et recharge la table s'il a changé. Une modification faite dans le processus
+est visible immédiatement ; dans les autres, au bout de ``POLL_INTERVAL`` secondes.
+"""
+import threading
+import time
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from .models import Setting, SettingsVersion
+
+
+def _poll_interval() -> float:
+    return getattr(settings, "SETTING_CACHE", {}).get("POLL_INTERVAL", 2)
+
+
+def bump_version() -> None:
+    """Signale une modification de ``Setting`` à tous les processus."""
+    if not SettingsVersion.objects.filter(pk=1).update(version=F("version") + 1):
+        SettingsVersion.objects.get_or_create(pk=1, defaults={"version": 1})
+    transaction.on_commit(setting_cache.invalidate)
+
+
+class SettingCache:
+    def __init__(self):
+        self._values: Optional[Dict[str, str]] = None
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> Dict[str, str]:
+        values = self._values
+        if values is not None and time.monotonic() - self._checked_at < _poll_interval():
+            return values
+        with self._lock:
+            # La version est lue avant les lignes : au pire on recharge une fois de trop.
+            version = SettingsVersion.objects.filter(pk=1).values_list("version", flat=True).first() or 0
+            if self._values is None or version != self._version:
+                self._values = dict(Setting.objects.values_list("key", "value"))
+                self._version = version
+            self._checked_at = time.monotonic()
+            return self._values
+
+    def get(self, key: str, default=None):
+        return self._refresh().get(key, default)
+
+    def all(self) -> Dict[str, str]:
+        return dict(self._refresh())
+
+    @property
+    def version(self) -> Optional[int]:
+        return self._version
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._values = None
+
+
+setting_cache = SettingCache()
@@ -0,0 +1,35 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_token, invalidate_user
+from .models import Setting
+from .setting_cache import bump_version
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_cached_user(sender, instance, created, raw=False, using=None, **kwargs):
+    """Un utilisateur désactivé ou modifié ne doit plus être servi depuis le cache.
+
+    L'invalidation attend le commit : sinon une requête concurrente pourrait remettre
+    en cache l'état encore visible avant la fin de la transaction.
+    """
+    if raw or created:
+        return
+    transaction.on_commit(lambda: invalidate_user(instance), using=using)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, using=None, **kwargs):
+    key = instance.key
+    transaction.on_commit(lambda: invalidate_token(key), using=using)
+
+
+@receiver(post_save, sender=Setting)
+@receiver(post_delete, sender=Setting)
+def notify_setting_change(sender, raw=False, **kwargs):
+    if raw:
+        return
+    bump_version()
@@ -1,3 +1,80 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIRequestFactory
 
-# Create your tests here.
+from users.authentication import CachedTokenAuthentication, _shared_key, local_token_cache
+from users.models import Setting, User
+from users.setting_cache import SettingCache, setting_cache
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        local_token_cache.clear()
+        cache.clear()
+        self.user = User.objects.create_user(email="auth@example.com", password="x", name="Auth")
+        self.token = Token.objects.create(user=self.user)
+
+    def authenticate(self):
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        return CachedTokenAuthentication().authenticate(request)
+
+    def test_cache_hit_returns_the_same_types_as_a_miss(self):
+        user, auth = self.authenticate()
+        with self.assertNumQueries(0):
+            cached_user, cached_auth = self.authenticate()
+        self.assertEqual(cached_user.pk, user.pk)
+        for token in (auth, cached_auth):
+            self.assertIsInstance(token, Token)
+            self.assertEqual(token.key, self.token.key)
+            self.assertEqual(token.user_id, self.user.pk)
+
+    def test_shared_cache_holds_no_password_hash(self):
+        self.authenticate()
+        entry = cache.get(_shared_key(self.token.key))
+        self.assertNotIn("password", entry)
+        self.assertEqual(entry["id"], self.user.pk)
+        cached_user, _ = self.authenticate()
+        self.assertIn("password", cached_user.get_deferred_fields())
+        self.assertEqual((cached_user.email, cached_user.role), (self.user.email, self.user.role))
+
+    def test_deactivated_user_is_not_served_from_the_cache(self):
+        self.authenticate()
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_deleted_token_is_rejected(self):
+        self.authenticate()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+
+class SettingCacheTests(TestCase):
+    def setUp(self):
+        setting_cache.invalidate()
+        self.addCleanup(setting_cache.invalidate)
+
+    def test_change_is_visible_at_once_in_the_same_process(self):
+        self.assertIsNone(setting_cache.get("theme"))
+        with self.captureOnCommitCallbacks(execute=True):
+            Setting.objects.create(key="theme", value="dark")
+        self.assertEqual(setting_cache.get("theme"), "dark")
+        with self.captureOnCommitCallbacks(execute=True):
+            Setting.objects.filter(key="theme").get().delete()
+        self.assertIsNone(setting_cache.get("theme"))
+
+    def test_other_processes_reload_after_the_poll_interval(self):
+        Setting.objects.create(key="theme", value="dark")
+        other = SettingCache()  # cache d'un autre processus : aucune invalidation locale
+        self.assertEqual(other.get("theme"), "dark")
+        Setting.objects.filter(key="theme").get().delete()
+        with override_settings(SETTING_CACHE={"POLL_INTERVAL": 3600}):
+            self.assertEqual(other.get("theme"), "dark")
+        with override_settings(SETTING_CACHE={"POLL_INTERVAL": 0}):
+            self.assertIsNone(other.get("theme"))
@@ -4,6 +4,7 @@ from rest_framework.authtoken.models import Token
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .authentication import invalidate_token
 from .serializers import LoginSerializer, UserSerializer
 
 
@@ -57,5 +58,6 @@ class LogoutView(APIView):
     def post(self, request):
         token = getattr(request.user, "auth_token", None)
         if token:
+            invalidate_token(token.key)
             token.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
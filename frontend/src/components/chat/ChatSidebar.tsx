@@ -12,6 +12,9 @@ interface ChatSidebarProps {
   selectedConversationId: string | null;
   onSelectConversation: (conversationId: string) => void;
   onNewConversation: () => void;
+  hasMore?: boolean;
+  isLoadingMore?: boolean;
+  onLoadMore?: () => void;
 }
 
 const ChatSidebar: React.FC<ChatSidebarProps> = ({
@@ -19,6 +22,9 @@ const ChatSidebar: React.FC<ChatSidebarProps> = ({
   selectedConversationId,
   onSelectConversation,
   onNewConversation,
+  hasMore = false,
+  isLoadingMore = false,
+  onLoadMore,
 }) => {
   const { user, logout } = useAuth();
 
@@ -68,6 +74,17 @@ const ChatSidebar: React.FC<ChatSidebarProps> = ({
           ) : (
             <p className="text-xs text-muted-foreground px-3">Commencez une nouvelle discussion.</p>
           )}
+          {hasMore && onLoadMore && (
+            <Button
+              variant="ghost"
+              size="sm"
+              className="w-full"
+              onClick={onLoadMore}
+              disabled={isLoadingMore}
+            >
+              Charger plus
+            </Button>
+          )}
         </div>
       </ScrollArea>
 
@@ -0,0 +1,48 @@
+import * as React from "react";
+
+import { CursorPage, fetchNextPage } from "@/lib/api";
+
+// Cursor-paginated list read one page at a time: `reload` fetches the first page again
+// (filters changed, item added or removed) and resolves to it, or to null when the list is
+// disabled or the response was outdated; `loadMore` follows `next`. Errors are rethrown
+// so the page can show its own toast. Responses to an outdated request are ignored.
+export function useCursorList<T>(
+  loadFirstPage: (() => Promise<CursorPage<T>>) | null,
+  token: string | null,
+) {
+  const [items, setItems] = React.useState<T[]>([]);
+  const [next, setNext] = React.useState<string | null>(null);
+  const [isLoading, setIsLoading] = React.useState(false);
+  const generation = React.useRef(0);
+
+  const reload = React.useCallback(async (): Promise<CursorPage<T> | null> => {
+    if (!loadFirstPage) return null;
+    const current = ++generation.current;
+    setIsLoading(true);
+    try {
+      const page = await loadFirstPage();
+      if (current !== generation.current) return null;
+      setItems(page.results);
+      setNext(page.next);
+      return page;
+    } finally {
+      if (current === generation.current) setIsLoading(false);
+    }
+  }, [loadFirstPage]);
+
+  const loadMore = React.useCallback(async () => {
+    if (!next) return;
+    const current = generation.current;
+    setIsLoading(true);
+    try {
+      const page = await fetchNextPage<T>(next, token);
+      if (current !== generation.current) return;
+      setItems((previous) => [...previous, ...page.results]);
+      setNext(page.next);
+    } finally {
+      if (current === generation.current) setIsLoading(false);
+    }
+  }, [next, token]);
+
+  return { items, hasMore: next !== null, isLoading, reload, loadMore };
+}
@@ -0,0 +1,13 @@
+import * as React from "react";
+
+// Value that only changes once `value` has been stable for `delay` ms (search inputs).
+export function useDebouncedValue<T>(value: T, delay = 300) {
+  const [debounced, setDebounced] = React.useState(value);
+
+  React.useEffect(() => {
+    const timer = window.setTimeout(() => setDebounced(value), delay);
+    return () => window.clearTimeout(timer);
+  }, [value, delay]);
+
+  return debounced;
+}
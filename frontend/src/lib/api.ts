@@ -28,7 +28,8 @@ async function request<T>(endpoint: string, options: RequestOptions = {}): Promi
     delete (config.headers as Record<string, string>)['Content-Type'];
   }
 
-  const response = await fetch(`${API_BASE_URL}${endpoint}`, config);
+  const url = /^https?:\/\//.test(endpoint) ? endpoint : `${API_BASE_URL}${endpoint}`;
+  const response = await fetch(url, config);
 
   if (!response.ok) {
     const errorText = await response.text();
@@ -42,6 +43,41 @@ async function request<T>(endpoint: string, options: RequestOptions = {}): Promi
   return response.json() as Promise<T>;
 }
 
+export interface CursorPage<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
+
+export const LIST_PAGE_SIZE = 25;
+
+export interface ListQuery {
+  params?: Record<string, string | undefined>;
+  fields?: readonly string[];
+  pageSize?: number;
+}
+
+// List endpoints are cursor-paginated: load one page, then follow `next` on demand
+// (see fetchNextPage and useCursorList). `fields` trims each item to what the view shows.
+function listEndpoint(endpoint: string, { params = {}, fields, pageSize = LIST_PAGE_SIZE }: ListQuery) {
+  const search = new URLSearchParams();
+  Object.entries(params).forEach(([key, value]) => {
+    if (value) search.set(key, value);
+  });
+  if (fields?.length) search.set('fields', fields.join(','));
+  search.set('page_size', String(pageSize));
+  return `${endpoint}?${search.toString()}`;
+}
+
+async function requestPage<T>(endpoint: string, token: string | null, query: ListQuery = {}) {
+  return request<CursorPage<T>>(listEndpoint(endpoint, query), { method: 'GET', token });
+}
+
+// `next` is an absolute URL returned by the API and already carries the filters.
+export async function fetchNextPage<T>(next: string, token: string | null) {
+  return request<CursorPage<T>>(next, { method: 'GET', token });
+}
+
 export interface LoginResponse {
   token: string;
   user: {
@@ -63,7 +99,30 @@ export interface ApiDocument {
   language: string;
   status: 'pending_meta' | 'uploaded' | 'processed' | 'indexed';
   date_added: string;
-  path: string | null;
+  path?: string | null;
+}
+
+// Fields read by the library, approval and search lists (no path or processing stats).
+export const DOCUMENT_LIST_FIELDS = [
+  'id',
+  'title',
+  'filename',
+  'file',
+  'tag',
+  'owner',
+  'source',
+  'language',
+  'status',
+  'date_added',
+] as const;
+
+export interface DocumentFilters {
+  source?: 'personal' | 'general';
+  owner?: 'me';
+  visibleTo?: 'me';
+  status?: ApiDocument['status'];
+  excludeStatus?: ApiDocument['status'];
+  q?: string;
 }
 
 export interface ApiTag {
@@ -116,10 +175,17 @@ export async function loginRequest(email: string, password: string) {
   });
 }
 
-export async function fetchDocuments(token: string | null) {
-  return request<ApiDocument[]>('/documents/', {
-    method: 'GET',
-    token,
+export async function fetchDocuments(token: string | null, filters: DocumentFilters = {}) {
+  return requestPage<ApiDocument>('/documents/', token, {
+    params: {
+      source: filters.source,
+      owner: filters.owner,
+      visible_to: filters.visibleTo,
+      status: filters.status,
+      exclude_status: filters.excludeStatus,
+      q: filters.q?.trim(),
+    },
+    fields: DOCUMENT_LIST_FIELDS,
   });
 }
 
@@ -189,9 +255,8 @@ export async function fetchTags(token: string | null) {
 }
 
 export async function fetchConversations(token: string | null) {
-  return request<ApiConversation[]>('/conversations/', {
-    method: 'GET',
-    token,
+  return requestPage<ApiConversation>('/conversations/', token, {
+    fields: ['id', 'title', 'mode', 'is_active', 'started_at', 'last_activity'],
   });
 }
 
@@ -210,8 +275,22 @@ export async function createConversation(
   });
 }
 
-export async function fetchMessages(token: string | null) {
-  return request<ApiMessage[]>('/messages/', {
+export interface ConversationHistory {
+  summary: string;
+  summarized_count: number;
+  messages: ApiMessage[];
+  next_before: string | null;
+}
+
+// Latest messages first; pass `before` (the previous `next_before`) to go further back.
+export async function fetchConversationHistory(
+  conversationId: string,
+  token: string | null,
+  before?: string | null,
+) {
+  const search = new URLSearchParams({ limit: String(LIST_PAGE_SIZE) });
+  if (before) search.set('before', before);
+  return request<ConversationHistory>(`/conversations/${conversationId}/history/?${search.toString()}`, {
     method: 'GET',
     token,
   });
@@ -228,10 +307,10 @@ export async function sendMessage(
   });
 }
 
-export async function fetchPendingDocuments(token: string | null) {
-  return request<ApiDocument[]>('/documents/awaiting-approval/', {
-    method: 'GET',
-    token,
+export async function fetchPendingDocuments(token: string | null, q?: string) {
+  return requestPage<ApiDocument>('/documents/awaiting-approval/', token, {
+    params: { q: q?.trim() },
+    fields: DOCUMENT_LIST_FIELDS,
   });
 }
 
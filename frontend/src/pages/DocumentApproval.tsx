@@ -1,4 +1,4 @@
-import React, { useEffect, useMemo, useState } from 'react';
+import React, { useCallback, useEffect, useMemo, useState } from 'react';
 import { Button } from '@/components/ui/button';
 import { Card, CardContent, CardTitle } from '@/components/ui/card';
 import { Input } from '@/components/ui/input';
@@ -12,9 +12,12 @@ import {
 } from '@/components/ui/table';
 import { useAuth } from '@/contexts/AuthContext';
 import { useToast } from '@/hooks/use-toast';
+import { useCursorList } from '@/hooks/use-cursor-list';
+import { useDebouncedValue } from '@/hooks/use-debounced-value';
 import { Download, Eye, Search, Trash2, Check } from 'lucide-react';
 import { Document } from '@/types';
 import {
+  ApiDocument,
   approveDocument,
   deleteDocument,
   fetchPendingDocuments,
@@ -35,36 +38,46 @@ const formatStatus = (status: Document['status']) => {
   }
 };
 
-const PAGE_SIZE = 10;
+const mapDocument = (doc: ApiDocument): Document => ({
+  id: doc.id,
+  title: doc.title,
+  filename: doc.filename,
+  file: doc.file,
+  language: doc.language || '',
+  source: doc.source,
+  status: doc.status,
+  dateAdded: doc.date_added,
+  owner: doc.owner,
+  tagId: doc.tag,
+  tagName: undefined,
+  path: doc.path ?? undefined,
+});
 
 const DocumentApproval: React.FC = () => {
   const { user, token } = useAuth();
   const { toast } = useToast();
-  const [documents, setDocuments] = useState<Document[]>([]);
   const [searchQuery, setSearchQuery] = useState('');
   const [isLoading, setIsLoading] = useState(false);
-  const [currentPage, setCurrentPage] = useState(1);
 
-  const loadDocuments = async () => {
+  // The queue is filtered (q = title) and paged by the API; pages are loaded on demand.
+  const debouncedQuery = useDebouncedValue(searchQuery);
+  const loadFirstPage = useCallback(
+    () => fetchPendingDocuments(token, debouncedQuery),
+    [token, debouncedQuery],
+  );
+  const {
+    items,
+    hasMore,
+    isLoading: isLoadingPage,
+    reload,
+    loadMore,
+  } = useCursorList(token ? loadFirstPage : null, token);
+
+  const loadDocuments = useCallback(async () => {
     if (!token) return;
     setIsLoading(true);
     try {
-      const data = await fetchPendingDocuments(token);
-      const mapped: Document[] = data.map((doc) => ({
-        id: doc.id,
-        title: doc.title,
-        filename: doc.filename,
-        file: doc.file,
-        language: doc.language || '',
-        source: doc.source,
-        status: doc.status,
-        dateAdded: doc.date_added,
-        owner: doc.owner,
-        tagId: doc.tag,
-        tagName: undefined,
-        path: doc.path ?? undefined,
-      }));
-      setDocuments(mapped);
+      await reload();
     } catch (error) {
       console.error(error);
       toast({
@@ -75,33 +88,26 @@ const DocumentApproval: React.FC = () => {
     } finally {
       setIsLoading(false);
     }
+  }, [token, reload, toast]);
+
+  const handleLoadMore = async () => {
+    try {
+      await loadMore();
+    } catch (error) {
+      console.error(error);
+      toast({
+        title: 'Chargement impossible',
+        description: 'La page suivante na pas pu etre chargee.',
+        variant: 'destructive',
+      });
+    }
   };
 
   useEffect(() => {
     loadDocuments();
-  }, []); // eslint-disable-line react-hooks/exhaustive-deps
-
-  useEffect(() => {
-    setCurrentPage(1);
-  }, [searchQuery, documents.length]);
-
-  const filteredDocuments = useMemo(() => {
-    const query = searchQuery.trim().toLowerCase();
-    if (!query) return documents;
-    return documents.filter((doc) => {
-      return (
-        doc.title.toLowerCase().includes(query) ||
-        (doc.filename?.toLowerCase() ?? '').includes(query) ||
-        (doc.language?.toLowerCase() ?? '').includes(query)
-      );
-    });
-  }, [documents, searchQuery]);
+  }, [loadDocuments]);
 
-  const totalPages = Math.max(1, Math.ceil(filteredDocuments.length / PAGE_SIZE));
-  const paginatedDocuments = useMemo(() => {
-    const start = (currentPage - 1) * PAGE_SIZE;
-    return filteredDocuments.slice(start, start + PAGE_SIZE);
-  }, [filteredDocuments, currentPage]);
+  const documents = useMemo(() => items.map(mapDocument), [items]);
 
   const handleApprove = async (documentId: string) => {
     if (!token) return;
@@ -186,7 +192,7 @@ const DocumentApproval: React.FC = () => {
         <div className="relative flex-1">
           <Search className="absolute left-3 top-1/2 -translate-y-1/2 w-5 h-5 text-muted-foreground" />
           <Input
-            placeholder="Rechercher par titre, nom de fichier ou langue..."
+            placeholder="Rechercher par titre..."
             value={searchQuery}
             onChange={(event) => setSearchQuery(event.target.value)}
             className="pl-10"
@@ -194,7 +200,7 @@ const DocumentApproval: React.FC = () => {
         </div>
       </div>
 
-      {filteredDocuments.length > 0 ? (
+      {documents.length > 0 ? (
       <Card>
         <div className="overflow-x-auto">
         <Table>
@@ -209,7 +215,7 @@ const DocumentApproval: React.FC = () => {
             </TableRow>
           </TableHeader>
           <TableBody>
-            {paginatedDocuments.map((doc) => (
+            {documents.map((doc) => (
               <TableRow key={doc.id}>
                 <TableCell className="font-medium">{doc.title}</TableCell>
                 <TableCell>{doc.language || 'N/A'}</TableCell>
@@ -252,26 +258,15 @@ const DocumentApproval: React.FC = () => {
 
         <div className="flex flex-col gap-2 md:flex-row md:items-center md:justify-between p-4 border-t border-border">
           <p className="text-sm text-muted-foreground">
-            Page {currentPage} sur {totalPages} - {filteredDocuments.length} document(s)
+            {documents.length} document(s) affiche(s)
           </p>
-          <div className="flex gap-2 justify-end">
-            <Button
-              variant="outline"
-              size="sm"
-              onClick={() => setCurrentPage((prev) => Math.max(1, prev - 1))}
-              disabled={currentPage === 1}
-            >
-              Precedent
-            </Button>
-            <Button
-              variant="outline"
-              size="sm"
-              onClick={() => setCurrentPage((prev) => Math.min(totalPages, prev + 1))}
-              disabled={currentPage === totalPages}
-            >
-              Suivant
-            </Button>
-          </div>
+          {hasMore && (
+            <div className="flex gap-2 justify-end">
+              <Button variant="outline" size="sm" onClick={handleLoadMore} disabled={isLoadingPage}>
+                Charger plus
+              </Button>
+            </div>
+          )}
         </div>
       </Card>
     ) : (
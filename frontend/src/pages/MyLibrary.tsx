@@ -27,6 +27,8 @@ import {
   TableRow,
 } from '@/components/ui/table';
 import { useToast } from '@/hooks/use-toast';
+import { useCursorList } from '@/hooks/use-cursor-list';
+import { useDebouncedValue } from '@/hooks/use-debounced-value';
 import { useAuth } from '@/contexts/AuthContext';
 import { Document } from '@/types';
 import {
@@ -54,18 +56,15 @@ const formatStatus = (status: Document['status']) => {
   }
 };
 
-const PAGE_SIZE = 10;
 const NONE_TAG_VALUE = '__none__';
 
 const MyLibrary: React.FC = () => {
   const { user, token } = useAuth();
   const { toast } = useToast();
 
-  const [documents, setDocuments] = useState<Document[]>([]);
   const [searchQuery, setSearchQuery] = useState('');
   const [isLoading, setIsLoading] = useState(false);
   const [tagMap, setTagMap] = useState<Record<number, string>>({});
-  const [currentPage, setCurrentPage] = useState(1);
   const fileInputRef = useRef<HTMLInputElement | null>(null);
   const [isEditDialogOpen, setIsEditDialogOpen] = useState(false);
   const [editingDocument, setEditingDocument] = useState<Document | null>(null);
@@ -104,12 +103,25 @@ const MyLibrary: React.FC = () => {
     }
   }, [token]);
 
+  // Filtering happens server side: the list only holds the pages loaded so far.
+  const debouncedQuery = useDebouncedValue(searchQuery);
+  const loadFirstPage = useCallback(
+    () => fetchDocuments(token, { source: 'personal', owner: 'me', q: debouncedQuery }),
+    [token, debouncedQuery],
+  );
+  const {
+    items,
+    hasMore,
+    isLoading: isLoadingPage,
+    reload,
+    loadMore,
+  } = useCursorList(token ? loadFirstPage : null, token);
+
   const loadDocuments = useCallback(async () => {
     if (!token) return;
     setIsLoading(true);
     try {
-      const data = await fetchDocuments(token);
-      setDocuments(data.map(mapDocument));
+      await reload();
     } catch (error) {
       console.error(error);
       toast({
@@ -120,7 +132,20 @@ const MyLibrary: React.FC = () => {
     } finally {
       setIsLoading(false);
     }
-  }, [token, toast, mapDocument]);
+  }, [token, reload, toast]);
+
+  const handleLoadMore = async () => {
+    try {
+      await loadMore();
+    } catch (error) {
+      console.error(error);
+      toast({
+        title: 'Echec du chargement',
+        description: 'La page suivante na pas pu etre chargee.',
+        variant: 'destructive',
+      });
+    }
+  };
 
   useEffect(() => {
     loadTags();
@@ -130,48 +155,7 @@ const MyLibrary: React.FC = () => {
     loadDocuments();
   }, [loadDocuments]);
 
-  useEffect(() => {
-    setDocuments((prev) =>
-      prev.map((doc) => ({
-        ...doc,
-        tagName: doc.tagId ? tagMap[doc.tagId] ?? doc.tagName : doc.tagName,
-      })),
-    );
-  }, [tagMap]);
-
-  const personalDocuments = useMemo(() => {
-    if (!user) return [];
-    return documents.filter((doc) => doc.source === 'personal' && doc.owner === user.id);
-  }, [documents, user]);
-
-  const filteredDocuments = useMemo(() => {
-    const query = searchQuery.trim().toLowerCase();
-    if (!query) return personalDocuments;
-
-    return personalDocuments.filter((doc) => {
-      const tag = doc.tagName ?? (doc.tagId !== null ? `Tag ${doc.tagId}` : '');
-      return (
-        doc.title.toLowerCase().includes(query) ||
-        (doc.filename?.toLowerCase() ?? '').includes(query) ||
-        (doc.language?.toLowerCase() ?? '').includes(query) ||
-        tag.toLowerCase().includes(query)
-      );
-    });
-  }, [personalDocuments, searchQuery]);
-
-  useEffect(() => {
-    setCurrentPage(1);
-  }, [searchQuery, filteredDocuments.length]);
-
-  useEffect(() => {
-    setCurrentPage(1);
-  }, [documents.length]);
-
-  const totalPages = Math.max(1, Math.ceil(filteredDocuments.length / PAGE_SIZE));
-  const paginatedDocuments = useMemo(() => {
-    const start = (currentPage - 1) * PAGE_SIZE;
-    return filteredDocuments.slice(start, start + PAGE_SIZE);
-  }, [filteredDocuments, currentPage]);
+  const documents = useMemo(() => items.map(mapDocument), [items, mapDocument]);
 
   const handleFileUpload = async (event: React.ChangeEvent<HTMLInputElement>) => {
     if (!token || !event.target.files) return;
@@ -353,7 +337,7 @@ const MyLibrary: React.FC = () => {
         </div>
       </div>
 
-      {filteredDocuments.length > 0 ? (
+      {documents.length > 0 ? (
         <Card>
           <div className="hidden md:block">
             <div className="overflow-x-auto">
@@ -370,7 +354,7 @@ const MyLibrary: React.FC = () => {
                   </TableRow>
                 </TableHeader>
                 <TableBody>
-                  {paginatedDocuments.map((doc) => (
+                  {documents.map((doc) => (
                     <TableRow key={doc.id}>
                       <TableCell className="font-medium">{doc.title}</TableCell>
                       <TableCell>{doc.language || 'N/A'}</TableCell>
@@ -420,7 +404,7 @@ const MyLibrary: React.FC = () => {
           </div>
 
           <div className="md:hidden space-y-3 p-4">
-            {paginatedDocuments.map((doc) => (
+            {documents.map((doc) => (
               <div
                 key={doc.id}
                 className="rounded-xl border border-border bg-card p-4 shadow-sm"
@@ -486,26 +470,15 @@ const MyLibrary: React.FC = () => {
 
           <div className="flex flex-col gap-2 md:flex-row md:items-center md:justify-between p-4 border-t border-border">
             <p className="text-sm text-muted-foreground">
-              Page {currentPage} sur {totalPages} - {filteredDocuments.length} document(s)
+              {documents.length} document(s) affiche(s)
             </p>
-            <div className="flex gap-2 justify-end">
-              <Button
-                variant="outline"
-                size="sm"
-                onClick={() => setCurrentPage((prev) => Math.max(1, prev - 1))}
-                disabled={currentPage === 1}
-              >
-                Precedent
-              </Button>
-              <Button
-                variant="outline"
-                size="sm"
-                onClick={() => setCurrentPage((prev) => Math.min(totalPages, prev + 1))}
-                disabled={currentPage === totalPages}
-              >
-                Suivant
-              </Button>
-            </div>
+            {hasMore && (
+              <div className="flex gap-2 justify-end">
+                <Button variant="outline" size="sm" onClick={handleLoadMore} disabled={isLoadingPage}>
+                  Charger plus
+                </Button>
+              </div>
+            )}
           </div>
         </Card>
       ) : (
@@ -6,35 +6,40 @@ import { Button } from '@/components/ui/button';
 import { Badge } from '@/components/ui/badge';
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs';
 import { useAuth } from '@/contexts/AuthContext';
-import { Document, SearchResult } from '@/types';
-import { ApiDocument, ApiTag, fetchDocuments, fetchTags } from '@/lib/api';
+import { SearchResult } from '@/types';
+import { ApiDocument, ApiTag, DocumentFilters, fetchDocuments, fetchTags } from '@/lib/api';
 import { useToast } from '@/hooks/use-toast';
+import { useCursorList } from '@/hooks/use-cursor-list';
+
+type SearchScope = 'all' | 'general' | 'personal';
+
+// Same visibility as before: general documents and the user's own personal ones.
+const SCOPE_FILTERS: Record<SearchScope, DocumentFilters> = {
+  all: { visibleTo: 'me' },
+  general: { source: 'general' },
+  personal: { source: 'personal', owner: 'me' },
+};
 
 const SearchPage: React.FC = () => {
-  const { user, token } = useAuth();
+  const { token } = useAuth();
   const { toast } = useToast();
 
   const [query, setQuery] = useState('');
-  const [searchScope, setSearchScope] = useState<'all' | 'general' | 'personal'>('all');
-  const [isSearching, setIsSearching] = useState(false);
-  const [results, setResults] = useState<SearchResult[]>([]);
-  const [documents, setDocuments] = useState<Document[]>([]);
+  const [searchScope, setSearchScope] = useState<SearchScope>('all');
+  const [submitted, setSubmitted] = useState<{ query: string; scope: SearchScope } | null>(null);
   const [tagMap, setTagMap] = useState<Record<number, string>>({});
 
-  const mapDocument = useCallback(
-    (doc: ApiDocument): Document => ({
-      id: doc.id,
-      title: doc.title,
+  const mapResult = useCallback(
+    (doc: ApiDocument): SearchResult => ({
+      documentId: doc.id,
+      documentTitle: doc.title,
       filename: doc.filename,
-      file: doc.file,
       language: doc.language ?? 'N/A',
       source: doc.source,
       status: doc.status,
       dateAdded: doc.date_added,
-      owner: doc.owner,
-      tagId: doc.tag,
       tagName: doc.tag ? tagMap[doc.tag] ?? undefined : undefined,
-      path: doc.path ?? undefined,
+      file: doc.file ?? doc.path ?? undefined,
     }),
     [tagMap],
   );
@@ -53,79 +58,51 @@ const SearchPage: React.FC = () => {
     }
   }, [token]);
 
-  const loadDocuments = useCallback(async () => {
-    if (!token) return;
-    try {
-      const data = await fetchDocuments(token);
-      setDocuments(data.map(mapDocument));
-    } catch (error) {
+  useEffect(() => {
+    loadTags();
+  }, [loadTags]);
+
+  // The API filters and pages the results; further pages are loaded on demand.
+  const loadFirstPage = useCallback(
+    () =>
+      fetchDocuments(token, {
+        ...SCOPE_FILTERS[submitted?.scope ?? 'all'],
+        q: submitted?.query,
+      }),
+    [token, submitted],
+  );
+  const {
+    items,
+    hasMore,
+    isLoading: isSearching,
+    reload,
+    loadMore,
+  } = useCursorList(token && submitted ? loadFirstPage : null, token);
+
+  const notifyLoadError = useCallback(
+    (error: unknown) => {
       console.error(error);
       toast({
         title: 'Chargement impossible',
         description: 'La recuperation des documents a echoue.',
         variant: 'destructive',
       });
-    }
-  }, [token, mapDocument, toast]);
-
-  useEffect(() => {
-    loadTags();
-  }, [loadTags]);
+    },
+    [toast],
+  );
 
   useEffect(() => {
-    loadDocuments();
-  }, [loadDocuments]);
+    reload().catch(notifyLoadError);
+  }, [reload, notifyLoadError]);
 
-  const scopedDocuments = useMemo(() => {
-    if (!user) return [];
-    switch (searchScope) {
-      case 'general':
-        return documents.filter((doc) => doc.source === 'general');
-      case 'personal':
-        return documents.filter((doc) => doc.source === 'personal' && doc.owner === user.id);
-      default:
-        return documents.filter(
-          (doc) => doc.source === 'general' || (doc.source === 'personal' && doc.owner === user.id),
-        );
-    }
-  }, [documents, searchScope, user]);
+  const results = useMemo(
+    () => (submitted ? items.map(mapResult) : []),
+    [submitted, items, mapResult],
+  );
 
   const handleSearch = () => {
-    if (!query.trim()) {
-      setResults([]);
-      return;
-    }
-
-    const normalized = query.trim().toLowerCase();
-    setIsSearching(true);
-
-    const filtered = scopedDocuments
-      .filter((doc) => {
-        const tag = doc.tagName ?? (doc.tagId !== null ? `Tag ${doc.tagId}` : '');
-        const haystack = [
-          doc.title,
-          doc.filename ?? '',
-          doc.language ?? '',
-          tag ?? '',
-        ]
-          .join(' ')
-          .toLowerCase();
-        return haystack.includes(normalized);
-      })
-      .map<SearchResult>((doc) => ({
-        documentId: doc.id,
-        documentTitle: doc.title,
-        filename: doc.filename,
-        language: doc.language,
-        source: doc.source,
-        status: doc.status,
-        dateAdded: doc.dateAdded,
-        tagName: doc.tagName,
-        file: doc.file ?? doc.path ?? undefined,
-      }));
-
-    setResults(filtered);
-    setIsSearching(false);
+    const normalized = query.trim();
+    setSubmitted(normalized ? { query: normalized, scope: searchScope } : null);
   };
 
   const openDocument = (result: SearchResult) => {
@@ -156,7 +133,7 @@ const SearchPage: React.FC = () => {
           </CardDescription>
         </CardHeader>
         <CardContent className="space-y-4">
-          <Tabs value={searchScope} onValueChange={(value) => setSearchScope(value as typeof searchScope)}>
+          <Tabs value={searchScope} onValueChange={(value) => setSearchScope(value as SearchScope)}>
             <TabsList className="grid w-full grid-cols-1 sm:grid-cols-3 gap-2">
               <TabsTrigger value="all" className="w-full">Toutes les sources</TabsTrigger>
               <TabsTrigger value="general" className="w-full">Bibliotheque generale</TabsTrigger>
@@ -190,7 +167,8 @@ const SearchPage: React.FC = () => {
         <div className="space-y-4">
           <div className="flex items-center justify-between">
             <h2 className="text-xl font-semibold">
-              {results.length} resultat{results.length > 1 ? 's' : ''} trouve{results.length > 1 ? 's' : ''}
+              {results.length}
+              {hasMore ? '+' : ''} resultat{results.length > 1 ? 's' : ''} trouve{results.length > 1 ? 's' : ''}
             </h2>
           </div>
 
@@ -234,6 +212,14 @@ const SearchPage: React.FC = () => {
               </CardContent>
             </Card>
           ))}
+
+          {hasMore && (
+            <div className="flex justify-center">
+              <Button variant="outline" onClick={() => loadMore().catch(notifyLoadError)} disabled={isSearching}>
+                Charger plus
+              </Button>
+            </div>
+          )}
         </div>
       )}
 
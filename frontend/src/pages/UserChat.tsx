@@ -8,13 +8,14 @@ import { Input } from '@/components/ui/input';
 import { Card } from '@/components/ui/card';
 import { ScrollArea } from '@/components/ui/scroll-area';
 import { useToast } from '@/hooks/use-toast';
+import { useCursorList } from '@/hooks/use-cursor-list';
 import { Conversation, ChatMessage } from '@/types';
 import {
   ApiConversation,
   ApiMessage,
   createConversation,
+  fetchConversationHistory,
   fetchConversations,
-  fetchMessages,
   sendMessage,
   uploadDocument,
 } from '@/lib/api';
@@ -39,62 +40,82 @@ const mapMessage = (message: ApiMessage): ChatMessage => ({
 const UserChat: React.FC = () => {
   const { user, token } = useAuth();
   const { toast } = useToast();
-  const [conversations, setConversations] = useState<Conversation[]>([]);
   const [messages, setMessages] = useState<ChatMessage[]>([]);
+  const [olderMessagesCursor, setOlderMessagesCursor] = useState<string | null>(null);
   const [selectedConversationId, setSelectedConversationId] = useState<string | null>(null);
   const [input, setInput] = useState('');
   const [isSending, setIsSending] = useState(false);
   const fileInputRef = useRef<HTMLInputElement | null>(null);
 
-  const loadConversations = useCallback(async () => {
-    if (!token) return;
-    try {
-      const data = await fetchConversations(token);
-      const mapped = data.map(mapConversation).sort(
-        (a, b) =>
-          new Date(b.lastActivity || b.startedAt).getTime() -
-          new Date(a.lastActivity || a.startedAt).getTime(),
-      );
-      setConversations(mapped);
-      if (!selectedConversationId && mapped.length > 0) {
-        setSelectedConversationId(mapped[0].id);
-      }
-      if (mapped.length === 0) {
-        const newConversation = await createConversation({}, token);
-        const mappedConversation = mapConversation(newConversation);
-        setConversations([mappedConversation]);
-        setSelectedConversationId(mappedConversation.id);
-      }
-    } catch (error) {
+  // Conversations are read one page at a time (most recent activity first).
+  const loadConversationsPage = useCallback(() => fetchConversations(token), [token]);
+  const {
+    items: conversationItems,
+    hasMore: hasMoreConversations,
+    isLoading: isLoadingConversations,
+    reload: reloadConversations,
+    loadMore: loadMoreConversations,
+  } = useCursorList(token ? loadConversationsPage : null, token);
+  const conversations = useMemo(() => conversationItems.map(mapConversation), [conversationItems]);
+
+  const notifyConversationError = useCallback(
+    (error: unknown) => {
       console.error(error);
       toast({
         title: 'Chargement des conversations impossible',
         description: 'Une erreur est survenue lors de la recuperation de vos conversations.',
         variant: 'destructive',
       });
-    }
-  }, [token, selectedConversationId, toast]);
+    },
+    [toast],
+  );
 
-  const loadMessages = useCallback(async () => {
+  const loadConversations = useCallback(async () => {
     if (!token) return;
     try {
-      const data = await fetchMessages(token);
-      setMessages(data.map(mapMessage));
+      const page = await reloadConversations();
+      if (!page) return;
+      if (page.results.length > 0) {
+        const latestId = page.results[0].id;
+        setSelectedConversationId((current) => current ?? latestId);
+        return;
+      }
+      const newConversation = await createConversation({}, token);
+      await reloadConversations();
+      setSelectedConversationId(newConversation.id);
     } catch (error) {
-      console.error(error);
-      toast({
-        title: 'Chargement des messages impossible',
-        description: 'Une erreur est survenue lors de la recuperation des messages.',
-        variant: 'destructive',
-      });
+      notifyConversationError(error);
     }
-  }, [token, toast]);
+  }, [token, reloadConversations, notifyConversationError]);
+
+  // Only the latest messages of the selected conversation are loaded; older ones on demand.
+  const loadMessages = useCallback(
+    async (before?: string | null) => {
+      if (!token || !selectedConversationId) return;
+      try {
+        const history = await fetchConversationHistory(selectedConversationId, token, before);
+        const page = history.messages.map(mapMessage);
+        setMessages((prev) => (before ? [...page, ...prev] : page));
+        setOlderMessagesCursor(history.next_before);
+      } catch (error) {
+        console.error(error);
+        toast({
+          title: 'Chargement des messages impossible',
+          description: 'Une erreur est survenue lors de la recuperation des messages.',
+          variant: 'destructive',
+        });
+      }
+    },
+    [token, selectedConversationId, toast],
+  );
 
   useEffect(() => {
     loadConversations();
   }, [loadConversations]);
 
   useEffect(() => {
+    setMessages([]);
+    setOlderMessagesCursor(null);
     loadMessages();
   }, [loadMessages]);
 
@@ -112,9 +133,8 @@ const UserChat: React.FC = () => {
         },
         token,
       );
-      const mappedConversation = mapConversation(conversation);
-      setConversations((prev) => [mappedConversation, ...prev]);
-      setSelectedConversationId(mappedConversation.id);
+      await reloadConversations();
+      setSelectedConversationId(conversation.id);
     } catch (error) {
       console.error(error);
       toast({
@@ -203,6 +223,9 @@ const UserChat: React.FC = () => {
         selectedConversationId={selectedConversationId}
         onSelectConversation={handleSelectConversation}
         onNewConversation={handleNewConversation}
+        hasMore={hasMoreConversations}
+        isLoadingMore={isLoadingConversations}
+        onLoadMore={() => loadMoreConversations().catch(notifyConversationError)}
       />
 
       <div className="flex-1 flex flex-col">
@@ -215,6 +238,13 @@ const UserChat: React.FC = () => {
 
         <ScrollArea className="flex-1 p-4 sm:p-6">
           <div className="max-w-4xl mx-auto space-y-6">
+            {olderMessagesCursor && (
+              <div className="flex justify-center">
+                <Button variant="outline" size="sm" onClick={() => loadMessages(olderMessagesCursor)}>
+                  Messages precedents
+                </Button>
+              </div>
+            )}
             {conversationMessages.length === 0 ? (
               <Card className="p-6 text-center text-muted-foreground">
                 Commencez une conversation en envoyant votre premiere question.